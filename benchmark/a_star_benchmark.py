@@ -0,0 +1,74 @@
+import argparse
+import time
+from typing import List
+
+from game.a_star import AStar, IndexAStar
+from game.board import Board
+
+
+def build_open_board(rows: int, columns: int) -> Board:
+    """
+    :param rows: number of rows
+    :param columns: number of columns
+    :return: board without walls, source in the top left corner and target on the opposite edge
+    """
+    board = Board(rows=rows, columns=columns)
+    board.set_source_node(row=0, column=0)
+    board.set_target_node(row=rows - 1, column=columns // 2)
+    return board
+
+
+def run_a_star(board: Board) -> (float, int, List[int]):
+    """
+    :param board: board to search, its node states are modified by the search
+    :return: seconds spent searching, number of expanded nodes and path as cell indices
+    """
+    start = time.perf_counter()
+    a_star = AStar(board=board)
+    expanded = 0
+    while True:
+        current_node, updated_neighbor_nodes = a_star.next()
+        if updated_neighbor_nodes is None:
+            break
+        expanded += 1
+    seconds = time.perf_counter() - start
+    if current_node is None:
+        return seconds, expanded, []
+    return seconds, expanded, [node.x * board.columns + node.y for node in a_star.get_path()]
+
+
+def run_index_a_star(board: Board) -> (float, int, List[int]):
+    """
+    :param board: board to search, left untouched by the search
+    :return: seconds spent searching, number of expanded nodes and path as cell indices
+    """
+    start = time.perf_counter()
+    index_a_star = IndexAStar(board=board)
+    found = index_a_star.search()
+    seconds = time.perf_counter() - start
+    return seconds, index_a_star.expanded, index_a_star.get_path() if found else []
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Compare AStar and IndexAStar on open boards.')
+    parser.add_argument('--sizes', type=int, nargs='+', default=[100, 300, 1000])
+    args = parser.parse_args()
+
+    print(f'{"size":>6} {"engine":>12} {"seconds":>10} {"expanded":>10} {"expanded/s":>12} {"path":>6}')
+    for size in args.sizes:
+        board = build_open_board(rows=size, columns=size)
+        results = {
+            'IndexAStar': run_index_a_star(board=board),
+            # AStar runs last since it marks visited nodes on the board
+            'AStar': run_a_star(board=board),
+        }
+        for engine, (seconds, expanded, path) in results.items():
+            print(f'{size:>6} {engine:>12} {seconds:>10.3f} {expanded:>10} {expanded / seconds:>12.0f} '
+                  f'{len(path):>6}')
+        speedup = results['AStar'][0] / results['IndexAStar'][0]
+        identical = results['AStar'][2] == results['IndexAStar'][2]
+        print(f'{size:>6} {"speedup":>12} {speedup:>10.1f}x, identical path: {identical}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,59 @@
+import argparse
+import time
+
+from benchmark.boards import board_kinds, build_board
+from game.a_star import AStar
+from game.bidirectional_a_star import BidirectionalAStar
+
+# engines stepped through the next() protocol until the search ends
+engines = {
+    'a_star': AStar,
+    'bidirectional_a_star': BidirectionalAStar,
+}
+
+
+def run_engine(engine: str, kind: str, size: int, seed: int) -> (float, int, float):
+    """
+    :param engine: one of the keys of engines
+    :param kind: board kind, one of the keys of board_kinds
+    :param size: number of rows and columns
+    :param seed: board seed
+    :return: seconds spent searching, number of expanded nodes and path length, None if there is no path
+    """
+    board = build_board(kind=kind, rows=size, columns=size, seed=seed)
+
+    start = time.perf_counter()
+    search = engines[engine](board=board)
+    expanded = 0
+    while True:
+        current_node, updated_neighbor_nodes = search.next()
+        if updated_neighbor_nodes is None:
+            break
+        expanded += 1
+    seconds = time.perf_counter() - start
+
+    if current_node is None:
+        return seconds, expanded, None
+    if engine == 'a_star':
+        return seconds, expanded, board.target.distance_to_source
+    return seconds, expanded, search.distance
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Compare AStar with BidirectionalAStar.')
+    parser.add_argument('--sizes', type=int, nargs='+', default=[50, 100, 200])
+    parser.add_argument('--kinds', nargs='+', default=list(board_kinds), choices=list(board_kinds))
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    print(f'{"kind":>8} {"size":>6} {"engine":>22} {"seconds":>10} {"expanded":>10} {"distance":>10}')
+    for kind in args.kinds:
+        for size in args.sizes:
+            for engine in engines:
+                seconds, expanded, distance = run_engine(engine=engine, kind=kind, size=size, seed=args.seed)
+                distance = f'{distance:.3f}' if distance is not None else 'none'
+                print(f'{kind:>8} {size:>6} {engine:>22} {seconds:>10.3f} {expanded:>10} {distance:>10}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,123 @@
+import random
+from typing import List, Tuple
+
+from game.board import Board
+from game.node import NodeState, node_state_codes
+
+# maps a wall mask byte to the state code of the cell
+_wall_states: bytes = bytes([node_state_codes[NodeState.OPEN], node_state_codes[NodeState.WALL]]).ljust(256, b'\x00')
+
+
+def open_walls(rows: int, columns: int, rng: random.Random) -> bytearray:
+    """
+    :param rows: number of rows
+    :param columns: number of columns
+    :param rng: random number generator, unused
+    :return: flat row major wall mask without any walls
+    """
+    return bytearray(rows * columns)
+
+
+def random_walls(rows: int, columns: int, rng: random.Random, density: float = 0.3) -> bytearray:
+    """
+    :param rows: number of rows
+    :param columns: number of columns
+    :param rng: random number generator
+    :param density: probability of a cell being a wall
+    :return: flat row major wall mask with every cell blocked independently
+    """
+    return bytearray(rng.random() < density for _ in range(rows * columns))
+
+
+def maze_walls(rows: int, columns: int, rng: random.Random) -> bytearray:
+    """
+    carves a perfect maze with a randomized depth first search. passages run between cells with even row and
+    column, every other cell starts out as a wall
+    :param rows: number of rows
+    :param columns: number of columns
+    :param rng: random number generator
+    :return: flat row major wall mask
+    """
+    walls = bytearray(b'\x01') * (rows * columns)
+    walls[0] = 0
+    stack: List[Tuple[int, int]] = [(0, 0)]
+    while stack:
+        row, column = stack[-1]
+        unvisited = [(row + i, column + j, row + i // 2, column + j // 2)
+                     for i, j in ((-2, 0), (2, 0), (0, -2), (0, 2))
+                     if 0 <= row + i < rows and 0 <= column + j < columns and walls[(row + i) * columns + column + j]]
+        if not unvisited:
+            stack.pop()
+            continue
+        next_row, next_column, between_row, between_column = rng.choice(unvisited)
+        walls[between_row * columns + between_column] = 0
+        walls[next_row * columns + next_column] = 0
+        stack.append((next_row, next_column))
+    return walls
+
+
+def room_walls(rows: int, columns: int, rng: random.Random, room_size: int = 8) -> bytearray:
+    """
+    splits the board into square rooms separated by one cell thick walls, with a door at a random position in
+    the wall to the room below and to the room on the right, so every room can be reached
+    :param rows: number of rows
+    :param columns: number of columns
+    :param rng: random number generator
+    :param room_size: distance between two parallel walls, the last row and column of every room is its wall
+    :return: flat row major wall mask
+    """
+    walls = bytearray(rows * columns)
+    for row in range(room_size - 1, rows, room_size):
+        walls[row * columns:(row + 1) * columns] = b'\x01' * columns
+    for column in range(room_size - 1, columns, room_size):
+        walls[column::columns] = b'\x01' * rows
+
+    for top in range(0, rows, room_size):
+        for left in range(0, columns, room_size):
+            bottom = top + room_size - 1
+            right = left + room_size - 1
+            if bottom < rows:
+                walls[bottom * columns + rng.randrange(left, min(right, columns))] = 0
+            if right < columns:
+                walls[rng.randrange(top, min(bottom, rows)) * columns + right] = 0
+    return walls
+
+
+board_kinds = {
+    'open': open_walls,
+    'random': random_walls,
+    'maze': maze_walls,
+    'rooms': room_walls,
+}
+
+
+def build_board(kind: str, rows: int, columns: int, seed: int = 0, board_class=Board) -> Board:
+    """
+    builds a reproducible benchmark board with the source in the top left corner and the target in the bottom
+    right corner
+    :param kind: one of the keys of board_kinds
+    :param rows: number of rows
+    :param columns: number of columns
+    :param seed: seed for the wall generator
+    :param board_class: Board or a subclass of it
+    :return: board with source, target and walls set
+    """
+    walls = board_kinds[kind](rows, columns, random.Random(seed))
+
+    # mazes only open cells with even coordinates
+    target_row, target_column = rows - 1, columns - 1
+    if kind == 'maze':
+        target_row, target_column = target_row // 2 * 2, target_column // 2 * 2
+    # the last row and column of every room is a wall, see room_walls
+    elif kind == 'rooms':
+        target_row -= 1 if target_row % 8 == 7 else 0
+        target_column -= 1 if target_column % 8 == 7 else 0
+
+    walls[0] = 0
+    walls[target_row * columns + target_column] = 0
+
+    board = board_class(rows=rows, columns=columns)
+    board.set_cell_states(walls.translate(_wall_states))
+    board.set_source_node(row=0, column=0)
+    board.set_target_node(row=target_row, column=target_column)
+    return board
@@ -0,0 +1,67 @@
+import argparse
+import random
+import time
+
+from benchmark.boards import board_kinds, build_board
+from game.hierarchical_search import HierarchicalPathfinder
+from game.search import find_paths
+
+
+def run_queries(kind: str, size: int, cluster_size: int, queries: int, seed: int) -> dict:
+    """
+    :param kind: board kind, one of the keys of board_kinds
+    :param size: number of rows and columns
+    :param cluster_size: HierarchicalPathfinder cluster size
+    :param queries: number of random queries between walkable cells
+    :param seed: board and query seed
+    :return: build time, mean query latency of both searches and the path length ratio of the found paths
+    """
+    board = build_board(kind=kind, rows=size, columns=size, seed=seed)
+    passable = board.get_passable_cells()
+    cells = [index for index, walkable in enumerate(passable) if walkable]
+    generator = random.Random(seed)
+    pairs = [(divmod(generator.choice(cells), size), divmod(generator.choice(cells), size)) for _ in range(queries)]
+
+    start = time.perf_counter()
+    hierarchical_pathfinder = HierarchicalPathfinder(board=board, cluster_size=cluster_size)
+    hierarchical_pathfinder.build()
+    build_seconds = time.perf_counter() - start
+
+    a_star_results = find_paths(board=board, queries=pairs)
+    hierarchical_results = [hierarchical_pathfinder.find_path(source=source, target=target)
+                            for source, target in pairs]
+
+    ratios = [hierarchical.distance / a_star.distance
+              for a_star, hierarchical in zip(a_star_results, hierarchical_results) if a_star.distance]
+    return {
+        'build': build_seconds,
+        'a_star': sum(result.seconds for result in a_star_results) / queries,
+        'hierarchical': sum(result.seconds for result in hierarchical_results) / queries,
+        'mean_ratio': sum(ratios) / len(ratios) if ratios else 1.0,
+        'max_ratio': max(ratios, default=1.0),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Compare HierarchicalPathfinder with IndexAStar.')
+    parser.add_argument('--sizes', type=int, nargs='+', default=[128, 256, 512])
+    parser.add_argument('--kinds', nargs='+', default=list(board_kinds), choices=list(board_kinds))
+    parser.add_argument('--cluster-sizes', type=int, nargs='+', default=[16, 32, 64])
+    parser.add_argument('--queries', type=int, default=20)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    print(f'{"kind":>8} {"size":>6} {"cluster":>8} {"build s":>9} {"a* ms":>9} {"hpa* ms":>9} '
+          f'{"mean ratio":>11} {"max ratio":>10}')
+    for kind in args.kinds:
+        for size in args.sizes:
+            for cluster_size in args.cluster_sizes:
+                result = run_queries(kind=kind, size=size, cluster_size=cluster_size, queries=args.queries,
+                                     seed=args.seed)
+                print(f'{kind:>8} {size:>6} {cluster_size:>8} {result["build"]:>9.3f} '
+                      f'{result["a_star"] * 1000:>9.2f} {result["hierarchical"] * 1000:>9.2f} '
+                      f'{result["mean_ratio"]:>11.4f} {result["max_ratio"]:>10.4f}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,80 @@
+import argparse
+import random
+import time
+
+from benchmark.boards import board_kinds, build_board
+from game.incremental_search import DStarLite
+from game.node import NodeState
+from game.search import find_path
+
+
+def run_replanning(kind: str, size: int, rounds: int, edits: int, seed: int) -> dict:
+    """
+    toggles random cells between walls and open cells, then replans with DStarLite and with a fresh IndexAStar
+    :param kind: board kind, one of the keys of board_kinds
+    :param size: number of rows and columns
+    :param rounds: number of replans
+    :param edits: number of cells toggled before every replan
+    :param seed: board and edit seed
+    :return: seconds and expansions of the first search and of the replans of both searches
+    """
+    board = build_board(kind=kind, rows=size, columns=size, seed=seed)
+    source = (board.source.x, board.source.y)
+    target = (board.target.x, board.target.y)
+    generator = random.Random(seed)
+
+    start = time.perf_counter()
+    d_star_lite = DStarLite(board=board)
+    d_star_lite.search()
+    result = {'first': time.perf_counter() - start, 'first_expanded': d_star_lite.expanded,
+              'd_star_lite': 0.0, 'd_star_lite_expanded': 0, 'a_star': 0.0, 'a_star_expanded': 0, 'same': True}
+
+    for _ in range(rounds):
+        for _ in range(edits):
+            row, column = generator.randrange(size), generator.randrange(size)
+            state = board.get_node(row=row, column=column).state
+            if state == NodeState.WALL:
+                board.set_unblocked_node(row=row, column=column)
+            elif state == NodeState.OPEN:
+                board.set_blocked_node(row=row, column=column)
+
+        start = time.perf_counter()
+        d_star_lite.search()
+        result['d_star_lite'] += time.perf_counter() - start
+        result['d_star_lite_expanded'] += d_star_lite.expanded
+
+        a_star = find_path(board=board, source=source, target=target)
+        result['a_star'] += a_star.seconds
+        result['a_star_expanded'] += a_star.expanded
+        if a_star.found:
+            result['same'] &= d_star_lite.distance is not None and abs(d_star_lite.distance - a_star.distance) < 1e-9
+        else:
+            result['same'] &= d_star_lite.distance is None
+
+    d_star_lite.close()
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Compare DStarLite replanning with searching from scratch.')
+    parser.add_argument('--sizes', type=int, nargs='+', default=[100, 200, 400])
+    parser.add_argument('--kinds', nargs='+', default=list(board_kinds), choices=list(board_kinds))
+    parser.add_argument('--rounds', type=int, default=20)
+    parser.add_argument('--edits', type=int, default=5)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    print(f'{"kind":>8} {"size":>6} {"first s":>9} {"d* ms":>9} {"d* exp":>9} {"a* ms":>9} {"a* exp":>9} '
+          f'{"same":>5}')
+    for kind in args.kinds:
+        for size in args.sizes:
+            result = run_replanning(kind=kind, size=size, rounds=args.rounds, edits=args.edits, seed=args.seed)
+            print(f'{kind:>8} {size:>6} {result["first"]:>9.3f} '
+                  f'{result["d_star_lite"] * 1000 / args.rounds:>9.2f} '
+                  f'{result["d_star_lite_expanded"] // args.rounds:>9} '
+                  f'{result["a_star"] * 1000 / args.rounds:>9.2f} {result["a_star_expanded"] // args.rounds:>9} '
+                  f'{str(result["same"]):>5}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,80 @@
+import argparse
+import math
+import time
+
+from benchmark.boards import board_kinds, build_board
+from game.a_star import AStar, IndexAStar
+from game.compact_board import CompactBoard
+from game.jump_point_search import JumpPointSearch
+
+
+def run_a_star(kind: str, size: int, seed: int) -> (float, int, float):
+    """
+    :return: seconds spent searching, number of expanded nodes and path distance
+    """
+    board = build_board(kind=kind, rows=size, columns=size, seed=seed)
+    start = time.perf_counter()
+    a_star = AStar(board=board)
+    expanded = 0
+    while True:
+        current_node, updated_neighbor_nodes = a_star.next()
+        if updated_neighbor_nodes is None:
+            break
+        expanded += 1
+    seconds = time.perf_counter() - start
+    return seconds, expanded, board.target.distance_to_source if current_node is not None else None
+
+
+def run_index_a_star(kind: str, size: int, seed: int) -> (float, int, float):
+    """
+    :return: seconds spent searching, number of expanded nodes and path distance
+    """
+    board = build_board(kind=kind, rows=size, columns=size, seed=seed, board_class=CompactBoard)
+    start = time.perf_counter()
+    index_a_star = IndexAStar(board=board)
+    index_a_star.search()
+    return time.perf_counter() - start, index_a_star.expanded, index_a_star.distance
+
+
+def run_jump_point_search(kind: str, size: int, seed: int) -> (float, int, float):
+    """
+    :return: seconds spent searching, number of expanded jump points and path distance
+    """
+    board = build_board(kind=kind, rows=size, columns=size, seed=seed, board_class=CompactBoard)
+    start = time.perf_counter()
+    jump_point_search = JumpPointSearch(board=board)
+    jump_point_search.search()
+    return time.perf_counter() - start, jump_point_search.expanded, jump_point_search.distance
+
+
+engines = {
+    'AStar': run_a_star,
+    'IndexAStar': run_index_a_star,
+    'JumpPointSearch': run_jump_point_search,
+}
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Compare JumpPointSearch with plain A*.')
+    parser.add_argument('--sizes', type=int, nargs='+', default=[100, 200, 400])
+    parser.add_argument('--kinds', nargs='+', default=list(board_kinds), choices=list(board_kinds))
+    parser.add_argument('--engines', nargs='+', default=list(engines), choices=list(engines))
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    print(f'{"kind":>8} {"size":>6} {"engine":>16} {"seconds":>10} {"expanded":>10} {"distance":>12} {"same cost":>10}')
+    for kind in args.kinds:
+        for size in args.sizes:
+            reference = None
+            for engine in args.engines:
+                seconds, expanded, distance = engines[engine](kind=kind, size=size, seed=args.seed)
+                if reference is None:
+                    reference = distance
+                same_cost = distance == reference if distance is None or reference is None \
+                    else math.isclose(distance, reference)
+                print(f'{kind:>8} {size:>6} {engine:>16} {seconds:>10.3f} {expanded:>10} {str(distance):>12.12} '
+                      f'{str(same_cost):>10}')
+
+
+if __name__ == '__main__':
+    main()
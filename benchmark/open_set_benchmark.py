@@ -0,0 +1,56 @@
+import argparse
+import time
+
+from benchmark.boards import board_kinds, build_board
+from game.a_star import AStar
+from game.heuristic import heuristics
+
+
+def run_a_star(kind: str, size: int, open_set: str, seed: int, connectivity: int = 8,
+               heuristic: str = 'euclidean') -> (float, int):
+    """
+    :param kind: board kind, one of the keys of board_kinds
+    :param size: number of rows and columns
+    :param open_set: AStar open set backend
+    :param seed: board seed
+    :param connectivity: AStar connectivity
+    :param heuristic: AStar heuristic
+    :return: seconds spent searching and number of expanded nodes
+    """
+    board = build_board(kind=kind, rows=size, columns=size, seed=seed)
+
+    start = time.perf_counter()
+    a_star = AStar(board=board, open_set=open_set, connectivity=connectivity, heuristic=heuristic)
+    expanded = 0
+    while True:
+        _, updated_neighbor_nodes = a_star.next()
+        if updated_neighbor_nodes is None:
+            break
+        expanded += 1
+    return time.perf_counter() - start, expanded
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Compare AStar open set backends.')
+    parser.add_argument('--sizes', type=int, nargs='+', default=[50, 100, 200, 400])
+    parser.add_argument('--kinds', nargs='+', default=list(board_kinds), choices=list(board_kinds))
+    parser.add_argument('--open-sets', nargs='+', default=list(AStar._open_set_classes),
+                        choices=list(AStar._open_set_classes))
+    parser.add_argument('--seed', type=int, default=0)
+    # integer costs keep bucket_queue bucketed, 8-connected moves make it fall back to a heap
+    parser.add_argument('--connectivity', type=int, default=4, choices=[4, 8])
+    parser.add_argument('--heuristic', default='manhattan', choices=list(heuristics))
+    args = parser.parse_args()
+
+    print(f'{"kind":>8} {"size":>6} {"open set":>14} {"seconds":>10} {"expanded":>10} {"expanded/s":>12}')
+    for kind in args.kinds:
+        for size in args.sizes:
+            for open_set in args.open_sets:
+                seconds, expanded = run_a_star(kind=kind, size=size, open_set=open_set, seed=args.seed,
+                                               connectivity=args.connectivity, heuristic=args.heuristic)
+                print(f'{kind:>8} {size:>6} {open_set:>14} {seconds:>10.3f} {expanded:>10} '
+                      f'{expanded / seconds:>12.0f}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,41 @@
+import argparse
+import multiprocessing
+import random
+import time
+
+from benchmark.boards import board_kinds, build_board
+from game.compact_board import CompactBoard
+from game.parallel_search import find_paths_parallel
+from game.search import find_paths
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Measure how find_paths_parallel scales with processes.')
+    parser.add_argument('--kind', default='random', choices=list(board_kinds))
+    parser.add_argument('--size', type=int, default=500)
+    parser.add_argument('--queries', type=int, default=400)
+    parser.add_argument('--processes', type=int, nargs='+',
+                        default=sorted({1, 2, 4, multiprocessing.cpu_count()}))
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    board = build_board(kind=args.kind, rows=args.size, columns=args.size, seed=args.seed, board_class=CompactBoard)
+    rng = random.Random(args.seed)
+    queries = [((rng.randrange(args.size), rng.randrange(args.size)),
+                (rng.randrange(args.size), rng.randrange(args.size))) for _ in range(args.queries)]
+
+    start = time.perf_counter()
+    find_paths(board=board, queries=queries)
+    serial_seconds = time.perf_counter() - start
+    print(f'{"processes":>10} {"seconds":>10} {"queries/s":>10} {"speedup":>8}')
+    print(f'{"serial":>10} {serial_seconds:>10.3f} {args.queries / serial_seconds:>10.0f} {1:>8.2f}')
+
+    for processes in args.processes:
+        start = time.perf_counter()
+        find_paths_parallel(board=board, queries=queries, processes=processes)
+        seconds = time.perf_counter() - start
+        print(f'{processes:>10} {seconds:>10.3f} {args.queries / seconds:>10.0f} {serial_seconds / seconds:>8.2f}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,253 @@
+import argparse
+import gc
+import json
+import platform
+import random
+import subprocess
+import time
+import tracemalloc
+from datetime import datetime, timezone
+from typing import List
+
+from benchmark.boards import board_kinds, build_board
+from game.a_star import AStar
+from game.board import Board
+from game.compact_board import CompactBoard
+from game.heuristic import heuristics
+
+# board classes whose construction is measured
+board_classes = {
+    'board': Board,
+    'compact_board': CompactBoard,
+}
+
+# metrics compared against a baseline, and whether a larger value is better
+metrics = {
+    'board': {'seconds': False, 'peak_bytes': False},
+    'a_star': {'expanded_per_second': True},
+    'open_set': {'push_ns': False, 'decrease_ns': False, 'increase_ns': False, 'pop_ns': False},
+}
+
+# parameters identifying a result of every benchmark, results with equal parameters are compared
+parameters = {
+    'board': ('board_class', 'size'),
+    'a_star': ('kind', 'size', 'board_class', 'open_set', 'connectivity', 'heuristic'),
+    'open_set': ('open_set', 'count'),
+}
+
+
+def measure_board(board_class: str, size: int) -> dict:
+    """
+    :param board_class: one of the keys of board_classes
+    :param size: number of rows and columns
+    :return: seconds spent creating an open board and the peak memory allocated meanwhile
+    """
+    gc.collect()
+    start = time.perf_counter()
+    board = board_classes[board_class](rows=size, columns=size)
+    seconds = time.perf_counter() - start
+    del board
+    gc.collect()
+
+    # traced separately, tracing slows allocations down
+    tracemalloc.start()
+    board = board_classes[board_class](rows=size, columns=size)
+    _, peak_bytes = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del board
+
+    return {'benchmark': 'board', 'board_class': board_class, 'size': size, 'seconds': seconds,
+            'peak_bytes': peak_bytes}
+
+
+def measure_a_star(kind: str, size: int, board_class: str, open_set: str, seed: int, max_expanded: int,
+                   connectivity: int = 4, heuristic: str = 'manhattan') -> dict:
+    """
+    :param kind: board kind, one of the keys of board_kinds
+    :param size: number of rows and columns
+    :param board_class: one of the keys of board_classes
+    :param open_set: AStar open set backend
+    :param seed: board seed
+    :param max_expanded: nodes to expand at most, so large boards finish in bounded time
+    :param connectivity: AStar connectivity
+    :param heuristic: AStar heuristic
+    :return: nodes expanded per second by AStar.next, whether the search finished within max_expanded and, for
+             bucket_queue, whether it stayed bucketed or fell back to a heap
+    """
+    board = build_board(kind=kind, rows=size, columns=size, seed=seed, board_class=board_classes[board_class])
+    gc.collect()
+
+    start = time.perf_counter()
+    a_star = AStar(board=board, open_set=open_set, connectivity=connectivity, heuristic=heuristic)
+    expanded = 0
+    finished = False
+    while expanded < max_expanded:
+        _, updated_neighbor_nodes = a_star.next()
+        if updated_neighbor_nodes is None:
+            finished = True
+            break
+        expanded += 1
+    seconds = time.perf_counter() - start
+
+    return {'benchmark': 'a_star', 'kind': kind, 'size': size, 'board_class': board_class, 'open_set': open_set,
+            'connectivity': connectivity, 'heuristic': heuristic, 'seconds': seconds, 'expanded': expanded,
+            'finished': finished, 'is_bucketed': getattr(a_star._open_nodes, 'is_bucketed', None),
+            'expanded_per_second': expanded / seconds}
+
+
+def measure_open_set(open_set: str, count: int, seed: int) -> dict:
+    """
+    pushes count objects with random integer keys, decreases the keys of half of them, increases the keys of a
+    quarter of them and pops everything. the keys are drawn from count // 100 values, crowded into a narrow range
+    like A* total distances on integer cost boards, so bucket_queue stays bucketed
+    :param open_set: one of the keys of AStar._open_set_classes
+    :param count: number of objects
+    :param seed: seed of the keys
+    :return: nanoseconds per push, decrease, increase and pop, and for bucket_queue whether it stayed bucketed
+    """
+    rng = random.Random(seed)
+    keys = [rng.randrange(max(1, count // 100)) for _ in range(count)]
+    decreased = rng.sample(range(count), count // 2)
+    increased = rng.sample(range(count), count // 4)
+    heap = AStar._open_set_classes[open_set](key=keys.__getitem__)
+    gc.collect()
+
+    start = time.perf_counter()
+    for item in range(count):
+        heap.push(item)
+    push_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for item in decreased:
+        keys[item] -= 1
+        heap.update(item, keys[item])
+    decrease_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for item in increased:
+        keys[item] += 2
+        heap.update(item, keys[item])
+    increase_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    while not heap.is_empty():
+        heap.pop()
+    pop_seconds = time.perf_counter() - start
+
+    return {'benchmark': 'open_set', 'open_set': open_set, 'count': count,
+            'is_bucketed': getattr(heap, 'is_bucketed', None),
+            'push_ns': push_seconds / count * 1e9,
+            'decrease_ns': decrease_seconds / max(1, len(decreased)) * 1e9,
+            'increase_ns': increase_seconds / max(1, len(increased)) * 1e9,
+            'pop_ns': pop_seconds / count * 1e9}
+
+
+def get_best_result(results: List[dict]) -> dict:
+    """
+    :param results: results of repeated runs of one benchmark with the same parameters
+    :return: first result with every metric replaced by its best value over all runs, which is the least
+             disturbed by other work on the machine
+    """
+    best_result = dict(results[0])
+    for metric, larger_is_better in metrics[best_result['benchmark']].items():
+        values = [result[metric] for result in results]
+        best_result[metric] = max(values) if larger_is_better else min(values)
+    return best_result
+
+
+def get_metadata(args: argparse.Namespace) -> dict:
+    """
+    :return: what the results were measured on, so results of different commits and machines can be told apart
+    """
+    try:
+        commit = subprocess.run(['git', 'rev-parse', 'HEAD'], capture_output=True, text=True,
+                                check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {'commit': commit, 'time': datetime.now(timezone.utc).isoformat(),
+            'python': platform.python_version(), 'implementation': platform.python_implementation(),
+            'machine': platform.machine(), 'system': platform.system(), 'arguments': vars(args)}
+
+
+def compare(results: List[dict], baseline: List[dict]) -> None:
+    """
+    prints the ratio of every metric to the baseline result with the same parameters, above 1 is an improvement
+    """
+    # results of older runs may lack parameters added since
+    baseline_results = {(result['benchmark'],) + tuple(result.get(name) for name in parameters[result['benchmark']]):
+                        result for result in baseline}
+
+    print(f'{"benchmark":>10} {"parameters":>56} {"metric":>20} {"baseline":>14} {"current":>14} {"ratio":>7}')
+    for result in results:
+        benchmark = result['benchmark']
+        key = (benchmark,) + tuple(result[name] for name in parameters[benchmark])
+        baseline_result = baseline_results.get(key)
+        if baseline_result is None:
+            continue
+        for metric, larger_is_better in metrics[benchmark].items():
+            current = result[metric]
+            previous = baseline_result[metric]
+            ratio = (current / previous if larger_is_better else previous / current) if current and previous \
+                else 1.0
+            flag = ' regression' if ratio < 0.9 else ''
+            print(f'{benchmark:>10} {" ".join(str(value) for value in key[1:]):>56} {metric:>20} '
+                  f'{previous:>14.6g} {current:>14.6g} {ratio:>7.2f}{flag}')
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark board construction, AStar and the open sets, and '
+                                                 'write the results as json.')
+    parser.add_argument('--sizes', type=int, nargs='+', default=[10, 100, 1000, 4000])
+    parser.add_argument('--kinds', nargs='+', default=list(board_kinds), choices=list(board_kinds))
+    parser.add_argument('--open-sets', nargs='+', default=list(AStar._open_set_classes),
+                        choices=list(AStar._open_set_classes))
+    parser.add_argument('--open-set-counts', type=int, nargs='+', default=[1000, 100000])
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--repeat', type=int, default=3, help='runs of every benchmark, the best one is kept')
+    parser.add_argument('--max-expanded', type=int, default=100000)
+    # integer costs keep bucket_queue bucketed, 8-connected moves make it fall back to a heap
+    parser.add_argument('--connectivity', type=int, default=4, choices=[4, 8])
+    parser.add_argument('--heuristic', default='manhattan', choices=list(heuristics))
+    # a Node per cell does not fit into memory on the largest boards, larger ones use CompactBoard only
+    parser.add_argument('--max-node-board-size', type=int, default=1000)
+    parser.add_argument('--output', help='json file to write the results to')
+    parser.add_argument('--baseline', help='json file written by an earlier run to compare the results with')
+    args = parser.parse_args()
+
+    results = []
+    for size in args.sizes:
+        for board_class in board_classes:
+            if board_class == 'board' and size > args.max_node_board_size:
+                continue
+            results.append(get_best_result([measure_board(board_class=board_class, size=size)
+                                            for _ in range(args.repeat)]))
+            print(json.dumps(results[-1]))
+
+    for kind in args.kinds:
+        for size in args.sizes:
+            board_class = 'board' if size <= args.max_node_board_size else 'compact_board'
+            for open_set in args.open_sets:
+                results.append(get_best_result([
+                    measure_a_star(kind=kind, size=size, board_class=board_class, open_set=open_set, seed=args.seed,
+                                   max_expanded=args.max_expanded, connectivity=args.connectivity,
+                                   heuristic=args.heuristic)
+                    for _ in range(args.repeat)]))
+                print(json.dumps(results[-1]))
+
+    for open_set in args.open_sets:
+        for count in args.open_set_counts:
+            results.append(get_best_result([measure_open_set(open_set=open_set, count=count, seed=args.seed)
+                                            for _ in range(args.repeat)]))
+            print(json.dumps(results[-1]))
+
+    if args.output:
+        with open(args.output, 'w') as file:
+            json.dump({'metadata': get_metadata(args=args), 'results': results}, file, indent=2)
+
+    if args.baseline:
+        with open(args.baseline) as file:
+            compare(results=results, baseline=json.load(file)['results'])
+
+
+if __name__ == '__main__':
+    main()
@@ -1,22 +1,101 @@
-from typing import List
+import heapq
+import math
+from array import array
+from typing import List, Tuple
 
-from game.board import Board
-from game.min_heap import MinHeap
-from game.node import Node, NodeState
+from game.board import Board, neighbor_directions
+from game.change_buffer import ChangeBuffer
+from game.heuristic import get_heuristic_field, heuristics
+from game.instrumentation import Instrumentation
+from game.min_heap import BucketQueue, LazyMinHeap, MinHeap
+from game.node import Node, NodeState, node_state_codes
 
 
 class AStar:
-    def __init__(self, board):
+    # open set backends, all offering the MinHeap interface
+    _open_set_classes = {
+        'min_heap': MinHeap,
+        'lazy_min_heap': LazyMinHeap,
+        # only stays bucketed while all total distances are multiples of its resolution, which rules out diagonal
+        # steps, see __init__
+        'bucket_queue': BucketQueue,
+    }
+
+    # neighbors already in the open set are relaxed too, visited ones are final
+    _searchable_states = frozenset([NodeState.OPEN, NodeState.TRGT, NodeState.NHBR])
+
+    # returned by next in place of the updated neighbors while they go to a change buffer, see __init__
+    _recorded_neighbor_nodes = ()
+
+    def __init__(self, board, open_set: str = 'min_heap', connectivity: int = 8, heuristic: str = 'euclidean',
+                 instrumentation: Instrumentation = None, changes: ChangeBuffer = None, resolution: float = None,
+                 heuristic_field: bool = False):
+        """
+        :param board: board to search, node states and distances are updated as the search progresses
+        :param open_set: open set backend, one of the keys of _open_set_classes. bucket_queue only stays bucketed
+                         while every total distance is a multiple of resolution. a diagonal step costs sqrt(2), so
+                         8-connected searches, the default, fall back to a heap at their first diagonal step whatever
+                         the heuristic and gain nothing over lazy_min_heap. bucket_queue pays off with connectivity 4
+                         and the manhattan heuristic
+        :param connectivity: 8 to allow diagonal steps, 4 for horizontal and vertical steps only
+        :param heuristic: estimate of the distance to target, one of the keys of game.heuristic.heuristics
+        :param instrumentation: collects counters, timers and histograms of every step, None measures nothing and
+                                costs nothing
+        :param changes: buffer to append a change record to for every node a step changes, so consumers can
+                        apply the changes instead of reading the nodes again. next then returns an empty tuple in
+                        place of the updated neighbors and builds no list per step
+        :param resolution: step between the total distances the bucket queue open set buckets, None for 1 on
+                           unweighted boards and 0.5 on weighted ones, where a step costs the average of two integer
+                           weights. 4-connected searches with the manhattan heuristic stay bucketed with the default
+        :param heuristic_field: look the heuristic up in a field precomputed for the whole board, which pays off
+                                once several searches share a target, see game.heuristic.get_heuristic_field
+        """
+        assert open_set in self._open_set_classes, f'Unknown open set {open_set}'
+        assert connectivity in (4, 8), f'Connectivity must be 4 or 8'
+        assert heuristic in heuristics, f'Unknown heuristic {heuristic}'
+
         self._board = board
-        self._open_nodes: MinHeap = MinHeap(key=lambda x: x.total_distance)
+        # options the search was created with, kept so a saved search can be recreated, see game.snapshot
+        self._open_set_name: str = open_set
+        self._connectivity: int = connectivity
+        self._heuristic_name: str = heuristic
+        # cell weights of a weighted board, a step costs its length times the average weight of both cells
+        self._weights = board.get_weights()
+        self._minimum_weight: int = board.minimum_weight
+        if open_set == 'bucket_queue':
+            if resolution is None:
+                resolution = 1 if self._weights is None else 0.5
+            self._open_nodes: MinHeap = BucketQueue(key=lambda x: x.total_distance, resolution=resolution)
+        else:
+            self._open_nodes: MinHeap = self._open_set_classes[open_set](key=lambda x: x.total_distance)
+        self._neighbor_masks: bytearray = board.get_neighbor_masks()
+        # (row offset, column offset) of every neighbor flagged in a neighbor mask, indexed by the mask
+        self._neighbor_table: List[list] = [
+            [(i, j) for bit, (i, j) in enumerate(neighbor_directions)
+             if mask >> bit & 1 and (connectivity == 8 or i == 0 or j == 0)]
+            for mask in range(256)]
+        # neighbors of the node being expanded, refilled by every step, see _get_neighbor_nodes
+        self._neighbor_nodes: List[Node] = []
         self._came_from: dict = {}
         self._path_found: bool = False
+        self._changes: ChangeBuffer = changes
 
         assert self._board.source is not None, f'Board must have a source node'
         assert self._board.target is not None, f'Board must have a target node'
 
+        self._heuristic = heuristics[heuristic]
+        # heuristic value of every cell, shared with other searches towards the same target, None to compute values
+        # as they are needed
+        self._heuristic_field: array = get_heuristic_field(
+            heuristic=heuristic, rows=board.rows, columns=board.columns, target=(board.target.x, board.target.y)) \
+            if heuristic_field else None
+
+        self._board.source.distance_to_target = self._get_distance_to_target(node=self._board.source)
         self._open_nodes.push(self._board.source)
 
+        if instrumentation is not None:
+            instrumentation.instrument_a_star(a_star=self)
+
     def next(self) -> (Node, List[Node]):
         assert self._path_found is False, 'Path already found'
 
@@ -35,6 +114,8 @@ class AStar:
             current_node = self._came_from[self._board.target]
             while current_node != self._board.source:
                 current_node.state = NodeState.PATH
+                if self._changes is not None:
+                    self._record_change(node=current_node)
                 current_node = self._came_from[current_node]
 
             return current_node, None
@@ -43,28 +124,35 @@ class AStar:
         if current_node != self._board.source:
             current_node.state = NodeState.VSTD
 
+        # updated neighbors are either recorded as they change or collected for the caller
+        changes = self._changes
+        if changes is not None:
+            self._record_change(node=current_node)
+            updated_neighbor_nodes = self._recorded_neighbor_nodes
+        else:
+            updated_neighbor_nodes = []
+
         # get neighbor nodes
         neighbor_nodes = self._get_neighbor_nodes(node=current_node)
-        updated_neighbor_nodes: List[Node] = []
 
         for neighbor_node in neighbor_nodes:
             # if neighbor_node.state == NodeState.VSTD:
             #     continue
 
             # update distance_to_source and distance_to_target as needed
-            candidate_distance_to_source = current_node.distance_to_source + current_node.distance_to(neighbor_node)
+            candidate_distance_to_source = current_node.distance_to_source + self._get_step_cost(current_node,
+                                                                                                neighbor_node)
             if neighbor_node.distance_to_source is None \
                     or candidate_distance_to_source < neighbor_node.distance_to_source:
                 self._came_from[neighbor_node] = current_node
 
                 neighbor_node.distance_to_source = candidate_distance_to_source
 
-                candidate_distance_to_target = neighbor_node.distance_to(self._board.target)
+                candidate_distance_to_target = self._get_distance_to_target(node=neighbor_node)
                 neighbor_node.distance_to_target = candidate_distance_to_target \
                     if neighbor_node.distance_to_target is None \
                     else min(neighbor_node.distance_to_target, candidate_distance_to_target)
 
-                updated_neighbor_nodes.append(neighbor_node)
                 if self._open_nodes.contains(neighbor_node):
                     self._open_nodes.update(neighbor_node, neighbor_node.total_distance)
                 else:
@@ -72,6 +160,11 @@ class AStar:
                         neighbor_node.state = NodeState.NHBR
                     self._open_nodes.push(neighbor_node)
 
+                if changes is not None:
+                    self._record_change(node=neighbor_node)
+                else:
+                    updated_neighbor_nodes.append(neighbor_node)
+
         return current_node, updated_neighbor_nodes
 
     def get_path(self) -> List[Node]:
@@ -85,29 +178,302 @@ class AStar:
 
         return path
 
+    def _record_change(self, node: Node) -> None:
+        self._changes.append(index=node.x * self._board.columns + node.y, state_code=node_state_codes[node.state],
+                             distance_to_source=node.distance_to_source,
+                             distance_to_target=node.distance_to_target)
+
+    def _get_distance_to_target(self, node: Node) -> float:
+        """
+        :param node: node to estimate the distance for
+        :return: heuristic distance from node to the target node
+        """
+        if self._heuristic_field is not None:
+            distance_to_target = self._heuristic_field[node.x * self._board.columns + node.y]
+        else:
+            target = self._board.target
+            distance_to_target = self._heuristic(node.x - target.x, node.y - target.y)
+        if self._weights is None:
+            return distance_to_target
+        return distance_to_target * self._minimum_weight
+
+    def _get_step_cost(self, node: Node, neighbor_node: Node) -> float:
+        """
+        :return: cost of stepping from node to its neighbor, its length scaled by the weights of both cells
+        """
+        if self._weights is None:
+            return node.distance_to(neighbor_node)
+        columns = self._board.columns
+        weight = self._weights[node.x * columns + node.y] + self._weights[neighbor_node.x * columns + neighbor_node.y]
+        return node.distance_to(neighbor_node) * weight * 0.5
+
     def _get_neighbor_nodes(self, node: Node) -> List[Node]:
         """
         determines neighbors and sets their distance_to_source and distance_to_target
         :param node: node to find neighbors of
-        :return: list of neighbors for given node
+        :return: list of neighbors for given node, the same list refilled by every call
         """
 
-        x_start = node.x - 1 if node.x > 0 else node.x
-        x_stop = node.x + 2 if node.x < self._board.rows - 1 else node.x + 1
-        y_start = node.y - 1 if node.y > 0 else node.y
-        y_stop = node.y + 2 if node.y < self._board.columns - 1 else node.y + 1
+        x = node.x
+        y = node.y
+        get_node = self._board.get_node
+        searchable_states = self._searchable_states
 
-        neighbor_nodes: List[Node] = []
-        for i in range(x_start, x_stop):
-            for j in range(y_start, y_stop):
-                if i != node.x or j != node.y:
-                    neighbor_node = self._board.get_node(row=i, column=j)
-                    if neighbor_node.state in [NodeState.OPEN, NodeState.TRGT]:
-                        neighbor_nodes.append(neighbor_node)
+        # the board's neighbor mask already excludes walls and cells off the board
+        neighbor_nodes = self._neighbor_nodes
+        neighbor_nodes.clear()
+        for i, j in self._neighbor_table[self._neighbor_masks[x * self._board.columns + y]]:
+            neighbor_node = get_node(row=x + i, column=y + j)
+            if neighbor_node.state in searchable_states:
+                neighbor_nodes.append(neighbor_node)
 
         return neighbor_nodes
 
 
+class IndexAStar:
+    """
+    A* over flat cell indices (row * columns + column). follows the same expansion rules as AStar, but keeps
+    g-scores and parent pointers in preallocated arrays and never creates, hashes or mutates Node objects.
+    neighbors come straight from the board's cached neighbor masks, so every cell that is not a wall is walkable
+    and wall edits made through the board are seen by the next search. the board itself is left untouched.
+    after a search, reset prepares the arrays for another source and target on the same board
+    """
+
+    def __init__(self, board: Board, source: Tuple[int, int] = None, target: Tuple[int, int] = None,
+                 connectivity: int = 8, heuristic: str = 'euclidean', heuristic_field: bool = False):
+        """
+        :param board: board to search
+        :param source: (row, column) to start from, defaults to the board source node
+        :param target: (row, column) to find a path to, defaults to the board target node
+        :param connectivity: 8 to allow diagonal steps, 4 for horizontal and vertical steps only
+        :param heuristic: estimate of the distance to target, one of the keys of game.heuristic.heuristics
+        :param heuristic_field: look the heuristic up in a field precomputed for the whole board, which pays off
+                                once several searches share a target, see game.heuristic.get_heuristic_field
+        """
+        assert connectivity in (4, 8), f'Connectivity must be 4 or 8'
+        assert heuristic in heuristics, f'Unknown heuristic {heuristic}'
+
+        self._board: Board = board
+        self._rows: int = board.rows
+        self._columns: int = board.columns
+        self._neighbor_masks: bytearray = board.get_neighbor_masks()
+        self._heuristic_name: str = heuristic
+        self._heuristic = heuristics[heuristic]
+        self._use_heuristic_field: bool = heuristic_field
+
+        size = self._rows * self._columns
+        self._distances_to_source: array = array('d', [math.inf]) * size
+        self._came_from: array = array('q', [-1]) * size
+        self._closed: bytearray = bytearray(size)
+        self._discovered: List[int] = []
+        self._visited: List[int] = []
+        self._expanded: int = 0
+        self._path_found: bool = False
+
+        # (index offset, step length) of every neighbor flagged in a neighbor mask, indexed by the mask
+        self._neighbor_table: List[list] = self._get_neighbor_table(columns=self._columns, connectivity=connectivity)
+
+        if source is None:
+            assert board.source is not None, f'Board must have a source node'
+            source = (board.source.x, board.source.y)
+        if target is None:
+            assert board.target is not None, f'Board must have a target node'
+            target = (board.target.x, board.target.y)
+        self._set_source_and_target(source=source, target=target)
+
+    @property
+    def source(self) -> int:
+        return self._source
+
+    @property
+    def target(self) -> int:
+        return self._target
+
+    @property
+    def expanded(self) -> int:
+        """
+        :return: number of nodes taken off the open set and expanded, source included
+        """
+        return self._expanded
+
+    @property
+    def discovered(self) -> int:
+        """
+        :return: number of nodes that were assigned a distance to source, source included
+        """
+        return len(self._discovered)
+
+    @property
+    def distance(self) -> float:
+        """
+        :return: length of the path found from source to target, None if no path was found
+        """
+        return self._distances_to_source[self._target] if self._path_found else None
+
+    @property
+    def use_heuristic_field(self) -> bool:
+        return self._use_heuristic_field
+
+    @use_heuristic_field.setter
+    def use_heuristic_field(self, value: bool) -> None:
+        self._use_heuristic_field = value
+
+    def reset(self, source: Tuple[int, int], target: Tuple[int, int]) -> None:
+        """
+        prepares another search on the same board. only the cells touched by the previous search are cleared,
+        so small searches on large boards stay cheap
+        :param source: (row, column) to start from
+        :param target: (row, column) to find a path to
+        """
+        distances_to_source = self._distances_to_source
+        came_from = self._came_from
+        closed = self._closed
+        inf = math.inf
+        for index in self._discovered:
+            distances_to_source[index] = inf
+            came_from[index] = -1
+            closed[index] = 0
+
+        self._discovered = []
+        self._visited = []
+        self._expanded = 0
+        self._path_found = False
+        self._set_source_and_target(source=source, target=target)
+
+    def search(self) -> bool:
+        """
+        runs the search to completion
+        :return: True if a path from source to target exists
+        """
+        assert self._path_found is False, 'Path already found'
+
+        source = self._source
+        target = self._target
+        columns = self._columns
+        for index in (source, target):
+            if self._board.get_node(row=index // columns, column=index % columns).state == NodeState.WALL:
+                return False
+
+        target_row = target // columns
+        target_column = target - target_row * columns
+        heuristic = self._heuristic
+        # cell weights of a weighted board, a step costs its length times the average weight of both cells
+        weights = self._board.get_weights()
+        minimum_weight = self._board.minimum_weight
+        distances_to_target = get_heuristic_field(heuristic=self._heuristic_name, rows=self._rows, columns=columns,
+                                                  target=(target_row, target_column)) \
+            if self._use_heuristic_field else None
+        distances_to_source = self._distances_to_source
+        came_from = self._came_from
+        closed = self._closed
+        discovered = self._discovered
+        visited = self._visited
+        neighbor_masks = self._neighbor_masks
+        neighbor_table = self._neighbor_table
+        inf = math.inf
+        heappush = heapq.heappush
+        heappop = heapq.heappop
+
+        source_row = source // columns
+        distances_to_source[source] = 0.0
+        discovered.append(source)
+        open_nodes = [(heuristic(source_row - target_row, source - source_row * columns - target_column)
+                       * minimum_weight, 0, source)]
+        # decreasing insertion counter, ties on total distance are popped last in first out like in MinHeap
+        count = -1
+        expanded = 0
+
+        while open_nodes:
+            _, _, current = heappop(open_nodes)
+
+            # stale entry left behind by an improved distance
+            if closed[current]:
+                continue
+
+            if current == target:
+                self._path_found = True
+                break
+
+            closed[current] = 1
+            expanded += 1
+            if current != source:
+                visited.append(current)
+
+            current_distance = distances_to_source[current]
+            if weights is not None:
+                current_weight = weights[current]
+            for offset, step in neighbor_table[neighbor_masks[current]]:
+                neighbor = current + offset
+                if closed[neighbor]:
+                    continue
+
+                if weights is not None:
+                    step = step * (current_weight + weights[neighbor]) * 0.5
+                candidate_distance_to_source = current_distance + step
+                neighbor_distance_to_source = distances_to_source[neighbor]
+                if candidate_distance_to_source < neighbor_distance_to_source:
+                    if neighbor_distance_to_source == inf:
+                        discovered.append(neighbor)
+                    distances_to_source[neighbor] = candidate_distance_to_source
+                    came_from[neighbor] = current
+                    if distances_to_target is not None:
+                        distance_to_target = distances_to_target[neighbor]
+                    else:
+                        neighbor_row = neighbor // columns
+                        distance_to_target = heuristic(neighbor_row - target_row,
+                                                       neighbor - neighbor_row * columns - target_column)
+                    if weights is not None:
+                        distance_to_target *= minimum_weight
+                    # an improved node is pushed again, its older entry goes stale
+                    heappush(open_nodes, (candidate_distance_to_source + distance_to_target, count, neighbor))
+                    count -= 1
+
+        self._expanded = expanded
+        return self._path_found
+
+    def get_path(self) -> List[int]:
+        """
+        :return: cell indices of the path from source to target, both excluded, in walking order
+        """
+        path = []
+        if self._target == self._source:
+            return path
+
+        came_from = self._came_from
+        current = came_from[self._target]
+        while current != self._source:
+            path.append(current)
+            current = came_from[current]
+
+        path.reverse()
+        return path
+
+    def get_visited(self) -> List[int]:
+        """
+        :return: cell indices in the order they were expanded, source and target excluded
+        """
+        return self._visited
+
+    def _set_source_and_target(self, source: Tuple[int, int], target: Tuple[int, int]) -> None:
+        for row, column in (source, target):
+            assert 0 <= row < self._rows and 0 <= column < self._columns, f'({row}, {column}) is out of bounds.'
+
+        self._source: int = source[0] * self._columns + source[1]
+        self._target: int = target[0] * self._columns + target[1]
+
+    @staticmethod
+    def _get_neighbor_table(columns: int, connectivity: int) -> List[list]:
+        """
+        :param columns: number of columns of the board
+        :param connectivity: 8 to allow diagonal steps, 4 for horizontal and vertical steps only
+        :return: for every possible neighbor mask, (index offset, step length) of the neighbors it flags
+        """
+        steps = [(i * columns + j, math.sqrt(i ** 2 + j ** 2)) if connectivity == 8 or i == 0 or j == 0 else None
+                 for i, j in neighbor_directions]
+        return [[steps[bit] for bit in range(8) if mask >> bit & 1 and steps[bit] is not None]
+                for mask in range(256)]
+
+
 if __name__ == '__main__':
     b = Board(rows=5, columns=5)
     b.set_source_node(row=0, column=0)
@@ -0,0 +1,204 @@
+import math
+from typing import Dict, List
+
+from game.a_star import AStar
+from game.heuristic import heuristics
+from game.min_heap import MinHeap
+from game.node import Node, NodeState, neighbor_directions
+
+
+class BidirectionalAStar:
+    """
+    A* searching from the source and from the target at the same time, with the same next() stepping protocol as
+    AStar. every step expands one node of the side with the smaller open set. whenever a search reaches a node the
+    other one already has a distance for, the path through that node is a candidate.
+    both sides order their open set by the distance from their start plus the balanced estimate
+    (estimate to their goal - estimate to their start) / 2. the two estimates cancel out along any path, so once the
+    smallest keys of both open sets add up to the best candidate no shorter path is left and the path is optimal.
+    a node shows its known distance to source and to target, or the heuristic estimate while a side has not
+    reached it yet
+    """
+
+    # index of each side in the per side lists
+    _forward = 0
+    _backward = 1
+
+    def __init__(self, board, open_set: str = 'min_heap', connectivity: int = 8, heuristic: str = 'euclidean'):
+        """
+        :param board: board to search, node states and distances are updated as the search progresses
+        :param open_set: open set backend, one of the keys of AStar._open_set_classes
+        :param connectivity: 8 to allow diagonal steps, 4 for horizontal and vertical steps only
+        :param heuristic: estimate of the distance between two nodes, one of the keys of game.heuristic.heuristics
+        """
+        assert open_set in AStar._open_set_classes, f'Unknown open set {open_set}'
+        assert connectivity in (4, 8), f'Connectivity must be 4 or 8'
+        assert heuristic in heuristics, f'Unknown heuristic {heuristic}'
+        assert board.source is not None, f'Board must have a source node'
+        assert board.target is not None, f'Board must have a target node'
+
+        self._board = board
+        self._heuristic = heuristics[heuristic]
+        # cell weights of a weighted board, a step costs its length times the average weight of both cells
+        self._weights = board.get_weights()
+        self._minimum_weight: int = board.minimum_weight
+        self._neighbor_masks: bytearray = board.get_neighbor_masks()
+        # (row offset, column offset) of every neighbor flagged in a neighbor mask, indexed by the mask
+        self._neighbor_table: List[list] = [
+            [(i, j) for bit, (i, j) in enumerate(neighbor_directions)
+             if mask >> bit & 1 and (connectivity == 8 or i == 0 or j == 0)]
+            for mask in range(256)]
+
+        # the node each side starts from and the node it heads for
+        self._starts: List[Node] = [board.source, board.target]
+        self._goals: List[Node] = [board.target, board.source]
+        # distance from the start of each side, and the node it was reached from
+        self._distances: List[Dict[Node, float]] = [{board.source: 0.0}, {board.target: 0.0}]
+        self._came_from: List[dict] = [{}, {}]
+        self._closed: List[set] = [set(), set()]
+        self._open_nodes: List[MinHeap] = [
+            AStar._open_set_classes[open_set](key=lambda node, side=side: self._get_total_distance(node, side))
+            for side in (self._forward, self._backward)]
+
+        # length of the shortest path found so far and the node where its two halves meet
+        self._best_distance: float = math.inf
+        self._meeting_node: Node = None
+        self._path_found: bool = False
+
+        for side in (self._forward, self._backward):
+            self._open_nodes[side].push(self._starts[side])
+        self._update_node_distances(node=board.source)
+        self._update_node_distances(node=board.target)
+        if board.source == board.target:
+            self._best_distance = 0.0
+            self._meeting_node = board.source
+
+    @property
+    def distance(self) -> float:
+        """
+        :return: length of the path from source to target, None until it was found
+        """
+        return self._best_distance if self._path_found else None
+
+    def next(self) -> (Node, List[Node]):
+        assert self._path_found is False, 'Path already found'
+
+        # no pair of open nodes can lie on a shorter path than the best one, or one side ran out of nodes
+        lower_bound = sum(self._get_minimum_total_distance(side=side) for side in (self._forward, self._backward))
+        if lower_bound >= self._best_distance:
+            if self._meeting_node is None:
+                return (None, None)
+
+            self._path_found = True
+            for path_node in self.get_path():
+                path_node.state = NodeState.PATH
+            return self._meeting_node, None
+
+        side = self._forward if self._open_nodes[self._forward].size() <= self._open_nodes[self._backward].size() \
+            else self._backward
+        other_side = 1 - side
+        distances = self._distances[side]
+        other_distances = self._distances[other_side]
+        open_nodes = self._open_nodes[side]
+        closed = self._closed[side]
+
+        current_node: Node = open_nodes.pop()
+        closed.add(current_node)
+
+        # mark current node as visited
+        if current_node.state in (NodeState.OPEN, NodeState.NHBR):
+            current_node.state = NodeState.VSTD
+
+        updated_neighbor_nodes: List[Node] = []
+        for neighbor_node in self._get_neighbor_nodes(node=current_node):
+            if neighbor_node in closed:
+                continue
+
+            candidate_distance = distances[current_node] + self._get_step_cost(current_node, neighbor_node)
+            if candidate_distance >= distances.get(neighbor_node, math.inf):
+                continue
+
+            distances[neighbor_node] = candidate_distance
+            self._came_from[side][neighbor_node] = current_node
+            self._update_node_distances(node=neighbor_node)
+            updated_neighbor_nodes.append(neighbor_node)
+
+            if open_nodes.contains(neighbor_node):
+                open_nodes.update(neighbor_node, self._get_total_distance(node=neighbor_node, side=side))
+            else:
+                if neighbor_node.state == NodeState.OPEN:
+                    neighbor_node.state = NodeState.NHBR
+                open_nodes.push(neighbor_node)
+
+            # both searches reached the neighbor, the path through it is a candidate
+            if neighbor_node in other_distances \
+                    and candidate_distance + other_distances[neighbor_node] < self._best_distance:
+                self._best_distance = candidate_distance + other_distances[neighbor_node]
+                self._meeting_node = neighbor_node
+
+        return current_node, updated_neighbor_nodes
+
+    def get_path(self) -> List[Node]:
+        """
+        :return: nodes of the path from source to target, both excluded, in walking order
+        """
+        assert self._meeting_node is not None, 'No path found'
+
+        path = []
+        current_node = self._meeting_node
+        while current_node != self._board.source:
+            path.append(current_node)
+            current_node = self._came_from[self._forward][current_node]
+        path.reverse()
+
+        current_node = self._meeting_node
+        while current_node != self._board.target:
+            current_node = self._came_from[self._backward][current_node]
+            path.append(current_node)
+
+        return [path_node for path_node in path if path_node not in (self._board.source, self._board.target)]
+
+    def _get_total_distance(self, node: Node, side: int) -> float:
+        """
+        :return: distance from the start of the side to node plus the balanced estimate of the side
+        """
+        goal = self._goals[side]
+        start = self._starts[side]
+        return self._distances[side][node] + (self._heuristic(node.x - goal.x, node.y - goal.y)
+                                              - self._heuristic(node.x - start.x, node.y - start.y)) \
+            * self._minimum_weight / 2
+
+    def _get_step_cost(self, node: Node, neighbor_node: Node) -> float:
+        """
+        :return: cost of stepping from node to its neighbor, its length scaled by the weights of both cells
+        """
+        if self._weights is None:
+            return node.distance_to(neighbor_node)
+        columns = self._board.columns
+        weight = self._weights[node.x * columns + node.y] + self._weights[neighbor_node.x * columns + neighbor_node.y]
+        return node.distance_to(neighbor_node) * weight * 0.5
+
+    def _get_minimum_total_distance(self, side: int) -> float:
+        open_nodes = self._open_nodes[side]
+        return math.inf if open_nodes.is_empty() else self._get_total_distance(node=open_nodes.peek(), side=side)
+
+    def _update_node_distances(self, node: Node) -> None:
+        """
+        shows the known distances of node, falling back to the heuristic for a side that has not reached it yet
+        """
+        source = self._board.source
+        target = self._board.target
+        node.distance_to_source = self._distances[self._forward].get(
+            node, self._heuristic(node.x - source.x, node.y - source.y))
+        node.distance_to_target = self._distances[self._backward].get(
+            node, self._heuristic(node.x - target.x, node.y - target.y))
+
+    def _get_neighbor_nodes(self, node: Node) -> List[Node]:
+        """
+        :param node: node to find neighbors of
+        :return: walkable neighbors of node, the board's neighbor mask already excludes walls and cells off the board
+        """
+        x = node.x
+        y = node.y
+        get_node = self._board.get_node
+        return [get_node(row=x + i, column=y + j)
+                for i, j in self._neighbor_table[self._neighbor_masks[x * self._board.columns + y]]]
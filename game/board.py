@@ -1,6 +1,9 @@
-from typing import List
+import math
+from array import array
+from typing import Callable, List, Tuple
 
-from game.node import Node, NodeState
+from game.components import ComponentLabels
+from game.node import Node, NodeState, neighbor_directions, node_state_codes, node_states
 
 
 class Board:
@@ -9,11 +12,31 @@ class Board:
         self._columns: int = columns
         self._source: Node = None
         self._target: Node = None
+        # bumped by every _set_node_state and weight change, so anything derived from the board can tell whether
+        # it is stale
+        self._version: int = 0
+        # traversal weight of every cell, None while every cell weighs 1, see set_weight
+        self._weights: array = None
+        self._minimum_weight: int = 1
+
+        # built on first use by get_neighbor_masks and get_component_labels, then kept up to date by _set_node_state
+        self._neighbor_masks: bytearray = None
+        self._component_labels: ComponentLabels = None
+        # called with (row, column, passable) after every wall edit, see add_wall_listener
+        self._wall_listeners: List[Callable[[int, int, bool], None]] = []
+        # called after set_cell_states changed walls all at once, see add_reset_listener
+        self._reset_listeners: List[Callable[[], None]] = []
 
         # create board
-        self._board: List[List[Node]] = [
-            [Node(node_state=NodeState.OPEN, x=row, y=column) for column in range(self._columns)]
-            for row in range(self._rows)]
+        self._board: List[List[Node]] = self._create_board()
+
+    def _create_board(self) -> List[List[Node]]:
+        """
+        allocates the cell storage. subclasses override this to store cells differently
+        :return: rows x columns grid of open nodes
+        """
+        return [[Node(node_state=NodeState.OPEN, x=row, y=column) for column in range(self._columns)]
+                for row in range(self._rows)]
 
     @property
     def rows(self) -> int:
@@ -27,6 +50,10 @@ class Board:
     def board(self) -> List[List[Node]]:
         return self._board
 
+    @property
+    def version(self) -> int:
+        return self._version
+
     @property
     def source(self) -> Node:
         return self._source
@@ -73,14 +100,253 @@ class Board:
         self._set_node_state(row=row, column=column, node_state=NodeState.VSTD)
 
     def _set_node_state(self, row: int, column: int, node_state: NodeState):
-        assert row < self._rows, f'Row index is out of bounds.'
-        assert column < self._rows, f'Column index is out of bounds.'
+        assert 0 <= row < self._rows, f'Row index is out of bounds.'
+        assert 0 <= column < self._columns, f'Column index is out of bounds.'
+
+        node = self.get_node(row=row, column=column)
+        was_passable = node.state != NodeState.WALL
+        node.state = node_state
+        self._version += 1
+
+        is_passable = node_state != NodeState.WALL
+        if was_passable != is_passable:
+            if self._neighbor_masks is not None:
+                self._update_neighbor_masks(row=row, column=column, passable=is_passable)
+            if self._component_labels is not None:
+                self._component_labels.set_passable(index=row * self._columns + column, passable=is_passable)
+            for listener in list(self._wall_listeners):
+                listener(row, column, is_passable)
+
+    def set_weight(self, row: int, column: int, weight: int) -> None:
+        """
+        a step between two cells costs its length times the average weight of both cells, so costs stay symmetric
+        and a heuristic scaled by minimum_weight stays admissible
+        :param row: row of the cell
+        :param column: column of the cell
+        :param weight: cost of crossing the cell relative to plain ground, 1 to 255
+        """
+        assert 0 <= row < self._rows, f'Row index is out of bounds.'
+        assert 0 <= column < self._columns, f'Column index is out of bounds.'
+        assert 1 <= weight <= 255, f'Weight must be between 1 and 255'
+
+        if self._weights is None:
+            if weight == 1:
+                return
+            self._weights = array('B', [1]) * (self._rows * self._columns)
+
+        index = row * self._columns + column
+        if self._weights[index] != weight:
+            self._weights[index] = weight
+            self._minimum_weight = None
+            self._version += 1
 
-        self._board[row][column].state = node_state
+    def set_weights(self, weights) -> None:
+        """
+        :param weights: flat row major buffer of rows * columns cell weights between 1 and 255, such as an array('B')
+                        or a memoryview over shared memory, used in place. None makes every cell weigh 1 again
+        """
+        assert weights is None or len(weights) == self._rows * self._columns, \
+            f'Weights buffer does not match the board size.'
+        self._weights = weights
+        self._minimum_weight = 1 if weights is None else None
+        self._version += 1
+
+    def get_weights(self):
+        """
+        :return: flat row major buffer of cell weights, None while every cell weighs 1
+        """
+        return self._weights
+
+    @property
+    def minimum_weight(self) -> int:
+        """
+        :return: smallest weight of any cell, the factor heuristics are scaled by to stay admissible
+        """
+        if self._minimum_weight is None:
+            self._minimum_weight = min(self._weights) if len(self._weights) else 1
+        return self._minimum_weight
+
+    def add_wall_listener(self, listener: Callable[[int, int, bool], None]) -> None:
+        """
+        :param listener: called with (row, column, passable) whenever a cell turns into a wall or back, after the
+                         neighbor masks and component labels were updated
+        """
+        self._wall_listeners.append(listener)
+
+    def remove_wall_listener(self, listener: Callable[[int, int, bool], None]) -> None:
+        self._wall_listeners.remove(listener)
+
+    def add_reset_listener(self, listener: Callable[[], None]) -> None:
+        """
+        :param listener: called without arguments after set_cell_states overwrote every cell, after the neighbor
+                         masks and component labels were updated. wall listeners are not called for those cells, so
+                         anything holding on to walls of the board rebuilds them here
+        """
+        self._reset_listeners.append(listener)
+
+    def remove_reset_listener(self, listener: Callable[[], None]) -> None:
+        self._reset_listeners.remove(listener)
 
     def get_node(self, row: int, column: int) -> Node:
         return self._board[row][column]
 
+    def get_cell_states(self) -> bytearray:
+        """
+        :return: flat row major buffer holding the code of every node state, see game.node.node_state_codes
+        """
+        return bytearray(node_state_codes[node.state] for row in self._board for node in row)
+
+    def set_cell_states(self, states) -> None:
+        """
+        overwrites the state of every cell at once, such as when restoring a saved board. source and target are
+        left as they are. the neighbor masks are rebuilt in place, so searches holding on to them see the new walls,
+        the component labels are rebuilt and the reset listeners are called instead of a wall listener call per cell.
+        states may be the buffer returned by get_cell_states edited in place
+        :param states: flat row major buffer of rows * columns node state codes, see game.node.node_state_codes
+        """
+        assert len(states) == self._rows * self._columns, f'States buffer does not match the board size.'
+        self._write_cell_states(states=states)
+        self._version += 1
+
+        if self._neighbor_masks is not None:
+            self._neighbor_masks[:] = self._build_neighbor_masks()
+        if self._component_labels is not None:
+            self._component_labels = ComponentLabels(board=self)
+        for listener in list(self._reset_listeners):
+            listener()
+
+    def _write_cell_states(self, states) -> None:
+        columns = self._columns
+        for row, nodes in enumerate(self._board):
+            for node, code in zip(nodes, states[row * columns:(row + 1) * columns]):
+                node.state = node_states[code]
+
+    def get_distance_arrays(self) -> (array, array):
+        """
+        :return: flat row major arrays of the distance to source and to target of every node, nan where a
+                 distance is not set. None instead of an array when no node has that distance
+        """
+        nodes = [node for row in self._board for node in row]
+        distances_to_source = [node.distance_to_source for node in nodes]
+        distances_to_target = [node.distance_to_target for node in nodes]
+        return tuple(array('d', (math.nan if distance is None else distance for distance in distances))
+                     if any(distance is not None for distance in distances) else None
+                     for distances in (distances_to_source, distances_to_target))
+
+    def set_distance_arrays(self, distances_to_source: array, distances_to_target: array) -> None:
+        """
+        :param distances_to_source: flat row major distance to source of every node, nan where it is not set.
+                                    None leaves the distances to source as they are
+        :param distances_to_target: same for the distance to target
+        """
+        for distances in (distances_to_source, distances_to_target):
+            assert distances is None or len(distances) == self._rows * self._columns, \
+                f'Distances do not match the board size.'
+
+        for index, node in enumerate(node for row in self._board for node in row):
+            if distances_to_source is not None:
+                distance = distances_to_source[index]
+                node.distance_to_source = None if distance != distance else distance
+            if distances_to_target is not None:
+                distance = distances_to_target[index]
+                node.distance_to_target = None if distance != distance else distance
+
+    def get_passable_cells(self) -> bytearray:
+        """
+        :return: flat row major buffer holding 1 for every cell that is not a wall and 0 otherwise
+        """
+        return bytearray(node.state != NodeState.WALL for row in self._board for node in row)
+
+    def get_neighbor_masks(self) -> bytearray:
+        """
+        the masks are built once and then updated incrementally by every wall edit made through the board
+        :return: flat row major buffer with one byte per cell, bit k is set when the neighbor in direction
+                 neighbor_directions[k] lies on the board and is not a wall
+        """
+        if self._neighbor_masks is None:
+            self._neighbor_masks = self._build_neighbor_masks()
+        return self._neighbor_masks
+
+    def get_component_labels(self) -> ComponentLabels:
+        """
+        the labels are built once and then updated incrementally by every wall edit made through the board
+        :return: 8-connected component of every cell
+        """
+        if self._component_labels is None:
+            self._component_labels = ComponentLabels(board=self)
+        return self._component_labels
+
+    def set_neighbor_masks(self, neighbor_masks) -> None:
+        """
+        :param neighbor_masks: neighbor masks from get_neighbor_masks of a board with the same cells, such as a
+                               memoryview over shared memory, used in place instead of building them again
+        """
+        assert len(neighbor_masks) == self._rows * self._columns, f'Neighbor masks do not match the board size.'
+        self._neighbor_masks = neighbor_masks
+
+    def set_component_labels(self, component_labels: ComponentLabels) -> None:
+        """
+        :param component_labels: labels of this board, such as ones created over buffers shared with another
+                                 board with the same cells, see ComponentLabels
+        """
+        self._component_labels = component_labels
+
+    def is_reachable(self, source: Tuple[int, int], target: Tuple[int, int]) -> bool:
+        """
+        answers in O(1) once the component labels exist
+        :param source: (row, column) of a cell
+        :param target: (row, column) of another cell
+        :return: False if no path of any connectivity leads from source to target, True if an 8-connected one does
+        """
+        for row, column in (source, target):
+            assert 0 <= row < self._rows and 0 <= column < self._columns, f'({row}, {column}) is out of bounds.'
+
+        return self.get_component_labels().is_connected(index=source[0] * self._columns + source[1],
+                                                        other_index=target[0] * self._columns + target[1])
+
+    def _build_neighbor_masks(self) -> bytearray:
+        """
+        builds all masks at once with big integer arithmetic. every cell is one byte of the integer holding 0 or 1,
+        so shifting the whole board by a neighbor offset lines every cell up with its neighbor and shifting by k
+        bits moves that neighbor into bit k without touching the other bytes
+        :return: neighbor mask of every cell
+        """
+        size = self._rows * self._columns
+        passable = int.from_bytes(self.get_passable_cells(), 'little')
+        cells = int.from_bytes(b'\x01' * size, 'little')
+        not_first_column = int.from_bytes((b'\x00' + b'\x01' * (self._columns - 1)) * self._rows, 'little')
+        not_last_column = int.from_bytes((b'\x01' * (self._columns - 1) + b'\x00') * self._rows, 'little')
+
+        masks = 0
+        for bit, (i, j) in enumerate(neighbor_directions):
+            offset = 8 * (i * self._columns + j)
+            neighbors = (passable >> offset if offset > 0 else passable << -offset) & cells
+            # cells on the first or last column would otherwise see the other end of the adjacent row
+            if j < 0:
+                neighbors &= not_first_column
+            elif j > 0:
+                neighbors &= not_last_column
+            masks |= neighbors << bit
+
+        return bytearray(masks.to_bytes(size, 'little'))
+
+    def _update_neighbor_masks(self, row: int, column: int, passable: bool) -> None:
+        """
+        flips the bit pointing at the given cell in the masks of its neighbors
+        :param row: row of the cell whose passability changed
+        :param column: column of the cell whose passability changed
+        :param passable: whether the cell is walkable now
+        """
+        for bit, (i, j) in enumerate(neighbor_directions):
+            neighbor_row = row + i
+            neighbor_column = column + j
+            if 0 <= neighbor_row < self._rows and 0 <= neighbor_column < self._columns:
+                index = neighbor_row * self._columns + neighbor_column
+                if passable:
+                    self._neighbor_masks[index] |= 1 << (7 - bit)
+                else:
+                    self._neighbor_masks[index] &= ~(1 << (7 - bit)) & 0xFF
+
     def _update_source_node_distances(self):
         assert self._source is not None, f'Source node must be defined.'
         assert self._target is not None, f'Target node must be defined.'
@@ -90,6 +356,6 @@ class Board:
 
     def __str__(self):
         s = ''
-        for row in self._board:
+        for row in self.board:
             s += f'{row.__repr__()}\n'
         return s
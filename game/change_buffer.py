@@ -0,0 +1,103 @@
+import math
+from array import array
+from typing import Callable
+
+
+class ChangeBuffer:
+    """
+    ring buffer of change records, (cell index, state code, distance to source, distance to target), kept in
+    arrays allocated once. a search appends a record for every cell it changes, and every reader keeps its own
+    cursor, the number of records written before its last read, and applies just the records written since.
+    a reader falling more than capacity records behind has lost records, read then returns None, and has to read
+    the board again instead. one writer and one reader may run on different threads, read copies the records
+    first and only applies them once it made sure the writer did not overwrite any of them meanwhile
+    """
+
+    def __init__(self, capacity: int = 1 << 16):
+        """
+        :param capacity: number of records kept, older ones are overwritten
+        """
+        assert capacity > 0, f'Capacity must be positive'
+
+        self._capacity: int = capacity
+        self._indices: array = array('q', [0]) * capacity
+        self._states: bytearray = bytearray(capacity)
+        # nan where the distance is not set
+        self._distances_to_source: array = array('d', [math.nan]) * capacity
+        self._distances_to_target: array = array('d', [math.nan]) * capacity
+        # number of records written so far, the position of the next record
+        self._written: int = 0
+
+    @property
+    def capacity(self) -> int:
+        return self._capacity
+
+    @property
+    def written(self) -> int:
+        """
+        :return: number of records written so far, the cursor of a reader that is up to date
+        """
+        return self._written
+
+    def append(self, index: int, state_code: int, distance_to_source: float, distance_to_target: float) -> None:
+        """
+        :param index: row * columns + column of the changed cell
+        :param state_code: new state of the cell, see game.node.node_state_codes
+        :param distance_to_source: new distance to source, None if not set
+        :param distance_to_target: new distance to target, None if not set
+        """
+        position = self._written % self._capacity
+        self._indices[position] = index
+        self._states[position] = state_code
+        self._distances_to_source[position] = math.nan if distance_to_source is None else distance_to_source
+        self._distances_to_target[position] = math.nan if distance_to_target is None else distance_to_target
+        # counted last so a reader on another thread never sees a record before it is complete
+        self._written += 1
+
+    def is_overrun(self, cursor: int) -> bool:
+        """
+        :return: True when records written after cursor were already overwritten
+        """
+        return self._written - cursor > self._capacity
+
+    def read(self, cursor: int, apply: Callable[[int, int, float, float], None]) -> int:
+        """
+        calls apply(index, state code, distance to source, distance to target) for every record written since
+        cursor, oldest first. distances that are not set are passed as None
+        :param cursor: cursor returned by the previous read, 0 for the first one
+        :param apply: called once per record
+        :return: cursor to pass to the next read, None without calling apply when records after cursor were
+                 overwritten before or while they were copied
+        """
+        written = self._written
+        capacity = self._capacity
+        if written - cursor > capacity:
+            return None
+
+        # copied in at most two pieces, the records may wrap around the end of the arrays
+        start = cursor % capacity
+        count = written - cursor
+        stop = min(start + count, capacity)
+        rest = count - (stop - start)
+        indices = self._indices[start:stop] + self._indices[:rest]
+        states = self._states[start:stop] + self._states[:rest]
+        distances_to_source = self._distances_to_source[start:stop] + self._distances_to_source[:rest]
+        distances_to_target = self._distances_to_target[start:stop] + self._distances_to_target[:rest]
+
+        # a writer on another thread may have overwritten copied records meanwhile, the one it is writing right now
+        # included, so the copies are only valid while that record still lies past them
+        if self._written + 1 - cursor > capacity:
+            return None
+
+        for index, state, distance_to_source, distance_to_target in zip(indices, states, distances_to_source,
+                                                                        distances_to_target):
+            apply(index, state,
+                  None if distance_to_source != distance_to_source else distance_to_source,
+                  None if distance_to_target != distance_to_target else distance_to_target)
+        return written
+
+    def clear(self) -> None:
+        """
+        drops every record, cursors of existing readers become invalid
+        """
+        self._written = 0
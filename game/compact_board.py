@@ -0,0 +1,158 @@
+import math
+from array import array
+from typing import List
+
+from game.board import Board
+from game.node import Node, NodeState, node_state_codes, node_states
+
+# maps a state code to 1 when the cell can be walked through and 0 when it is a wall
+_passable_table: bytes = bytes(node_state != NodeState.WALL for node_state in node_states).ljust(256, b'\x00')
+
+
+class CompactBoard(Board):
+    """
+    board storing one byte of state per cell instead of one Node object per cell.
+    distances are kept in parallel float arrays that are only allocated once a distance is written,
+    and get_node returns lightweight NodeView objects reading from and writing to those arrays
+    """
+
+    def __init__(self, rows: int, columns: int, states=None):
+        """
+        :param rows: number of rows
+        :param columns: number of columns
+        :param states: existing writable buffer of rows * columns state codes, such as a memoryview over shared
+                       memory, used in place instead of allocating a new open board
+        """
+        self._states: bytearray = states
+        self._distances_to_source: array = None
+        self._distances_to_target: array = None
+        super().__init__(rows=rows, columns=columns)
+
+    def _create_board(self) -> None:
+        if self._states is None:
+            self._states = bytearray(self._rows * self._columns)
+        assert len(self._states) == self._rows * self._columns, f'States buffer does not match the board size.'
+        return None
+
+    @property
+    def board(self) -> List[List[Node]]:
+        """
+        :return: rows x columns grid of node views. builds every view, so avoid on large boards
+        """
+        return [[self.get_node(row=row, column=column) for column in range(self._columns)]
+                for row in range(self._rows)]
+
+    @property
+    def states(self) -> bytearray:
+        """
+        :return: flat row major buffer of node state codes, see node_states
+        """
+        return self._states
+
+    def get_cell_states(self) -> bytearray:
+        """
+        :return: the state buffer of the board itself, not a copy
+        """
+        return self._states
+
+    def _write_cell_states(self, states) -> None:
+        self._states[:] = states
+
+    def get_distance_arrays(self) -> (array, array):
+        """
+        :return: the distance arrays of the board itself, not copies
+        """
+        return self._distances_to_source, self._distances_to_target
+
+    def set_distance_arrays(self, distances_to_source: array, distances_to_target: array) -> None:
+        """
+        uses the given arrays in place
+        """
+        for distances in (distances_to_source, distances_to_target):
+            assert distances is None or len(distances) == self._rows * self._columns, \
+                f'Distances do not match the board size.'
+
+        if distances_to_source is not None:
+            self._distances_to_source = distances_to_source
+        if distances_to_target is not None:
+            self._distances_to_target = distances_to_target
+
+    def get_node(self, row: int, column: int) -> Node:
+        return NodeView(board=self, x=row, y=column)
+
+    def get_passable_cells(self) -> bytearray:
+        if isinstance(self._states, bytearray):
+            return self._states.translate(_passable_table)
+        return bytearray(self._states).translate(_passable_table)
+
+    def _get_distance(self, distances: array, index: int) -> float:
+        if distances is None:
+            return None
+        distance = distances[index]
+        # nan marks a distance that has not been set
+        return None if distance != distance else distance
+
+    def _allocate_distances(self) -> array:
+        return array('d', [math.nan]) * (self._rows * self._columns)
+
+    def _set_distance_to_source(self, index: int, value: float) -> None:
+        if self._distances_to_source is None:
+            self._distances_to_source = self._allocate_distances()
+        self._distances_to_source[index] = math.nan if value is None else value
+
+    def _set_distance_to_target(self, index: int, value: float) -> None:
+        if self._distances_to_target is None:
+            self._distances_to_target = self._allocate_distances()
+        self._distances_to_target[index] = math.nan if value is None else value
+
+
+class NodeView(Node):
+    """
+    node backed by a CompactBoard cell. views are created on demand, so two views are equal when they
+    refer to the same cell of the same board
+    """
+    # _x and _y are slots of Node
+    __slots__ = ('_board', '_index')
+
+    def __init__(self, board: CompactBoard, x: int, y: int):
+        self._board: CompactBoard = board
+        self._x: int = x
+        self._y: int = y
+        self._index: int = x * board.columns + y
+
+    @property
+    def index(self) -> int:
+        """
+        :return: row major index of the cell this view refers to
+        """
+        return self._index
+
+    @property
+    def state(self) -> NodeState:
+        return node_states[self._board.states[self._index]]
+
+    @state.setter
+    def state(self, value: NodeState) -> None:
+        self._board.states[self._index] = node_state_codes[value]
+
+    @property
+    def distance_to_source(self) -> float:
+        return self._board._get_distance(self._board._distances_to_source, self._index)
+
+    @distance_to_source.setter
+    def distance_to_source(self, value: float) -> None:
+        self._board._set_distance_to_source(self._index, value)
+
+    @property
+    def distance_to_target(self) -> float:
+        return self._board._get_distance(self._board._distances_to_target, self._index)
+
+    @distance_to_target.setter
+    def distance_to_target(self, value: float) -> None:
+        self._board._set_distance_to_target(self._index, value)
+
+    def __eq__(self, other):
+        return isinstance(other, NodeView) and self._index == other._index and self._board is other._board
+
+    def __hash__(self):
+        return hash((self._x, self._y))
@@ -0,0 +1,228 @@
+import re
+from array import array
+from collections import deque
+from typing import List
+
+from game.node import neighbor_directions
+
+# bits of the ring directions 8-connected to each direction, so the walkable cells around a cell can be grouped
+_ring_adjacency: List[int] = [
+    sum(1 << other_bit for other_bit, (k, l) in enumerate(neighbor_directions)
+        if other_bit != bit and abs(i - k) <= 1 and abs(j - l) <= 1)
+    for bit, (i, j) in enumerate(neighbor_directions)]
+
+
+class ComponentLabels:
+    """
+    8-connected component of every cell of a board, so unreachable queries can be rejected without a search.
+    the labels are built with one union-find pass over the runs of walkable cells in every row. afterwards a wall
+    edit only touches what it has to: unblocking a cell merges the components around it, and blocking a cell only
+    searches its component when the walkable cells around it are no longer connected to each other.
+    a label is an id in a union-find forest, get_component resolves it to the id of the component
+    """
+
+    def __init__(self, board, labels=None, parents=None):
+        """
+        :param board: board to label, it calls set_passable for every later wall edit
+        :param labels: label of every cell as returned by get_buffers of the labels of a board with the same cells,
+                       such as a memoryview over shared memory, used in place together with parents instead of
+                       labelling the board again. labels used in place cannot grow, so the board must not be edited
+        :param parents: root of every label, from the same get_buffers call
+        """
+        self._columns: int = board.columns
+        self._neighbor_masks: bytearray = board.get_neighbor_masks()
+        self._neighbor_offsets: List[int] = [i * board.columns + j for i, j in neighbor_directions]
+        if labels is not None:
+            assert parents is not None, f'Labels need their parents'
+            assert len(labels) == board.rows * board.columns, f'Labels do not match the board size.'
+            self._parents: List[int] = parents
+            self._labels: array = labels
+        else:
+            self._parents: List[int] = []
+            self._labels: array = self._build_labels(rows=board.rows, passable=board.get_passable_cells())
+
+    @property
+    def component_count(self) -> int:
+        """
+        :return: number of components, counted over every cell
+        """
+        return len({self._find(label) for label in set(self._labels) if label >= 0})
+
+    def get_component(self, index: int) -> int:
+        """
+        :param index: row major index of a cell
+        :return: id of the component of the cell, -1 for walls
+        """
+        label = self._labels[index]
+        return -1 if label < 0 else self._find(label)
+
+    def is_connected(self, index: int, other_index: int) -> bool:
+        """
+        :param index: row major index of a cell
+        :param other_index: row major index of another cell
+        :return: True if both cells are walkable and in the same component
+        """
+        component = self.get_component(index)
+        return component >= 0 and component == self.get_component(other_index)
+
+    def get_buffers(self) -> (array, array):
+        """
+        :return: label of every cell and root of every label, the buffers to label another board with the same cells
+                 with, see __init__
+        """
+        return self._labels, array('i', (self._find(label) for label in range(len(self._parents))))
+
+    def set_passable(self, index: int, passable: bool) -> None:
+        """
+        updates the labels after a cell turned into a wall or back. expects the neighbor masks to be updated already
+        :param index: row major index of the cell
+        :param passable: whether the cell is walkable now
+        """
+        if passable:
+            self._join(index=index)
+        else:
+            self._split(index=index)
+
+    def _build_labels(self, rows: int, passable: bytearray) -> array:
+        columns = self._columns
+        parents = self._parents
+        row_runs: List[list] = []
+
+        previous_runs: list = []
+        for row in range(rows):
+            runs = []
+            overlap_start = 0
+            for match in re.finditer(b'\x01+', passable[row * columns:(row + 1) * columns]):
+                start, stop = match.span()
+                label = len(parents)
+                parents.append(label)
+
+                # runs of the previous row touching [start - 1, stop] are 8-connected to this one
+                while overlap_start < len(previous_runs) and previous_runs[overlap_start][1] < start:
+                    overlap_start += 1
+                overlap = overlap_start
+                while overlap < len(previous_runs) and previous_runs[overlap][0] <= stop:
+                    self._union(label, previous_runs[overlap][2])
+                    overlap += 1
+
+                runs.append((start, stop, label))
+            row_runs.append(runs)
+            previous_runs = runs
+
+        labels = array('i', [-1]) * (rows * columns)
+        for row, runs in enumerate(row_runs):
+            for start, stop, label in runs:
+                labels[row * columns + start:row * columns + stop] = array('i', [self._find(label)]) * (stop - start)
+        return labels
+
+    def _join(self, index: int) -> None:
+        mask = self._neighbor_masks[index]
+        roots = {self._find(self._labels[index + offset])
+                 for bit, offset in enumerate(self._neighbor_offsets) if mask >> bit & 1}
+
+        if roots:
+            label = roots.pop()
+            for root in roots:
+                self._parents[root] = label
+        else:
+            label = len(self._parents)
+            self._parents.append(label)
+
+        self._labels[index] = label
+
+    def _split(self, index: int) -> None:
+        self._labels[index] = -1
+
+        # group the walkable cells around the blocked one by their connections inside the ring
+        mask = self._neighbor_masks[index]
+        seeds = []
+        remaining = mask
+        while remaining:
+            group = remaining & -remaining
+            grown = 0
+            while group != grown:
+                grown = group
+                for bit in range(8):
+                    if group >> bit & 1:
+                        group |= _ring_adjacency[bit] & mask
+            remaining &= ~group
+            seeds.append(index + self._neighbor_offsets[(group & -group).bit_length() - 1])
+
+        # a single group keeps its detour around the blocked cell, so the component cannot have split
+        if len(seeds) > 1:
+            self._relabel(seeds=seeds)
+
+    def _relabel(self, seeds: List[int]) -> None:
+        """
+        runs one breadth first search per seed in lockstep and merges searches that meet. every search that runs
+        out of cells on its own has found a piece that was cut off and gets a fresh label. the last search still
+        running is the largest piece and keeps the old label, so the work is bounded by the smaller pieces
+        :param seeds: walkable cells around the blocked cell, one per ring group
+        """
+        labels = self._labels
+        neighbor_masks = self._neighbor_masks
+        neighbor_offsets = self._neighbor_offsets
+
+        owners = {seed: number for number, seed in enumerate(seeds)}
+        searches = list(range(len(seeds)))
+        frontiers = [deque([seed]) for seed in seeds]
+        cells = [[seed] for seed in seeds]
+        active = set(searches)
+
+        def find_search(number: int) -> int:
+            while searches[number] != number:
+                number = searches[number]
+            return number
+
+        while len(active) > 1:
+            for number in list(active):
+                if number not in active:
+                    continue
+
+                frontier = frontiers[number]
+                if not frontier:
+                    label = len(self._parents)
+                    self._parents.append(label)
+                    for cell in cells[number]:
+                        labels[cell] = label
+                    active.discard(number)
+                    continue
+
+                cell = frontier.popleft()
+                mask = neighbor_masks[cell]
+                for bit, offset in enumerate(neighbor_offsets):
+                    if not mask >> bit & 1:
+                        continue
+                    neighbor = cell + offset
+                    owner = owners.get(neighbor)
+                    if owner is None:
+                        owners[neighbor] = number
+                        frontier.append(neighbor)
+                        cells[number].append(neighbor)
+                        continue
+
+                    # two searches met, they are exploring the same piece
+                    owner = find_search(owner)
+                    if owner != number:
+                        searches[owner] = number
+                        frontier.extend(frontiers[owner])
+                        cells[number].extend(cells[owner])
+                        frontiers[owner] = None
+                        cells[owner] = None
+                        active.discard(owner)
+
+    def _find(self, label: int) -> int:
+        parents = self._parents
+        while parents[label] != label:
+            grandparent = parents[parents[label]]
+            # only written when it shortens the path, labels used in place may be shared between processes
+            if parents[label] != grandparent:
+                parents[label] = grandparent
+            label = grandparent
+        return label
+
+    def _union(self, label: int, other_label: int) -> None:
+        root = self._find(label)
+        other_root = self._find(other_label)
+        if root != other_root:
+            self._parents[max(root, other_root)] = min(root, other_root)
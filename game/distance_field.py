@@ -0,0 +1,205 @@
+import heapq
+import math
+import time
+from array import array
+from collections import OrderedDict
+from typing import List, Tuple
+
+from game.a_star import IndexAStar
+from game.board import Board
+from game.search import SearchResult
+
+
+class DistanceField:
+    """
+    shortest distance to one target from every cell of a board, and the next cell to step to on the way there.
+    built by a single dijkstra search backwards from the target, afterwards any source is answered by walking the
+    next hops, which costs O(path length). indices are row * columns + column
+    """
+
+    def __init__(self, board: Board, target: Tuple[int, int], connectivity: int = 8):
+        """
+        :param board: board to search, left untouched
+        :param target: (row, column) every distance is measured to
+        :param connectivity: 8 to allow diagonal steps, 4 for horizontal and vertical steps only
+        """
+        assert connectivity in (4, 8), f'Connectivity must be 4 or 8'
+        assert 0 <= target[0] < board.rows and 0 <= target[1] < board.columns, f'{target} is out of bounds.'
+
+        self._columns: int = board.columns
+        self._target: int = target[0] * board.columns + target[1]
+
+        size = board.rows * board.columns
+        self._distances: array = array('d', [math.inf]) * size
+        self._next_hops: array = array('i', [-1]) * size
+        if board.get_passable_cells()[self._target]:
+            self._build(neighbor_masks=board.get_neighbor_masks(),
+                        neighbor_table=IndexAStar._get_neighbor_table(columns=board.columns,
+                                                                      connectivity=connectivity),
+                        weights=board.get_weights())
+
+    @property
+    def target(self) -> int:
+        return self._target
+
+    @property
+    def nbytes(self) -> int:
+        """
+        :return: memory held by the distance and next hop arrays
+        """
+        return len(self._distances) * self._distances.itemsize + len(self._next_hops) * self._next_hops.itemsize
+
+    def get_distance(self, source: int) -> float:
+        """
+        :param source: cell index to start from
+        :return: length of the shortest path from source to target, None if there is none
+        """
+        distance = self._distances[source]
+        return None if distance == math.inf else distance
+
+    def get_path(self, source: int) -> List[int]:
+        """
+        :param source: cell index to start from
+        :return: cell indices of the path from source to target, both excluded, in walking order
+        """
+        assert self.get_distance(source=source) is not None, 'No path found'
+
+        next_hops = self._next_hops
+        path = []
+        index = next_hops[source]
+        while index != self._target and index >= 0:
+            path.append(index)
+            index = next_hops[index]
+        return path
+
+    def _build(self, neighbor_masks: bytearray, neighbor_table: List[list], weights) -> None:
+        """
+        dijkstra from target to every reachable cell, steps cost the same in both directions
+        :param weights: cell weights of a weighted board, None if every cell weighs 1
+        """
+        distances = self._distances
+        next_hops = self._next_hops
+        closed = bytearray(len(distances))
+        heappush = heapq.heappush
+        heappop = heapq.heappop
+
+        distances[self._target] = 0.0
+        open_nodes = [(0.0, self._target)]
+        while open_nodes:
+            distance, current = heappop(open_nodes)
+            # stale entry left behind by an improved distance
+            if closed[current]:
+                continue
+            closed[current] = 1
+
+            if weights is not None:
+                current_weight = weights[current]
+            for offset, step in neighbor_table[neighbor_masks[current]]:
+                neighbor = current + offset
+                if weights is not None:
+                    step = step * (current_weight + weights[neighbor]) * 0.5
+                candidate_distance = distance + step
+                if candidate_distance < distances[neighbor]:
+                    distances[neighbor] = candidate_distance
+                    next_hops[neighbor] = current
+                    heappush(open_nodes, (candidate_distance, neighbor))
+
+
+class DistanceFieldCache:
+    """
+    answers many-to-one queries from distance fields, kept in a least recently used cache keyed on
+    (board version, target, connectivity). the fields of the least recently used targets are dropped once the
+    cache holds more than the memory budget. every edit bumps the board version, so older fields are never served
+    again and are dropped on the next lookup, wall edits drop them right away
+    """
+
+    def __init__(self, board: Board, memory_budget: int = 256 * 2 ** 20):
+        """
+        :param board: board to search
+        :param memory_budget: bytes the cached fields may hold together, a field larger than this is built but not
+                              cached
+        """
+        self._board: Board = board
+        self._memory_budget: int = memory_budget
+        self._fields: OrderedDict = OrderedDict()
+        self._nbytes: int = 0
+        board.add_wall_listener(self._on_wall_changed)
+        board.add_reset_listener(self.clear)
+
+    @property
+    def nbytes(self) -> int:
+        """
+        :return: memory held by the cached fields
+        """
+        return self._nbytes
+
+    def __len__(self):
+        return len(self._fields)
+
+    def get_field(self, target: Tuple[int, int], connectivity: int = 8) -> DistanceField:
+        """
+        :param target: (row, column) of the target
+        :param connectivity: 8 to allow diagonal steps, 4 for horizontal and vertical steps only
+        :return: distance field of the target on the current board, built on a cache miss
+        """
+        version = self._board.version
+        if self._fields and next(iter(self._fields))[0] != version:
+            self._drop_stale_fields(version=version)
+
+        key = (version, target, connectivity)
+        field = self._fields.get(key)
+        if field is not None:
+            self._fields.move_to_end(key)
+            return field
+
+        field = DistanceField(board=self._board, target=target, connectivity=connectivity)
+        if field.nbytes <= self._memory_budget:
+            while self._nbytes + field.nbytes > self._memory_budget:
+                _, evicted = self._fields.popitem(last=False)
+                self._nbytes -= evicted.nbytes
+            self._fields[key] = field
+            self._nbytes += field.nbytes
+        return field
+
+    def find_path(self, source: Tuple[int, int], target: Tuple[int, int], connectivity: int = 8) -> SearchResult:
+        """
+        :param source: (row, column) to start from
+        :param target: (row, column) to find a path to
+        :param connectivity: 8 to allow diagonal steps, 4 for horizontal and vertical steps only
+        :return: path walked along the distance field of target. expanded and discovered are 0, the search is paid
+                 for once when the field is built
+        """
+        assert 0 <= source[0] < self._board.rows and 0 <= source[1] < self._board.columns, \
+            f'{source} is out of bounds.'
+
+        start = time.perf_counter()
+        field = self.get_field(target=target, connectivity=connectivity)
+        source_index = source[0] * self._board.columns + source[1]
+        distance = field.get_distance(source=source_index)
+
+        path = []
+        if distance is not None:
+            path.append(source)
+            if source != target:
+                path.extend(divmod(index, self._board.columns) for index in field.get_path(source=source_index))
+                path.append(target)
+        return SearchResult(path=path, distance=distance, expanded=0, discovered=0,
+                            seconds=time.perf_counter() - start)
+
+    def clear(self) -> None:
+        self._fields.clear()
+        self._nbytes = 0
+
+    def close(self) -> None:
+        """
+        stops listening to wall edits of the board
+        """
+        self._board.remove_wall_listener(self._on_wall_changed)
+        self._board.remove_reset_listener(self.clear)
+
+    def _drop_stale_fields(self, version: int) -> None:
+        for key in [key for key in self._fields if key[0] != version]:
+            self._nbytes -= self._fields.pop(key).nbytes
+
+    def _on_wall_changed(self, row: int, column: int, passable: bool) -> None:
+        self.clear()
@@ -0,0 +1,153 @@
+import math
+import threading
+from array import array
+from collections import OrderedDict
+from typing import List, Tuple
+
+_diagonal_surplus = math.sqrt(2) - 1
+
+
+def euclidean(row_distance: int, column_distance: int) -> float:
+    """
+    :param row_distance: difference between the rows of two cells
+    :param column_distance: difference between the columns of two cells
+    :return: straight line distance, admissible for 8-connected and 4-connected moves
+    """
+    return math.sqrt(row_distance ** 2 + column_distance ** 2)
+
+
+def manhattan(row_distance: int, column_distance: int) -> float:
+    """
+    :param row_distance: difference between the rows of two cells
+    :param column_distance: difference between the columns of two cells
+    :return: number of straight steps, admissible for 4-connected moves only
+    """
+    return abs(row_distance) + abs(column_distance)
+
+
+def octile(row_distance: int, column_distance: int) -> float:
+    """
+    :param row_distance: difference between the rows of two cells
+    :param column_distance: difference between the columns of two cells
+    :return: length of the shortest 8-connected path on an open board
+    """
+    row_distance = abs(row_distance)
+    column_distance = abs(column_distance)
+    if row_distance < column_distance:
+        return column_distance + _diagonal_surplus * row_distance
+    return row_distance + _diagonal_surplus * column_distance
+
+
+def chebyshev(row_distance: int, column_distance: int) -> float:
+    """
+    :param row_distance: difference between the rows of two cells
+    :param column_distance: difference between the columns of two cells
+    :return: number of 8-connected steps on an open board, each step counted as 1
+    """
+    return max(abs(row_distance), abs(column_distance))
+
+
+heuristics = {
+    'euclidean': euclidean,
+    'manhattan': manhattan,
+    'octile': octile,
+    'chebyshev': chebyshev,
+}
+
+
+# whole rows of heuristic values for a fixed row distance and column distances 0, 1, ..., length - 1, with the same
+# arithmetic as the functions above so both give identical floats
+_row_builders = {
+    'euclidean': lambda row_distance, length: [math.sqrt(row_distance ** 2 + column_distance ** 2)
+                                               for column_distance in range(length)],
+    'manhattan': lambda row_distance, length: [row_distance + column_distance for column_distance in range(length)],
+    'octile': lambda row_distance, length: [column_distance + _diagonal_surplus * row_distance
+                                            if row_distance < column_distance
+                                            else row_distance + _diagonal_surplus * column_distance
+                                            for column_distance in range(length)],
+    'chebyshev': lambda row_distance, length: [column_distance if row_distance < column_distance else row_distance
+                                               for column_distance in range(length)],
+}
+
+
+# fields of the most recently used targets, least recently used first, see get_heuristic_field. the cache is
+# bounded by the bytes the fields hold, a field takes 8 bytes per cell
+_field_cache: OrderedDict = OrderedDict()
+_field_cache_options = {
+    'max_bytes': 64 << 20,
+}
+_field_cache_lock: threading.Lock = threading.Lock()
+
+
+def get_heuristic_field(heuristic: str, rows: int, columns: int, target: Tuple[int, int]) -> array:
+    """
+    heuristic value of every cell for one target, so searches towards the same target look values up instead of
+    computing them. values only depend on the row and column distance, so one row of values is built per row
+    distance, mirrored around the target column and shared by the rows at that distance above and below the
+    target. the fields of the most recent targets are cached as long as they hold no more than
+    set_heuristic_field_cache_size allows together, treat the returned array as read only
+    :param heuristic: one of the keys of heuristics
+    :param rows: number of rows of the board
+    :param columns: number of columns of the board
+    :param target: (row, column) the heuristic estimates the distance to
+    :return: flat row major array of heuristic values
+    """
+    assert heuristic in heuristics, f'Unknown heuristic {heuristic}'
+    key = (heuristic, rows, columns, tuple(target))
+    with _field_cache_lock:
+        field = _field_cache.get(key)
+        if field is not None:
+            _field_cache.move_to_end(key)
+            return field
+
+    field = _build_heuristic_field(heuristic=heuristic, rows=rows, columns=columns, target=target)
+    with _field_cache_lock:
+        # a field larger than the whole cache would only evict the others
+        if len(field) * field.itemsize <= _field_cache_options['max_bytes']:
+            _field_cache[key] = field
+            _evict_heuristic_fields()
+    return field
+
+
+def set_heuristic_field_cache_size(max_bytes: int) -> None:
+    """
+    :param max_bytes: bytes the cached heuristic fields may hold together, 0 to cache none. fields larger than
+                      that are built for every call
+    """
+    assert max_bytes >= 0, f'Cache size must not be negative'
+    with _field_cache_lock:
+        _field_cache_options['max_bytes'] = max_bytes
+        _evict_heuristic_fields()
+
+
+def clear_heuristic_fields() -> None:
+    with _field_cache_lock:
+        _field_cache.clear()
+
+
+def _evict_heuristic_fields() -> None:
+    """
+    drops the least recently used fields until the cache is within its size, expects _field_cache_lock to be held
+    """
+    cached_bytes = sum(len(field) * field.itemsize for field in _field_cache.values())
+    while _field_cache and cached_bytes > _field_cache_options['max_bytes']:
+        _, field = _field_cache.popitem(last=False)
+        cached_bytes -= len(field) * field.itemsize
+
+
+def _build_heuristic_field(heuristic: str, rows: int, columns: int, target: Tuple[int, int]) -> array:
+    target_row, target_column = target
+    build_row = _row_builders[heuristic]
+    length = max(target_column, columns - 1 - target_column) + 1
+
+    lines: List[array] = [None] * (max(target_row, rows - 1 - target_row) + 1)
+    field = array('d')
+    for row in range(rows):
+        row_distance = abs(row - target_row)
+        line = lines[row_distance]
+        if line is None:
+            values = array('d', build_row(row_distance, length))
+            line = lines[row_distance] = values[target_column:0:-1] + values[:columns - target_column]
+        field += line
+
+    return field
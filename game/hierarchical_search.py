@@ -0,0 +1,398 @@
+import heapq
+import math
+import time
+from typing import Dict, List, Set, Tuple
+
+from game.board import Board
+from game.heuristic import octile
+from game.node import neighbor_directions
+from game.search import SearchResult
+
+
+class HierarchicalPathfinder:
+    """
+    hierarchical A* (HPA*) for 8-connected boards. the board is split into square clusters, and every stretch of
+    walkable cells along the border of two clusters becomes an entrance: one pair of transition cells in the
+    middle, or one at each end for long stretches. diagonal steps across a border or a cluster corner that no
+    entrance covers become a transition of their own, so every path on the board maps onto the abstract graph.
+    transitions of the same cluster are joined by their shortest distance inside the cluster. those intra-cluster
+    edges are computed the first time a search reaches the cluster, or up front by build, and cached.
+    a query connects source and target to the transitions of their clusters, searches the abstract graph and
+    refines every abstract edge into cells with a search confined to one cluster. paths are close to, but not
+    always exactly, optimal. wall edits made through the board only rebuild the affected clusters, call close to
+    stop listening to them
+    """
+
+    # stretches at least this long get a transition at both ends instead of one in the middle
+    _long_entrance = 6
+
+    def __init__(self, board: Board, cluster_size: int = 32):
+        """
+        :param board: board to search
+        :param cluster_size: number of rows and columns of a cluster
+        """
+        assert cluster_size >= 2, f'Cluster size must be at least 2'
+        assert board.get_weights() is None, f'Hierarchical search needs a board without cell weights'
+
+        self._board: Board = board
+        self._rows: int = board.rows
+        self._columns: int = board.columns
+        self._cluster_size: int = cluster_size
+        self._cluster_rows: int = -(-board.rows // cluster_size)
+        self._cluster_columns: int = -(-board.columns // cluster_size)
+        self._passable: bytearray = board.get_passable_cells()
+        self._neighbor_masks: bytearray = board.get_neighbor_masks()
+
+        # (index offset, step length, row offset, column offset) of the neighbors flagged in a neighbor mask
+        steps = [(i * board.columns + j, math.sqrt(i ** 2 + j ** 2), i, j) for i, j in neighbor_directions]
+        self._neighbor_table: List[list] = [[steps[bit] for bit in range(8) if mask >> bit & 1] for mask in range(256)]
+
+        # transition pairs of every border, keyed by (kind, cluster row, cluster column), see _get_border_keys
+        self._borders: Dict[tuple, List[Tuple[int, int]]] = {}
+        # transition cells of every cluster and the edges leaving them towards other clusters
+        self._cluster_nodes: Dict[int, Set[int]] = {}
+        self._inter_edges: Dict[int, List[Tuple[int, float]]] = {}
+        # edges between the transitions of a cluster, None until first needed
+        self._intra_edges: Dict[int, Dict[int, List[Tuple[int, float]]]] = {}
+
+        for cluster_row in range(self._cluster_rows):
+            for cluster_column in range(self._cluster_columns):
+                for key in self._get_border_keys(cluster_row=cluster_row, cluster_column=cluster_column):
+                    if key not in self._borders:
+                        self._borders[key] = self._find_transitions(key=key)
+        for cluster in range(self._cluster_rows * self._cluster_columns):
+            self._refresh_cluster(cluster=cluster)
+        board.add_wall_listener(self._on_wall_changed)
+        board.add_reset_listener(self._on_cells_reset)
+
+    @property
+    def cluster_size(self) -> int:
+        return self._cluster_size
+
+    @property
+    def node_count(self) -> int:
+        """
+        :return: number of transition cells in the abstract graph
+        """
+        return len(self._inter_edges)
+
+    def build(self) -> None:
+        """
+        computes the intra-cluster edges of every cluster up front instead of on first use
+        """
+        for cluster in range(self._cluster_rows * self._cluster_columns):
+            self._get_intra_edges(cluster=cluster)
+
+    def close(self) -> None:
+        """
+        stops listening to wall edits of the board
+        """
+        self._board.remove_wall_listener(self._on_wall_changed)
+        self._board.remove_reset_listener(self._on_cells_reset)
+
+    def _on_wall_changed(self, row: int, column: int, passable: bool) -> None:
+        """
+        rebuilds the cluster of a cell after its wall state changed. the clusters across a border only get rebuilt
+        when the entrances on that border changed
+        """
+        self._passable[row * self._columns + column] = passable
+
+        cluster_row = row // self._cluster_size
+        cluster_column = column // self._cluster_size
+        clusters = {cluster_row * self._cluster_columns + cluster_column}
+        for key in self._get_border_keys(cluster_row=cluster_row, cluster_column=cluster_column):
+            transitions = self._find_transitions(key=key)
+            if transitions != self._borders[key]:
+                self._borders[key] = transitions
+                clusters.update(self._get_cluster(cell=cell) for pair in transitions for cell in pair)
+                clusters.update(self._get_border_clusters(key=key))
+
+        for cluster in clusters:
+            self._refresh_cluster(cluster=cluster)
+
+    def _on_cells_reset(self) -> None:
+        """
+        rebuilds every border and cluster after the board changed its walls all at once
+        """
+        self._passable[:] = self._board.get_passable_cells()
+        for key in self._borders:
+            self._borders[key] = self._find_transitions(key=key)
+        for cluster in range(self._cluster_rows * self._cluster_columns):
+            self._refresh_cluster(cluster=cluster)
+
+    def find_path(self, source: Tuple[int, int], target: Tuple[int, int]) -> SearchResult:
+        """
+        :param source: (row, column) to start from
+        :param target: (row, column) to find a path to
+        :return: refined path, its distance and the number of abstract nodes expanded
+        """
+        assert self._board.get_weights() is None, f'Hierarchical search needs a board without cell weights'
+        start = time.perf_counter()
+        if not self._board.is_reachable(source=source, target=target):
+            return SearchResult(path=[], distance=None, expanded=0, discovered=0,
+                                seconds=time.perf_counter() - start)
+
+        source_index = source[0] * self._columns + source[1]
+        target_index = target[0] * self._columns + target[1]
+        source_cluster = self._get_cluster(cell=source_index)
+        target_cluster = self._get_cluster(cell=target_index)
+
+        # connect source and target to the transitions of their clusters
+        source_distances, source_came_from = self._search_cluster(
+            start=source_index, cluster=source_cluster, goals=self._cluster_nodes[source_cluster] | {target_index})
+        target_distances, target_came_from = self._search_cluster(
+            start=target_index, cluster=target_cluster, goals=self._cluster_nodes[target_cluster])
+
+        abstract_path, distance, expanded = self._search_abstract_graph(
+            source=source_index, target=target_index, target_cluster=target_cluster,
+            source_distances=source_distances, target_distances=target_distances)
+
+        # refine every abstract edge into the cells it stands for
+        cells = [source_index]
+        for current, following in zip(abstract_path, abstract_path[1:]):
+            if current == source_index and following in source_came_from:
+                segment = self._walk_back(came_from=source_came_from, start=source_index, stop=following)
+            elif following == target_index and current in target_came_from:
+                segment = self._walk_back(came_from=target_came_from, start=target_index, stop=current)
+                segment = segment[-2::-1] + [target_index]
+            elif self._get_cluster(cell=current) != self._get_cluster(cell=following):
+                segment = [following]
+            else:
+                _, came_from = self._search_cluster(start=current, cluster=self._get_cluster(cell=current),
+                                                    goals={following})
+                segment = self._walk_back(came_from=came_from, start=current, stop=following)
+            cells.extend(segment)
+
+        return SearchResult(path=[divmod(cell, self._columns) for cell in cells], distance=distance,
+                            expanded=expanded, discovered=len(abstract_path), seconds=time.perf_counter() - start)
+
+    def _search_abstract_graph(self, source: int, target: int, target_cluster: int, source_distances: dict,
+                               target_distances: dict) -> (List[int], float, int):
+        """
+        :return: abstract nodes from source to target, the path distance and the number of expanded nodes
+        """
+        target_row, target_column = divmod(target, self._columns)
+        distances_to_source = {source: 0.0}
+        came_from = {}
+        closed = set()
+        open_nodes = [(0.0, 0, source)]
+        count = 1
+
+        while open_nodes:
+            _, _, current = heapq.heappop(open_nodes)
+            if current in closed:
+                continue
+            if current == target:
+                break
+            closed.add(current)
+
+            if current == source:
+                edges = [(node, distance) for node, distance in source_distances.items()
+                         if node in self._inter_edges or node == target]
+            else:
+                edges = self._get_intra_edges(cluster=self._get_cluster(cell=current)).get(current, [])
+                if self._get_cluster(cell=current) == target_cluster and current in target_distances:
+                    edges = edges + [(target, target_distances[current])]
+            edges = edges + self._inter_edges.get(current, [])
+
+            current_distance = distances_to_source[current]
+            for node, distance in edges:
+                candidate_distance_to_source = current_distance + distance
+                if node not in closed and candidate_distance_to_source < distances_to_source.get(node, math.inf):
+                    distances_to_source[node] = candidate_distance_to_source
+                    came_from[node] = current
+                    node_row, node_column = divmod(node, self._columns)
+                    distance_to_target = octile(node_row - target_row, node_column - target_column)
+                    heapq.heappush(open_nodes, (candidate_distance_to_source + distance_to_target, count, node))
+                    count += 1
+
+        path = [target]
+        while path[-1] != source:
+            path.append(came_from[path[-1]])
+        path.reverse()
+        return path, distances_to_source[target], len(closed)
+
+    def _search_cluster(self, start: int, cluster: int, goals: Set[int]) -> (dict, dict):
+        """
+        dijkstra confined to one cluster, stops once every reachable goal is settled
+        :param start: cell to search from
+        :param cluster: cluster the search may not leave
+        :param goals: cells to find distances to
+        :return: distance of every settled goal and the parent of every discovered cell
+        """
+        cluster_row, cluster_column = divmod(cluster, self._cluster_columns)
+        first_row = cluster_row * self._cluster_size
+        stop_row = min(first_row + self._cluster_size, self._rows)
+        first_column = cluster_column * self._cluster_size
+        stop_column = min(first_column + self._cluster_size, self._columns)
+        columns = self._columns
+        neighbor_masks = self._neighbor_masks
+        neighbor_table = self._neighbor_table
+
+        remaining = set(goals)
+        remaining.discard(start)
+        goal_distances = {start: 0.0} if start in goals else {}
+        distances = {start: 0.0}
+        came_from = {}
+        closed = set()
+        open_nodes = [(0.0, start)]
+
+        while open_nodes and remaining:
+            distance, current = heapq.heappop(open_nodes)
+            if current in closed:
+                continue
+            closed.add(current)
+            if current in remaining:
+                remaining.discard(current)
+                goal_distances[current] = distance
+
+            row, column = divmod(current, columns)
+            for offset, step, i, j in neighbor_table[neighbor_masks[current]]:
+                if not (first_row <= row + i < stop_row and first_column <= column + j < stop_column):
+                    continue
+                neighbor = current + offset
+                candidate_distance = distance + step
+                if neighbor not in closed and candidate_distance < distances.get(neighbor, math.inf):
+                    distances[neighbor] = candidate_distance
+                    came_from[neighbor] = current
+                    heapq.heappush(open_nodes, (candidate_distance, neighbor))
+
+        return goal_distances, came_from
+
+    def _get_intra_edges(self, cluster: int) -> Dict[int, List[Tuple[int, float]]]:
+        intra_edges = self._intra_edges.get(cluster)
+        if intra_edges is None:
+            nodes = self._cluster_nodes[cluster]
+            intra_edges = self._intra_edges[cluster] = {}
+            for node in nodes:
+                distances, _ = self._search_cluster(start=node, cluster=cluster, goals=nodes)
+                intra_edges[node] = [(other, distance) for other, distance in distances.items() if other != node]
+        return intra_edges
+
+    def _refresh_cluster(self, cluster: int) -> None:
+        """
+        recollects the transitions of a cluster and their inter-cluster edges from the borders around it,
+        and drops its intra-cluster edges
+        """
+        for node in self._cluster_nodes.get(cluster, ()):
+            self._inter_edges.pop(node, None)
+
+        nodes = set()
+        cluster_row, cluster_column = divmod(cluster, self._cluster_columns)
+        for key in self._get_border_keys(cluster_row=cluster_row, cluster_column=cluster_column):
+            for pair in self._borders[key]:
+                node, other = pair if self._get_cluster(cell=pair[0]) == cluster else pair[::-1]
+                other_row, other_column = divmod(other, self._columns)
+                node_row, node_column = divmod(node, self._columns)
+                step = math.sqrt((other_row - node_row) ** 2 + (other_column - node_column) ** 2)
+                self._inter_edges.setdefault(node, []).append((other, step))
+                nodes.add(node)
+
+        self._cluster_nodes[cluster] = nodes
+        self._intra_edges[cluster] = None
+
+    def _get_border_keys(self, cluster_row: int, cluster_column: int) -> List[tuple]:
+        """
+        borders are keyed by kind and the cluster they start from: "vertical" borders lie between (r, c) and
+        (r, c + 1), "horizontal" ones between (r, c) and (r + 1, c), "diagonal" corners between (r, c) and
+        (r + 1, c + 1) and "anti_diagonal" corners between (r, c + 1) and (r + 1, c)
+        :return: keys of every border the cluster lies on
+        """
+        keys = [('vertical', cluster_row, cluster_column - 1), ('vertical', cluster_row, cluster_column),
+                ('horizontal', cluster_row - 1, cluster_column), ('horizontal', cluster_row, cluster_column),
+                ('diagonal', cluster_row - 1, cluster_column - 1), ('diagonal', cluster_row, cluster_column),
+                ('anti_diagonal', cluster_row - 1, cluster_column), ('anti_diagonal', cluster_row, cluster_column - 1)]
+        return [key for key in keys if self._is_border(key=key)]
+
+    def _is_border(self, key: tuple) -> bool:
+        kind, cluster_row, cluster_column = key
+        last_row = cluster_row + (kind != 'vertical')
+        last_column = cluster_column + (kind != 'horizontal')
+        return 0 <= cluster_row and 0 <= cluster_column \
+            and last_row < self._cluster_rows and last_column < self._cluster_columns
+
+    def _get_border_clusters(self, key: tuple) -> Tuple[int, int]:
+        kind, cluster_row, cluster_column = key
+        cluster = cluster_row * self._cluster_columns + cluster_column
+        if kind == 'vertical':
+            return cluster, cluster + 1
+        if kind == 'horizontal':
+            return cluster, cluster + self._cluster_columns
+        if kind == 'diagonal':
+            return cluster, cluster + self._cluster_columns + 1
+        return cluster + 1, cluster + self._cluster_columns
+
+    def _find_transitions(self, key: tuple) -> List[Tuple[int, int]]:
+        """
+        :param key: border key, see _get_border_keys
+        :return: (cell, cell across the border) of every transition on the border
+        """
+        kind, cluster_row, cluster_column = key
+        size = self._cluster_size
+        columns = self._columns
+        passable = self._passable
+
+        # corners only allow a single diagonal step
+        if kind in ('diagonal', 'anti_diagonal'):
+            row = (cluster_row + 1) * size - 1
+            column = (cluster_column + 1) * size - 1
+            if kind == 'diagonal':
+                pair = (row * columns + column, (row + 1) * columns + column + 1)
+            else:
+                pair = (row * columns + column + 1, (row + 1) * columns + column)
+            return [pair] if passable[pair[0]] and passable[pair[1]] else []
+
+        # walk along the border, across is the index offset from a cell to the facing cell of the other cluster
+        if kind == 'vertical':
+            first = cluster_row * size * columns + (cluster_column + 1) * size - 1
+            along, across = columns, 1
+            length = min(size, self._rows - cluster_row * size)
+        else:
+            first = ((cluster_row + 1) * size - 1) * columns + cluster_column * size
+            along, across = 1, columns
+            length = min(size, self._columns - cluster_column * size)
+        cells = [first + position * along for position in range(length)]
+        straight = [passable[cell] and passable[cell + across] for cell in cells]
+
+        transitions = []
+        run_start = None
+        for position in range(length + 1):
+            if position < length and straight[position]:
+                if run_start is None:
+                    run_start = position
+                continue
+            if run_start is not None:
+                if position - run_start >= self._long_entrance:
+                    transitions.append((cells[run_start], cells[run_start] + across))
+                    transitions.append((cells[position - 1], cells[position - 1] + across))
+                else:
+                    middle = cells[(run_start + position - 1) // 2]
+                    transitions.append((middle, middle + across))
+                run_start = None
+
+        # diagonal steps between neighboring rows of a stretch are already covered by its transitions
+        for position in range(length - 1):
+            if straight[position] and straight[position + 1]:
+                continue
+            cell = cells[position]
+            for pair in ((cell, cell + along + across), (cell + along, cell + across)):
+                if passable[pair[0]] and passable[pair[1]]:
+                    transitions.append(pair)
+
+        return transitions
+
+    def _get_cluster(self, cell: int) -> int:
+        row, column = divmod(cell, self._columns)
+        return row // self._cluster_size * self._cluster_columns + column // self._cluster_size
+
+    @staticmethod
+    def _walk_back(came_from: dict, start: int, stop: int) -> List[int]:
+        """
+        :return: cells from the one after start up to stop, following came_from backwards from stop
+        """
+        cells = [stop]
+        while cells[-1] != start:
+            cells.append(came_from[cells[-1]])
+        cells.pop()
+        cells.reverse()
+        return cells
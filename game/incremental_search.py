@@ -0,0 +1,265 @@
+import heapq
+import math
+from array import array
+from typing import Dict, List, Tuple
+
+from game.a_star import IndexAStar
+from game.board import Board
+from game.heuristic import heuristics
+
+
+class DStarLite:
+    """
+    D* Lite planner that keeps its search alive between queries. it searches backwards from target to source and
+    subscribes to the wall edits of the board, so after walls change search only repairs the g and rhs values
+    of the cells whose shortest distance to target actually changed instead of starting over. the source may move
+    along the path between searches, as an agent walking to the target would.
+    indices are row * columns + column, call close to stop listening to the board
+    """
+
+    # first keys closer than this count as ties
+    _tolerance = 1e-9
+
+    def __init__(self, board: Board, source: Tuple[int, int] = None, target: Tuple[int, int] = None,
+                 connectivity: int = 8, heuristic: str = 'euclidean'):
+        """
+        :param board: board to search, left untouched by the search
+        :param source: (row, column) to start from, defaults to the board source node
+        :param target: (row, column) to find a path to, defaults to the board target node
+        :param connectivity: 8 to allow diagonal steps, 4 for horizontal and vertical steps only
+        :param heuristic: name of a heuristic in game.heuristic.heuristics, must be admissible for the connectivity
+        """
+        assert connectivity in (4, 8), f'Connectivity must be 4 or 8'
+        assert heuristic in heuristics, f'Heuristic must be one of {list(heuristics)}'
+        if source is None:
+            assert board.source is not None, f'Board must have a source node'
+            source = (board.source.x, board.source.y)
+        if target is None:
+            assert board.target is not None, f'Board must have a target node'
+            target = (board.target.x, board.target.y)
+        for row, column in (source, target):
+            assert 0 <= row < board.rows and 0 <= column < board.columns, f'({row}, {column}) is out of bounds.'
+        assert board.get_weights() is None, f'DStarLite needs a board without cell weights'
+
+        self._board: Board = board
+        self._columns: int = board.columns
+        self._heuristic = heuristics[heuristic]
+        self._passable: bytearray = board.get_passable_cells()
+        self._neighbor_masks: bytearray = board.get_neighbor_masks()
+        self._neighbor_table: List[list] = IndexAStar._get_neighbor_table(columns=board.columns,
+                                                                          connectivity=connectivity)
+
+        self._source: int = source[0] * board.columns + source[1]
+        self._target: int = target[0] * board.columns + target[1]
+        self._start_over()
+        self._expanded: int = 0
+        self._path_found: bool = False
+        board.add_wall_listener(self._on_wall_changed)
+        board.add_reset_listener(self._on_cells_reset)
+
+    @property
+    def source(self) -> int:
+        return self._source
+
+    @property
+    def target(self) -> int:
+        return self._target
+
+    @property
+    def expanded(self) -> int:
+        """
+        :return: number of cells expanded by the last call to search
+        """
+        return self._expanded
+
+    @property
+    def distance(self) -> float:
+        """
+        :return: length of the shortest path from source to target after the last search, None if there is none
+        """
+        return self._lookaheads[self._source] if self._path_found else None
+
+    def move_source(self, row: int, column: int) -> None:
+        """
+        moves the source, usually one step along the path. the values computed so far stay valid
+        :param row: row of the new source
+        :param column: column of the new source
+        """
+        assert 0 <= row < self._board.rows and 0 <= column < self._columns, f'({row}, {column}) is out of bounds.'
+        self._source = row * self._columns + column
+        self._key_modifier += self._get_distance_to_source(index=self._last_source)
+        self._last_source = self._source
+
+    def search(self) -> bool:
+        """
+        applies the wall edits made since the last search and repairs the shortest distances to target until the
+        one of the source is settled
+        :return: True if a path from source to target exists
+        """
+        assert self._board.get_weights() is None, f'DStarLite needs a board without cell weights'
+        neighbor_masks = self._neighbor_masks
+        neighbor_table = self._neighbor_table
+
+        changed_cells, self._changed_cells = self._changed_cells, []
+        for index in changed_cells:
+            self._update_cell(index=index)
+            for offset, _ in neighbor_table[neighbor_masks[index]]:
+                self._update_cell(index=index + offset)
+
+        # the repair can wait in the open set until source and target are connected again
+        if not self._board.is_reachable(source=divmod(self._source, self._columns),
+                                        target=divmod(self._target, self._columns)):
+            self._expanded = 0
+            self._path_found = False
+            return False
+
+        distances = self._distances
+        lookaheads = self._lookaheads
+        open_nodes = self._open_nodes
+        open_keys = self._open_keys
+        source = self._source
+        expanded = 0
+
+        while True:
+            top = self._peek()
+            # cells tied with the source on the first key are expanded as well, rounding can put a cell that is
+            # ahead of the source in exact arithmetic just behind it, or behind a tied cell with a larger second key
+            if top is None or (top[0] > self._get_key(index=source)[0] + self._tolerance
+                               and lookaheads[source] <= distances[source]):
+                break
+
+            old_key, index = top[:2], top[3]
+            new_key = self._get_key(index=index)
+            if old_key < new_key:
+                self._push(index=index)
+                continue
+
+            heapq.heappop(open_nodes)
+            del open_keys[index]
+            expanded += 1
+
+            if distances[index] > lookaheads[index]:
+                # the distance of index dropped, its neighbors may now reach target through it
+                distance = distances[index] = lookaheads[index]
+                for offset, step in neighbor_table[neighbor_masks[index]]:
+                    neighbor = index + offset
+                    if neighbor != self._target and distance + step < lookaheads[neighbor]:
+                        lookaheads[neighbor] = distance + step
+                        self._push(index=neighbor)
+            else:
+                # the distance of index rose, recompute it and every neighbor that may have relied on it
+                distances[index] = math.inf
+                self._update_cell(index=index)
+                for offset, _ in neighbor_table[neighbor_masks[index]]:
+                    self._update_cell(index=index + offset)
+
+        self._expanded = expanded
+        self._path_found = lookaheads[source] < math.inf
+        return self._path_found
+
+    def get_path(self) -> List[int]:
+        """
+        :return: cell indices of the path from source to target, both excluded, in walking order
+        """
+        assert self.distance is not None, 'No path found'
+
+        neighbor_masks = self._neighbor_masks
+        neighbor_table = self._neighbor_table
+        distances = self._distances
+
+        path = []
+        index = self._source
+        while index != self._target:
+            # step to the neighbor with the shortest distance to target through it
+            _, index = min((distances[index + offset] + step, index + offset)
+                           for offset, step in neighbor_table[neighbor_masks[index]])
+            path.append(index)
+        return path[:-1]
+
+    def close(self) -> None:
+        """
+        stops listening to wall edits of the board
+        """
+        self._board.remove_wall_listener(self._on_wall_changed)
+        self._board.remove_reset_listener(self._on_cells_reset)
+
+    def _on_wall_changed(self, row: int, column: int, passable: bool) -> None:
+        index = row * self._columns + column
+        self._passable[index] = passable
+        self._changed_cells.append(index)
+
+    def _on_cells_reset(self) -> None:
+        """
+        starts the search over after the board changed its walls all at once, repairing might touch every cell
+        """
+        self._passable[:] = self._board.get_passable_cells()
+        self._start_over()
+
+    def _start_over(self) -> None:
+        """
+        forgets every distance and puts only the target on the open set, as for a new search from the current
+        source
+        """
+        self._last_source: int = self._source
+        # offset added to every key after the source moved, instead of reordering the open set
+        self._key_modifier: float = 0.0
+
+        size = len(self._passable)
+        self._distances: array = array('d', [math.inf]) * size
+        self._lookaheads: array = array('d', [math.inf]) * size
+        self._lookaheads[self._target] = 0.0
+
+        # lazy deletion heap of (key, secondary key, tiebreak, index), the dict holds the live key of every open cell
+        self._open_nodes: list = []
+        self._open_keys: Dict[int, Tuple[float, float]] = {}
+        self._count: int = 0
+        self._push(index=self._target)
+
+        self._changed_cells: List[int] = []
+
+    def _update_cell(self, index: int) -> None:
+        """
+        recomputes the one step lookahead of a cell from its neighbors and puts it on the open set if it became
+        inconsistent
+        """
+        if index != self._target:
+            lookahead = math.inf
+            if self._passable[index]:
+                distances = self._distances
+                for offset, step in self._neighbor_table[self._neighbor_masks[index]]:
+                    if distances[index + offset] + step < lookahead:
+                        lookahead = distances[index + offset] + step
+            self._lookaheads[index] = lookahead
+
+        if self._distances[index] != self._lookaheads[index]:
+            self._push(index=index)
+        else:
+            self._open_keys.pop(index, None)
+
+    def _push(self, index: int) -> None:
+        key = self._get_key(index=index)
+        self._open_keys[index] = key
+        heapq.heappush(self._open_nodes, (key[0], key[1], self._count, index))
+        self._count += 1
+
+    def _peek(self) -> tuple:
+        """
+        :return: live entry with the smallest key, None if the open set is empty. drops stale entries on the way
+        """
+        open_nodes = self._open_nodes
+        open_keys = self._open_keys
+        while open_nodes:
+            entry = open_nodes[0]
+            if open_keys.get(entry[3]) == entry[:2]:
+                return entry
+            heapq.heappop(open_nodes)
+        return None
+
+    def _get_key(self, index: int) -> Tuple[float, float]:
+        distance = min(self._distances[index], self._lookaheads[index])
+        return distance + self._get_distance_to_source(index=index) + self._key_modifier, distance
+
+    def _get_distance_to_source(self, index: int) -> float:
+        row, column = divmod(index, self._columns)
+        source_row, source_column = divmod(self._source, self._columns)
+        return self._heuristic(row - source_row, column - source_column)
@@ -0,0 +1,171 @@
+import cProfile
+import json
+import pstats
+import time
+from collections import Counter, defaultdict
+from typing import Callable
+
+
+class Instrumentation:
+    """
+    counters, per phase timers and histograms filled by instrumented searches and open sets. instrumenting an
+    object replaces some of its methods on that instance only with measuring wrappers, so objects that are not
+    instrumented run exactly the same code as before and pay nothing.
+    with profile set, every instrumented search step also runs under cProfile, so the profile only covers the
+    search and not whatever drives it
+    """
+
+    def __init__(self, profile: bool = False):
+        """
+        :param profile: also profile every instrumented search step with cProfile, see get_profile_stats
+        """
+        self._counters: Counter = Counter()
+        # calls and seconds spent in every timed phase
+        self._calls: Counter = Counter()
+        self._seconds: defaultdict = defaultdict(float)
+        # power of two bucket of every recorded value, see record
+        self._histograms: defaultdict = defaultdict(Counter)
+        self._profiler: cProfile.Profile = cProfile.Profile() if profile else None
+
+    def count(self, name: str, amount: int = 1) -> None:
+        self._counters[name] += amount
+
+    def record(self, name: str, value: int) -> None:
+        """
+        adds value to a histogram with power of two buckets, bucket b holds the values from 2 ** (b - 1) to
+        2 ** b - 1 and bucket 0 holds 0
+        """
+        self._histograms[name][value.bit_length()] += 1
+
+    def timed(self, name: str, function: Callable) -> Callable:
+        """
+        :param name: name of the phase
+        :param function: function to measure
+        :return: function counting the calls of function and the time spent in them under name
+        """
+        calls = self._calls
+        seconds = self._seconds
+        perf_counter = time.perf_counter
+
+        def timed_function(*args, **kwargs):
+            start = perf_counter()
+            try:
+                return function(*args, **kwargs)
+            finally:
+                seconds[name] += perf_counter() - start
+                calls[name] += 1
+
+        return timed_function
+
+    def counted(self, name: str, function: Callable) -> Callable:
+        """
+        :return: function counting the calls of function under name
+        """
+        counters = self._counters
+
+        def counted_function(*args, **kwargs):
+            counters[name] += 1
+            return function(*args, **kwargs)
+
+        return counted_function
+
+    def instrument_open_set(self, open_set, name: str = 'open_set') -> None:
+        """
+        times push, pop, update and contains of an open set. on a MinHeap also counts how many updates decrease
+        and how many increase a key
+        :param open_set: MinHeap, LazyMinHeap or BucketQueue
+        :param name: prefix of the phase and counter names
+        """
+        for method in ('push', 'pop', 'update', 'contains'):
+            setattr(open_set, method, self.timed(f'{name}.{method}', getattr(open_set, method)))
+        for method in ('_decrease_key', '_increase_key'):
+            if hasattr(open_set, method):
+                counter_name = f'{name}.{method.lstrip("_")}'
+                # listed even while never called, an increase count of 0 is worth seeing
+                self._counters[counter_name] += 0
+                setattr(open_set, method, self.counted(counter_name, getattr(open_set, method)))
+
+    def instrument_a_star(self, a_star) -> None:
+        """
+        times every step of an AStar and its neighbor generation, counts expanded nodes and updated neighbors and
+        records the open set size before every step. instruments its open set as well
+        """
+        self.instrument_open_set(open_set=a_star._open_nodes)
+        a_star._get_neighbor_nodes = self.timed('a_star.get_neighbor_nodes', a_star._get_neighbor_nodes)
+
+        step = self.timed('a_star.next', a_star.next)
+        if self._profiler is not None:
+            step = self._get_profiled(function=step)
+        open_nodes = a_star._open_nodes
+        changes = a_star._changes
+        counters = self._counters
+        sizes = self._histograms['open_set.size']
+
+        def wrapped_next():
+            sizes[open_nodes.size().bit_length()] += 1
+            written = changes.written if changes is not None else 0
+            current_node, updated_neighbor_nodes = step()
+            if updated_neighbor_nodes is not None:
+                counters['a_star.expanded'] += 1
+                # a search recording its changes only records its updated neighbors, after the expanded node
+                counters['a_star.updated_neighbors'] += len(updated_neighbor_nodes) if changes is None \
+                    else changes.written - written - 1
+            return current_node, updated_neighbor_nodes
+
+        a_star.next = wrapped_next
+
+    def as_dict(self) -> dict:
+        """
+        :return: counters, timers with calls, total and mean seconds, and histograms keyed by their bucket range
+        """
+        return {
+            'counters': dict(self._counters),
+            'timers': {name: {'calls': self._calls[name], 'seconds': seconds,
+                              'mean_seconds': seconds / self._calls[name] if self._calls[name] else 0.0}
+                       for name, seconds in self._seconds.items()},
+            'histograms': {name: {self._get_bucket_label(bucket=bucket): histogram[bucket]
+                                  for bucket in sorted(histogram)}
+                           for name, histogram in self._histograms.items()},
+        }
+
+    def to_json(self, **kwargs) -> str:
+        """
+        :param kwargs: passed on to json.dumps
+        """
+        return json.dumps(self.as_dict(), **kwargs)
+
+    def get_profile_stats(self) -> pstats.Stats:
+        """
+        :return: cProfile statistics of all instrumented search steps so far
+        """
+        assert self._profiler is not None, f'Profiling is off'
+        return pstats.Stats(self._profiler)
+
+    def dump_profile(self, path: str) -> None:
+        """
+        writes the cProfile statistics to path, readable by pstats and profile viewers
+        """
+        assert self._profiler is not None, f'Profiling is off'
+        self._profiler.dump_stats(path)
+
+    def reset(self) -> None:
+        self._counters.clear()
+        self._calls.clear()
+        self._seconds.clear()
+        # cleared in place, instrumented objects hold on to the histograms
+        for histogram in self._histograms.values():
+            histogram.clear()
+        if self._profiler is not None:
+            self._profiler = cProfile.Profile()
+
+    def _get_profiled(self, function: Callable) -> Callable:
+        def profiled_function(*args, **kwargs):
+            return self._profiler.runcall(function, *args, **kwargs)
+
+        return profiled_function
+
+    @staticmethod
+    def _get_bucket_label(bucket: int) -> str:
+        if bucket <= 1:
+            return str(bucket)
+        return f'{2 ** (bucket - 1)}-{2 ** bucket - 1}'
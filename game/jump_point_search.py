@@ -0,0 +1,259 @@
+import heapq
+import math
+from array import array
+from typing import List, Tuple
+
+from game.board import Board
+from game.heuristic import octile
+
+
+class JumpPointSearch:
+    """
+    jump point search for uniform cost 8-connected boards, with the same move rules as AStar: diagonal steps are
+    allowed even between two walls. symmetric paths are pruned by only expanding jump points, so open boards
+    need far fewer expansions than AStar while the path cost stays optimal.
+    the search runs on a copy of the passable cells padded with a ring of walls, so no step needs a bounds check.
+    indices returned by get_path are row * columns + column on the original board
+    """
+
+    def __init__(self, board: Board, source: Tuple[int, int] = None, target: Tuple[int, int] = None):
+        """
+        :param board: board to search, left untouched by the search
+        :param source: (row, column) to start from, defaults to the board source node
+        :param target: (row, column) to find a path to, defaults to the board target node
+        """
+        if source is None:
+            assert board.source is not None, f'Board must have a source node'
+            source = (board.source.x, board.source.y)
+        if target is None:
+            assert board.target is not None, f'Board must have a target node'
+            target = (board.target.x, board.target.y)
+        for row, column in (source, target):
+            assert 0 <= row < board.rows and 0 <= column < board.columns, f'({row}, {column}) is out of bounds.'
+        assert board.get_weights() is None, f'Jump point search needs a board without cell weights'
+
+        self._rows: int = board.rows
+        self._columns: int = board.columns
+        self._width: int = board.columns + 2
+
+        # pad every row with a wall on both sides and add a wall row above and below
+        passable = board.get_passable_cells()
+        self._passable: bytearray = bytearray(self._width)
+        for row in range(self._rows):
+            self._passable += b'\x00' + passable[row * self._columns:(row + 1) * self._columns] + b'\x00'
+        self._passable += bytearray(self._width)
+
+        self._source: int = self._to_padded(*source)
+        self._target: int = self._to_padded(*target)
+
+        size = len(self._passable)
+        self._distances_to_source: array = array('d', [math.inf]) * size
+        self._came_from: array = array('q', [-1]) * size
+        self._jump_points: List[int] = []
+        self._expanded: int = 0
+        self._path_found: bool = False
+
+    @property
+    def expanded(self) -> int:
+        """
+        :return: number of jump points taken off the open set and expanded, source included
+        """
+        return self._expanded
+
+    @property
+    def distance(self) -> float:
+        """
+        :return: length of the path found from source to target, None if no path was found
+        """
+        return self._distances_to_source[self._target] if self._path_found else None
+
+    def search(self) -> bool:
+        """
+        runs the search to completion
+        :return: True if a path from source to target exists
+        """
+        assert self._path_found is False, 'Path already found'
+
+        source = self._source
+        target = self._target
+        passable = self._passable
+        if not passable[source] or not passable[target]:
+            return False
+
+        width = self._width
+        target_row, target_column = divmod(target, width)
+        distances_to_source = self._distances_to_source
+        came_from = self._came_from
+        closed = bytearray(len(passable))
+        jump_points = self._jump_points
+
+        distances_to_source[source] = 0.0
+        source_row, source_column = divmod(source, width)
+        open_nodes = [(octile(source_row - target_row, source_column - target_column), 0, source)]
+        # insertion counter, ties on total distance are popped first in first out
+        count = 1
+        expanded = 0
+
+        while open_nodes:
+            _, _, current = heapq.heappop(open_nodes)
+            if closed[current]:
+                continue
+            if current == target:
+                self._path_found = True
+                break
+
+            closed[current] = 1
+            expanded += 1
+            jump_points.append(current)
+
+            row, column = divmod(current, width)
+            current_distance = distances_to_source[current]
+            for row_step, column_step in self._get_directions(current=current, parent=came_from[current]):
+                jump_point = self._jump(index=current + row_step * width + column_step,
+                                        row_step=row_step, column_step=column_step)
+                if jump_point < 0 or closed[jump_point]:
+                    continue
+
+                jump_row, jump_column = divmod(jump_point, width)
+                candidate_distance_to_source = current_distance + octile(jump_row - row, jump_column - column)
+                if candidate_distance_to_source < distances_to_source[jump_point]:
+                    distances_to_source[jump_point] = candidate_distance_to_source
+                    came_from[jump_point] = current
+                    distance_to_target = octile(jump_row - target_row, jump_column - target_column)
+                    heapq.heappush(open_nodes, (candidate_distance_to_source + distance_to_target, count, jump_point))
+                    count += 1
+
+        self._expanded = expanded
+        return self._path_found
+
+    def get_path(self) -> List[int]:
+        """
+        :return: cell indices of the path from source to target, both excluded, in walking order. the straight
+                 and diagonal runs between jump points are filled in cell by cell
+        """
+        jump_points = [self._target]
+        while jump_points[-1] != self._source:
+            jump_points.append(self._came_from[jump_points[-1]])
+        jump_points.reverse()
+
+        width = self._width
+        path = []
+        for start, stop in zip(jump_points, jump_points[1:]):
+            start_row, start_column = divmod(start, width)
+            stop_row, stop_column = divmod(stop, width)
+            row_step = (stop_row > start_row) - (stop_row < start_row)
+            column_step = (stop_column > start_column) - (stop_column < start_column)
+            step = row_step * width + column_step
+            path.extend(range(start + step, stop, step))
+            path.append(stop)
+
+        return [self._from_padded(index) for index in path[:-1]]
+
+    def get_jump_points(self) -> List[int]:
+        """
+        :return: cell indices of the expanded jump points in expansion order, source included
+        """
+        return [self._from_padded(index) for index in self._jump_points]
+
+    def _get_directions(self, current: int, parent: int) -> List[Tuple[int, int]]:
+        """
+        prunes the neighbors of current to the natural and forced neighbors given the direction of travel
+        :param current: padded index of the cell being expanded
+        :param parent: padded index of the jump point current was reached from, -1 for the source
+        :return: (row step, column step) of every direction worth jumping in
+        """
+        passable = self._passable
+        width = self._width
+
+        if parent < 0:
+            return [(i, j) for i in (-1, 0, 1) for j in (-1, 0, 1)
+                    if (i or j) and passable[current + i * width + j]]
+
+        row, column = divmod(current, width)
+        parent_row, parent_column = divmod(parent, width)
+        row_step = (row > parent_row) - (row < parent_row)
+        column_step = (column > parent_column) - (column < parent_column)
+
+        directions = []
+        if row_step and column_step:
+            if passable[current + row_step * width]:
+                directions.append((row_step, 0))
+            if passable[current + column_step]:
+                directions.append((0, column_step))
+            if passable[current + row_step * width + column_step]:
+                directions.append((row_step, column_step))
+            if not passable[current - column_step]:
+                directions.append((row_step, -column_step))
+            if not passable[current - row_step * width]:
+                directions.append((-row_step, column_step))
+        elif row_step:
+            if passable[current + row_step * width]:
+                directions.append((row_step, 0))
+            if not passable[current + 1]:
+                directions.append((row_step, 1))
+            if not passable[current - 1]:
+                directions.append((row_step, -1))
+        else:
+            if passable[current + column_step]:
+                directions.append((0, column_step))
+            if not passable[current + width]:
+                directions.append((1, column_step))
+            if not passable[current - width]:
+                directions.append((-1, column_step))
+
+        return directions
+
+    def _jump(self, index: int, row_step: int, column_step: int) -> int:
+        """
+        walks from index in one direction until it reaches the target, a cell with a forced neighbor or a wall
+        :param index: padded index of the first cell to test
+        :param row_step: -1, 0 or 1
+        :param column_step: -1, 0 or 1
+        :return: padded index of the jump point, -1 if the walk ran into a wall
+        """
+        if row_step and column_step:
+            passable = self._passable
+            target = self._target
+            vertical = row_step * self._width
+            while True:
+                if not passable[index]:
+                    return -1
+                if index == target:
+                    return index
+                if (passable[index + vertical - column_step] and not passable[index - column_step]) \
+                        or (passable[index - vertical + column_step] and not passable[index - vertical]):
+                    return index
+                # a diagonal walk stops wherever a straight walk from it would find a jump point
+                if self._jump_straight(index=index + column_step, step=column_step, side=self._width) >= 0 \
+                        or self._jump_straight(index=index + vertical, step=vertical, side=1) >= 0:
+                    return index
+                index += vertical + column_step
+
+        if row_step:
+            return self._jump_straight(index=index, step=row_step * self._width, side=1)
+        return self._jump_straight(index=index, step=column_step, side=self._width)
+
+    def _jump_straight(self, index: int, step: int, side: int) -> int:
+        """
+        :param index: padded index of the first cell to test
+        :param step: index offset of one step in the direction of travel
+        :param side: index offset of one step perpendicular to the direction of travel
+        :return: padded index of the jump point, -1 if the walk ran into a wall
+        """
+        passable = self._passable
+        target = self._target
+        while passable[index]:
+            if index == target:
+                return index
+            if (passable[index + step + side] and not passable[index + side]) \
+                    or (passable[index + step - side] and not passable[index - side]):
+                return index
+            index += step
+        return -1
+
+    def _to_padded(self, row: int, column: int) -> int:
+        return (row + 1) * self._width + column + 1
+
+    def _from_padded(self, index: int) -> int:
+        row, column = divmod(index, self._width)
+        return (row - 1) * self._columns + column - 1
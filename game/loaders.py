@@ -0,0 +1,341 @@
+import mmap
+import struct
+import sys
+import zlib
+from array import array
+from typing import BinaryIO, Iterator
+
+from game.board import Board
+from game.compact_board import CompactBoard
+from game.node import NodeState, node_state_codes
+
+_open_code: int = node_state_codes[NodeState.OPEN]
+_wall_code: int = node_state_codes[NodeState.WALL]
+
+# .map terrain: ground, grass and swamp are walkable, out of bounds, trees and water are not
+_map_table: bytes = bytes(_open_code if chr(value) in '.GS' else _wall_code for value in range(256))
+
+# maps every state code to OPEN or WALL, the raw format only stores walkability
+_raw_state_table: bytes = bytes(_wall_code if value == _wall_code else _open_code for value in range(256))
+
+# magic, rows, columns, 1 if rows * columns weight bytes follow the states else 0, padded to 24 bytes
+_raw_header = struct.Struct('<8sIII4x')
+_raw_magic = b'PFBOARD1'
+
+_png_signature = b'\x89PNG\r\n\x1a\n'
+# samples per pixel of every png color type
+_png_channels = {0: 1, 2: 3, 3: 1, 4: 2, 6: 4}
+# most bytes inflated at once while decoding a png, so a large image data chunk is never decompressed in one piece
+_png_inflate_size = 1 << 16
+
+
+def load_map(path: str) -> CompactBoard:
+    """
+    loads a grid in the text .map format of the moving ai pathfinding benchmarks: a "type", "height" and "width"
+    header followed by "map" and one line of terrain characters per row. rows are translated straight into the
+    state buffer of the board, one at a time
+    :param path: path of the .map file
+    :return: board with a wall for every cell that is not ground, grass or swamp
+    """
+    with open(path, 'rb') as file:
+        header = {}
+        for line in file:
+            fields = line.split()
+            if fields == [b'map']:
+                break
+            if fields:
+                header[fields[0].decode()] = fields[1].decode() if len(fields) > 1 else None
+        assert 'height' in header and 'width' in header, f'{path} has no height or width'
+
+        rows = int(header['height'])
+        columns = int(header['width'])
+        board = CompactBoard(rows=rows, columns=columns)
+        states = board.states
+        for row in range(rows):
+            line = file.readline().rstrip(b'\r\n')
+            assert len(line) == columns, f'Row {row} of {path} has {len(line)} cells instead of {columns}'
+            states[row * columns:(row + 1) * columns] = line.translate(_map_table)
+
+    return board
+
+
+def load_pgm(path: str, threshold: int = 128) -> CompactBoard:
+    """
+    loads a binary (P5) portable graymap, one pixel per cell. pixels darker than threshold become walls
+    :param path: path of the .pgm file
+    :param threshold: brightness from 0 to 255 a pixel needs to be walkable
+    :return: board of the size of the image
+    """
+    with open(path, 'rb') as file:
+        tokens = _read_pgm_header(file=file)
+        assert next(tokens) == b'P5', f'{path} is not a binary graymap'
+        columns, rows, maximum = int(next(tokens)), int(next(tokens)), int(next(tokens))
+
+        # samples are big endian 16 bit values once the maximum exceeds 255
+        sample_size = 1 if maximum < 256 else 2
+        table = _get_threshold_table(threshold=threshold, maximum=maximum)
+        board = CompactBoard(rows=rows, columns=columns)
+        states = board.states
+        for row in range(rows):
+            samples = file.read(columns * sample_size)
+            assert len(samples) == columns * sample_size, f'{path} ends before row {row}'
+            states[row * columns:(row + 1) * columns] = samples.translate(table) if sample_size == 1 \
+                else _threshold_wide_samples(samples=_get_wide_samples(data=samples), threshold=threshold,
+                                             maximum=maximum)
+
+    return board
+
+
+def load_png(path: str, threshold: int = 128) -> CompactBoard:
+    """
+    loads a non interlaced png, one pixel per cell. the image data is decompressed and unfiltered one scanline at a
+    time, and pixels darker than threshold become walls. color pixels are judged by their green channel, the one
+    closest to perceived brightness, and alpha is ignored
+    :param path: path of the .png file
+    :param threshold: brightness from 0 to 255 a pixel needs to be walkable
+    :return: board of the size of the image
+    """
+    with open(path, 'rb') as file:
+        assert file.read(8) == _png_signature, f'{path} is not a png'
+        chunks = _read_png_chunks(file=file)
+
+        chunk_type, data = next(chunks)
+        assert chunk_type == b'IHDR', f'{path} does not start with a header'
+        columns, rows, bit_depth, color_type, _, _, interlace = struct.unpack('>IIBBBBB', data)
+        assert color_type in _png_channels, f'Unknown png color type {color_type}'
+        assert interlace == 0, f'Interlaced pngs are not supported'
+
+        channels = _png_channels[color_type]
+        # filters work on whole bytes, pixels smaller than a byte are filtered one byte at a time
+        pixel_size = max(1, channels * bit_depth // 8)
+        stride = (columns * channels * bit_depth + 7) // 8
+        table = _get_threshold_table(threshold=threshold, maximum=(1 << min(bit_depth, 8)) - 1)
+
+        board = CompactBoard(rows=rows, columns=columns)
+        states = board.states
+        decompressor = zlib.decompressobj()
+        # inflated bytes not yet unfiltered, less than a scanline between two inflated pieces
+        pending = bytearray()
+        previous = bytes(stride)
+        row = 0
+        for chunk_type, data in chunks:
+            if chunk_type == b'PLTE':
+                # brightness of a palette index is the green channel of its color, a sample from 0 to 255 whatever
+                # the bit depth of the indices
+                green_table = _get_threshold_table(threshold=threshold, maximum=255)
+                table = bytes(green_table[green] for green in data[1::3]).ljust(256, bytes([_wall_code]))
+            elif chunk_type == b'IDAT':
+                for inflated in _inflate(decompressor=decompressor, data=data,
+                                         max_length=max(_png_inflate_size, stride + 1)):
+                    pending += inflated
+                    offset = 0
+                    while len(pending) - offset > stride and row < rows:
+                        scanline = _unfilter(filter_type=pending[offset],
+                                             scanline=bytes(pending[offset + 1:offset + stride + 1]),
+                                             previous=previous, pixel_size=pixel_size)
+                        offset += stride + 1
+                        samples = _get_brightness(scanline=scanline, columns=columns, channels=channels,
+                                                  bit_depth=bit_depth, palette=color_type == 3)
+                        states[row * columns:(row + 1) * columns] = samples.translate(table) if bit_depth < 16 \
+                            else _threshold_wide_samples(samples=samples, threshold=threshold, maximum=0xFFFF)
+                        previous = scanline
+                        row += 1
+                    del pending[:offset]
+            elif chunk_type == b'IEND':
+                break
+        assert row == rows, f'{path} ends before row {row}'
+
+    return board
+
+
+def save_raw(board: Board, path: str) -> None:
+    """
+    writes the walls, and the weights of a weighted board, in the raw format read by load_raw: a fixed header
+    followed by one byte per cell in row major order
+    :param board: board to save
+    :param path: path of the file to write
+    """
+    weights = board.get_weights()
+    with open(path, 'wb') as file:
+        file.write(_raw_header.pack(_raw_magic, board.rows, board.columns, weights is not None))
+        file.write(bytes(board.get_cell_states()).translate(_raw_state_table))
+        if weights is not None:
+            file.write(bytes(weights))
+
+
+def load_raw(path: str, writable: bool = False) -> CompactBoard:
+    """
+    maps a file written by save_raw into memory instead of reading it, so even huge boards open in milliseconds
+    and only the pages a search touches are ever read. processes mapping the same file share its pages
+    :param path: path of the raw file
+    :param writable: write edits of the board through to the file. otherwise edits stay private to this process
+    :return: board whose states, and weights if saved, are backed by the file
+    """
+    with open(path, 'r+b' if writable else 'rb') as file:
+        mapped = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_WRITE if writable else mmap.ACCESS_COPY)
+
+    magic, rows, columns, weighted = _raw_header.unpack_from(mapped)
+    assert magic == _raw_magic, f'{path} is not a raw board'
+    size = rows * columns
+    assert len(mapped) >= _raw_header.size + size * (2 if weighted else 1), f'{path} is truncated'
+
+    # the views keep the mapping open for as long as the board lives
+    buffer = memoryview(mapped)
+    board = CompactBoard(rows=rows, columns=columns, states=buffer[_raw_header.size:_raw_header.size + size])
+    if weighted:
+        board.set_weights(buffer[_raw_header.size + size:_raw_header.size + 2 * size])
+    return board
+
+
+# file extensions and the loader reading them
+loaders = {
+    '.map': load_map,
+    '.pgm': load_pgm,
+    '.png': load_png,
+    '.board': load_raw,
+}
+
+
+def load_board(path: str) -> CompactBoard:
+    """
+    :param path: path of a file with one of the extensions in loaders
+    :return: board loaded with the loader of the extension
+    """
+    extension = path[path.rfind('.'):].lower()
+    assert extension in loaders, f'Unknown board file extension {extension}'
+    return loaders[extension](path)
+
+
+def _get_threshold_table(threshold: int, maximum: int) -> bytes:
+    """
+    :return: translation table from a sample between 0 and maximum to a wall or open state code
+    """
+    return bytes(_wall_code if value * 255 < threshold * maximum else _open_code
+                 for value in range(256))
+
+
+def _threshold_wide_samples(samples: array, threshold: int, maximum: int) -> bytes:
+    """
+    :param samples: 16 bit samples between 0 and maximum
+    :return: wall or open state code of every sample, judged like _get_threshold_table does
+    """
+    limit = threshold * maximum
+    return bytes(_wall_code if value * 255 < limit else _open_code for value in samples)
+
+
+def _get_wide_samples(data: bytes) -> array:
+    """
+    :param data: big endian 16 bit samples
+    :return: the samples as integers
+    """
+    samples = array('H', data)
+    if sys.byteorder == 'little':
+        samples.byteswap()
+    return samples
+
+
+def _read_pgm_header(file: BinaryIO) -> Iterator[bytes]:
+    """
+    yields the whitespace separated header fields, skipping comments. stops right after the single whitespace
+    following the maximum value, where the pixels start
+    """
+    for _ in range(4):
+        token = b''
+        while True:
+            character = file.read(1)
+            if character == b'#':
+                file.readline()
+            elif character.isspace() or not character:
+                if token:
+                    break
+            else:
+                token += character
+        yield token
+
+
+def _read_png_chunks(file: BinaryIO) -> Iterator[tuple]:
+    while True:
+        header = file.read(8)
+        if len(header) < 8:
+            return
+        length, chunk_type = struct.unpack('>I4s', header)
+        data = file.read(length)
+        file.read(4)
+        yield chunk_type, data
+
+
+def _inflate(decompressor, data: bytes, max_length: int) -> Iterator[bytes]:
+    """
+    yields the decompressed bytes of data in pieces of at most max_length bytes
+    """
+    while True:
+        inflated = decompressor.decompress(data, max_length)
+        if inflated:
+            yield inflated
+        data = decompressor.unconsumed_tail
+        # a full piece may leave more output behind even once all input is consumed
+        if not data and len(inflated) < max_length:
+            return
+
+
+def _unfilter(filter_type: int, scanline: bytes, previous: bytes, pixel_size: int) -> bytes:
+    """
+    reverses the png filter of one scanline
+    :param filter_type: 0 none, 1 sub, 2 up, 3 average or 4 paeth
+    :param scanline: filtered bytes of the scanline, without the filter type
+    :param previous: unfiltered bytes of the scanline above, zeros for the first one
+    :param pixel_size: bytes per pixel, at least 1
+    :return: unfiltered bytes of the scanline
+    """
+    if filter_type == 0:
+        return scanline
+    if filter_type == 2:
+        # bytewise addition modulo 256 of the whole scanline at once: add the low seven bits of every byte, then
+        # flip the top bit where exactly one of the two top bits was set
+        size = len(scanline)
+        low_bits = int.from_bytes(b'\x7f' * size, 'little')
+        current = int.from_bytes(scanline, 'little')
+        above = int.from_bytes(previous, 'little')
+        total = ((current & low_bits) + (above & low_bits)) ^ ((current ^ above) & ~low_bits)
+        return total.to_bytes(size, 'little')
+
+    result = bytearray(scanline)
+    for index in range(len(result)):
+        left = result[index - pixel_size] if index >= pixel_size else 0
+        if filter_type == 1:
+            result[index] = (result[index] + left) & 0xFF
+        elif filter_type == 3:
+            result[index] = (result[index] + ((left + previous[index]) >> 1)) & 0xFF
+        else:
+            above = previous[index]
+            upper_left = previous[index - pixel_size] if index >= pixel_size else 0
+            estimate = left + above - upper_left
+            distance_left = abs(estimate - left)
+            distance_above = abs(estimate - above)
+            distance_upper_left = abs(estimate - upper_left)
+            if distance_left <= distance_above and distance_left <= distance_upper_left:
+                predictor = left
+            elif distance_above <= distance_upper_left:
+                predictor = above
+            else:
+                predictor = upper_left
+            result[index] = (result[index] + predictor) & 0xFF
+    return bytes(result)
+
+
+def _get_brightness(scanline: bytes, columns: int, channels: int, bit_depth: int, palette: bool) -> bytes:
+    """
+    :return: the gray or green sample, or the palette index of a palette image, of every pixel, one byte per pixel
+             up to a bit depth of 8 and a 16 bit sample per pixel at a bit depth of 16
+    """
+    if bit_depth < 8:
+        # unpack the samples packed into every byte, most significant bits first
+        mask = (1 << bit_depth) - 1
+        samples = bytes((value >> shift) & mask for value in scanline
+                        for shift in range(8 - bit_depth, -1, -bit_depth))
+        return samples[:columns]
+
+    channel = 1 if channels >= 3 and not palette else 0
+    if bit_depth == 16:
+        return _get_wide_samples(data=scanline)[channel::channels]
+    return scanline[channel::channels]
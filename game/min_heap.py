@@ -1,3 +1,4 @@
+import heapq
 import logging
 from typing import List
 
@@ -5,181 +6,370 @@ logger = logging.getLogger(__name__)
 
 
 class MinHeap:
+    """
+    indexed binary min heap. every object is stored as a [priority, tiebreak, object] entry, where tiebreak is a
+    decreasing insertion counter so objects with equal priority are popped last in first out. A* then prefers the
+    node pushed last among nodes with equal total distance, which is the deeper one, instead of widening the search
+    to every node with that total distance. the position of every object is tracked, so update moves an object up or
+    down in O(log n) without removing it
+    """
+
     def __init__(self, key=lambda x: x):
-        self._hash_to_index: dict = {}
-        self._heap_list: List = []
-        self._index_to_key: dict = {}
+        self._heap_list: List[list] = []
+        self._object_to_index: dict = {}
         self._key = key
-        self._size = 0
+        self._count = 0
 
     def push(self, object):
-        self._heap_list.append(object)
-        self._size += 1
-        index = self._size - 1
-        self._update_index(index=index, object=object)
-        self._sift_up(index=index)
+        entry = [self._key(object), self._count, object]
+        self._count -= 1
+        self._heap_list.append(entry)
+        self._sift_up(index=len(self._heap_list) - 1)
 
     def peek(self) -> object:
-        return self._heap_list[0]
+        return self._heap_list[0][2]
 
     def pop(self) -> object:
         return self._delete(index=0)
 
     def contains(self, object) -> bool:
-        return object.__hash__() in self._hash_to_index.keys()
+        return object in self._object_to_index
 
     def is_empty(self):
-        return self._size == 0
+        return not self._heap_list
 
     def size(self):
-        return self._size
+        return len(self._heap_list)
+
+    def get_entries(self) -> (List[tuple], int):
+        """
+        :return: (key, tiebreak, object) of every object in the heap, and the tiebreak the next push gets
+        """
+        return [tuple(entry) for entry in self._heap_list], self._count
+
+    def set_entries(self, entries: List[tuple], count: int) -> None:
+        """
+        replaces the content of the heap, such as when restoring a saved search. objects keep their tiebreaks, so
+        they are popped in the same order as from the heap the entries came from
+        :param entries: (key, tiebreak, object) of every object, see get_entries
+        :param count: tiebreak of the next push
+        """
+        # a sorted list is a valid heap, tiebreaks are unique so objects are never compared
+        self._heap_list = sorted(list(entry) for entry in entries)
+        self._object_to_index = {entry[2]: index for index, entry in enumerate(self._heap_list)}
+        self._count = count
 
     def update(self, object, key):
         """
-        assumes key within object is aleady updated. this method is to update key within MinHeap
+        assumes key within object is aleady updated. this method is to update key within MinHeap.
+        an updated object is ordered as if it had just been pushed with the new key
         """
-        index = self._hash_to_index[object.__hash__()]
-        old_key = self._index_to_key[index]
+        index = self._object_to_index[object]
+        old_key = self._heap_list[index][0]
         if old_key > key:
             self._decrease_key(index=index, key=key)
         elif old_key < key:
             self._increase_key(index=index, key=key)
         else:
             logger.info(f'Old and new key are the same.')
+            # still ordered as if it had just been pushed, ahead of the other objects with the same key
+            entry = self._heap_list[index]
+            entry[1] = self._count
+            self._count -= 1
+            self._sift_up(index=index)
 
     def _decrease_key(self, index, key):
-        old_key = self._index_to_key[index]
-        assert old_key > key, f'New key must be less than old key.'
-        self._index_to_key[index] = key
+        entry = self._heap_list[index]
+        assert entry[0] > key, f'New key must be less than old key.'
+        entry[0] = key
+        entry[1] = self._count
+        self._count -= 1
         self._sift_up(index=index)
 
     def _increase_key(self, index, key):
-        assert self._index_to_key[index] < key, f'New key must be greater than old key.'
-        object = self._heap_list[index]
-        # delete object
-        self._delete(index=index)
-        # add back object
-        self.push(object)
+        entry = self._heap_list[index]
+        assert entry[0] < key, f'New key must be greater than old key.'
+        entry[0] = key
+        entry[1] = self._count
+        self._count -= 1
+        self._sift_down(index=index)
 
     def _sift_down(self, index) -> int:
-        current_index = index
-        min_child_index = self._min_child_index(current_index)
-        while min_child_index is not None:
-            if self._key(self._heap_list[current_index]) > self._key(self._heap_list[min_child_index]):
-                self._swap(current_index, min_child_index)
-                current_index = min_child_index
-                min_child_index = self._min_child_index(current_index)
-            else:
+        heap_list = self._heap_list
+        object_to_index = self._object_to_index
+        size = len(heap_list)
+        entry = heap_list[index]
+
+        # move smaller children up into the hole until the entry fits
+        child_index = 2 * index + 1
+        while child_index < size:
+            right_child_index = child_index + 1
+            if right_child_index < size and heap_list[right_child_index] < heap_list[child_index]:
+                child_index = right_child_index
+            child_entry = heap_list[child_index]
+            if not child_entry < entry:
                 break
+            heap_list[index] = child_entry
+            object_to_index[child_entry[2]] = index
+            index = child_index
+            child_index = 2 * index + 1
 
-        return current_index
+        heap_list[index] = entry
+        object_to_index[entry[2]] = index
+        return index
 
     def _sift_up(self, index) -> int:
-        current_index: int = index
-        parent_index: int = self._parent_index(current_index)
+        heap_list = self._heap_list
+        object_to_index = self._object_to_index
+        entry = heap_list[index]
+
+        # move larger parents down into the hole until the entry fits
+        while index > 0:
+            parent_index = (index - 1) >> 1
+            parent_entry = heap_list[parent_index]
+            if not entry < parent_entry:
+                break
+            heap_list[index] = parent_entry
+            object_to_index[parent_entry[2]] = index
+            index = parent_index
 
-        # print(f'{self._size}, current_index: {current_index}, parent_index: {parent_index}')
-        # print([f'{i}: {x.state.value}' for i, x in enumerate(self._heap_list)])
-        # # print(f'current: {self._key(self._heap_list[current_index])}, parent: {self._key(self._heap_list[parent_index])}')
+        heap_list[index] = entry
+        object_to_index[entry[2]] = index
+        return index
 
-        while parent_index is not None and parent_index >= 0 and \
-                self._key(self._heap_list[current_index]) < self._key(self._heap_list[parent_index]):
-            self._swap(current_index, parent_index)
-            current_index = parent_index
-            parent_index = self._parent_index(current_index)
+    def _delete(self, index) -> object:
+        heap_list = self._heap_list
+        entry = heap_list[index]
+        del self._object_to_index[entry[2]]
 
-            # print(f'{self._size}, current_index: {current_index}, parent_index: {parent_index}')
-            # # print(f'current: {self._key(self._heap_list[current_index])}, parent: {self._key(self._heap_list[parent_index])}')
-            # print([f'{i}: {x.state.value}' for i, x in enumerate(self._heap_list)])
-            # print([f'{i}: {x}' for i, x in enumerate(self._key(self._heap_list))])
+        # shrink in place and move the last entry into the freed slot
+        last_entry = heap_list.pop()
+        if index < len(heap_list):
+            heap_list[index] = last_entry
+            # the moved entry may belong above or below the freed slot
+            if self._sift_up(index=index) == index:
+                self._sift_down(index=index)
 
-        return current_index
+        return entry[2]
 
-    def _min_child_index(self, index) -> int:
-        """
-        :param index: index of parent
-        :return: index of smallest child. None if no children
-        """
-        left_child_index = self._left_child_index(index)
-        right_child_index = self._right_child_index(index)
 
-        # no children
-        if left_child_index is None and right_child_index is None:
-            return None
-        elif left_child_index is not None and right_child_index is None:
-            return left_child_index
-        elif left_child_index is None and right_child_index is not None:
-            # this case shouldn't happen
-            right_child_index
+class LazyMinHeap:
+    """
+    min heap on top of heapq that never moves entries. every object is stored as a (priority, tiebreak, object)
+    tuple, ties are popped last in first out like in MinHeap. update pushes a fresh tuple and leaves the old one
+    behind, stale tuples are skipped when they surface. offers the same interface as MinHeap
+    """
 
-        # both children exist
-        left_object = self._heap_list[left_child_index]
-        right_object = self._heap_list[right_child_index]
+    def __init__(self, key=lambda x: x):
+        self._heap_list: List[tuple] = []
+        # current entry of every object in the heap, older entries of the same object are stale
+        self._object_to_entry: dict = {}
+        self._key = key
+        self._count = 0
 
-        if self._key(left_object) < self._key(right_object):
-            return left_child_index
-        else:
-            return right_child_index
+    def push(self, object):
+        self._push(object=object, key=self._key(object))
+
+    def peek(self) -> object:
+        self._discard_stale_entries()
+        return self._heap_list[0][2]
+
+    def pop(self) -> object:
+        self._discard_stale_entries()
+        object = heapq.heappop(self._heap_list)[2]
+        del self._object_to_entry[object]
+        return object
+
+    def contains(self, object) -> bool:
+        return object in self._object_to_entry
+
+    def is_empty(self):
+        return not self._object_to_entry
+
+    def size(self):
+        return len(self._object_to_entry)
 
-    def _parent_index(self, index) -> int:
+    def get_entries(self) -> (List[tuple], int):
         """
-        :param index: index of child
-        :return: index of parent. returns None if no parent
+        :return: (key, tiebreak, object) of every object in the heap, stale entries left out, and the tiebreak the
+                 next push gets
         """
-        if index == 0:
-            return None
-        return (index - 1) // 2
+        return list(self._object_to_entry.values()), self._count
 
-    def _left_child_index(self, index) -> int:
+    def set_entries(self, entries: List[tuple], count: int) -> None:
         """
-        :param index: index of parent
-        :return: index of left child. returns None if no left child
+        replaces the content of the heap, see MinHeap.set_entries
         """
-        left_child_index = index * 2 + 1
-        return left_child_index if left_child_index < self._size else None
+        self._heap_list = sorted(tuple(entry) for entry in entries)
+        self._object_to_entry = {entry[2]: entry for entry in self._heap_list}
+        self._count = count
 
-    def _right_child_index(self, index) -> int:
+    def update(self, object, key):
         """
-        :param index: index of parent
-        :return: index of right child. returns None if no right child
+        assumes key within object is aleady updated. this method is to update key within LazyMinHeap.
+        an updated object is ordered as if it had just been pushed with the new key
         """
-        right_child_index = index * 2 + 2
-        return right_child_index if right_child_index < self._size else None
+        if self._object_to_entry[object][0] == key:
+            logger.info(f'Old and new key are the same.')
+        self._push(object=object, key=key)
+
+    def _push(self, object, key):
+        entry = (key, self._count, object)
+        self._count -= 1
+        self._object_to_entry[object] = entry
+        heapq.heappush(self._heap_list, entry)
+
+    def _discard_stale_entries(self):
+        heap_list = self._heap_list
+        object_to_entry = self._object_to_entry
+        while object_to_entry.get(heap_list[0][2]) is not heap_list[0]:
+            heapq.heappop(heap_list)
+
+
+class BucketQueue:
+    """
+    bucketed priority queue for keys that are multiples of resolution, such as A* total distances on boards
+    with integer step costs. every key maps to an integer bucket holding a stack of (tiebreak, object) entries, so
+    ties are popped last in first out like in MinHeap. pop only scans the few buckets between the smallest and
+    largest key, so push, update and pop are O(1) while the keys stay in a narrow range. update leaves the old
+    entry behind like LazyMinHeap does.
+    the first key that is not a multiple of resolution moves every object into a LazyMinHeap, which then serves
+    all further calls. offers the same interface as MinHeap
+    """
+
+    def __init__(self, key=lambda x: x, resolution: float = 1):
+        self._buckets: dict = {}
+        # (key, tiebreak) of the current entry of every object, older entries of the same object are stale
+        self._object_to_entry: dict = {}
+        self._key = key
+        self._resolution = resolution
+        self._count = 0
+        self._minimum_bucket: int = None
+        self._heap: LazyMinHeap = None
 
-    def _row_size(self, index) -> int:
-        n = 0
-        two_to_the_n = 1
-        while two_to_the_n <= index + 1:
-            n += 1
-            two_to_the_n *= 2
-        return 2 ** (n - 1)
+    @property
+    def is_bucketed(self) -> bool:
+        """
+        :return: False once the queue fell back to a heap
+        """
+        return self._heap is None
 
-    def _delete(self, index) -> object:
-        return_object = self._heap_list[index]
+    def push(self, object):
+        if self._heap is not None:
+            self._heap.push(object)
+        else:
+            self._push(object=object, key=self._key(object))
+
+    def peek(self) -> object:
+        if self._heap is not None:
+            return self._heap.peek()
+        self._discard_stale_entries()
+        return self._buckets[self._minimum_bucket][-1][1]
 
-        # delete metadata associated with return_object
-        self._hash_to_index.pop(return_object.__hash__())
-        self._index_to_key.pop(index)
+    def pop(self) -> object:
+        if self._heap is not None:
+            return self._heap.pop()
+        self._discard_stale_entries()
+        _, object = self._buckets[self._minimum_bucket].pop()
+        del self._object_to_entry[object]
+        return object
 
-        # replace removed index with last item
-        self._update_index(index=index, object=self._heap_list[self._size - 1])
+    def contains(self, object) -> bool:
+        if self._heap is not None:
+            return self._heap.contains(object)
+        return object in self._object_to_entry
 
-        # shrink
-        self._size -= 1
-        self._heap_list = self._heap_list[:-1]
+    def is_empty(self):
+        return self.size() == 0
 
-        # if deleted index was not last index
-        if index != self._size - 1:
-            self._sift_down(index=index)
+    def size(self):
+        if self._heap is not None:
+            return self._heap.size()
+        return len(self._object_to_entry)
 
-        return return_object
+    def get_entries(self) -> (List[tuple], int):
+        """
+        :return: (key, tiebreak, object) of every object in the queue, stale entries left out, and the tiebreak the
+                 next push gets
+        """
+        if self._heap is not None:
+            return self._heap.get_entries()
+        return [(key, tiebreak, object) for object, (key, tiebreak) in self._object_to_entry.items()], self._count
 
-    def _swap(self, index_one, index_two) -> None:
-        tmp = self._heap_list[index_one]
-        self._update_index(index_one, self._heap_list[index_two])
-        self._update_index(index_two, tmp)
+    def set_entries(self, entries: List[tuple], count: int) -> None:
+        """
+        replaces the content of the queue, see MinHeap.set_entries. falls back to a heap again if a key is not a
+        multiple of resolution
+        """
+        self._buckets = {}
+        self._object_to_entry = {}
+        self._minimum_bucket = None
+        self._heap = None
+        # oldest first, tiebreaks decrease with every push
+        for key, tiebreak, object in sorted(entries, key=lambda entry: entry[1], reverse=True):
+            if self._heap is not None:
+                self._heap._push(object=object, key=key)
+            else:
+                self._count = tiebreak
+                self._push(object=object, key=key)
+        self._count = count
 
-    def _update_index(self, index, object):
-        self._heap_list[index] = object
-        self._hash_to_index[object.__hash__()] = index
-        self._index_to_key[index] = self._key(object)
+    def update(self, object, key):
+        """
+        assumes key within object is aleady updated. this method is to update key within BucketQueue.
+        an updated object is ordered as if it had just been pushed with the new key
+        """
+        if self._heap is not None:
+            self._heap.update(object, key)
+            return
+        if self._object_to_entry[object][0] == key:
+            logger.info(f'Old and new key are the same.')
+        self._push(object=object, key=key)
+
+    def _push(self, object, key):
+        bucket_number = round(key / self._resolution)
+        if abs(bucket_number * self._resolution - key) > 1e-9 * max(1, abs(key)):
+            self._fall_back_to_heap()
+            self._heap._push(object=object, key=key)
+            return
+
+        self._object_to_entry[object] = (key, self._count)
+        bucket = self._buckets.get(bucket_number)
+        if bucket is None:
+            bucket = self._buckets[bucket_number] = []
+        bucket.append((self._count, object))
+        self._count -= 1
+
+        if self._minimum_bucket is None or bucket_number < self._minimum_bucket:
+            self._minimum_bucket = bucket_number
+
+    def _discard_stale_entries(self):
+        """
+        drops stale entries and empty buckets until the top of the smallest bucket is a current entry
+        """
+        if not self._object_to_entry:
+            raise IndexError('BucketQueue is empty')
+
+        buckets = self._buckets
+        object_to_entry = self._object_to_entry
+        while True:
+            bucket = buckets.get(self._minimum_bucket)
+            while bucket:
+                tiebreak, object = bucket[-1]
+                entry = object_to_entry.get(object)
+                if entry is not None and entry[1] == tiebreak:
+                    return
+                bucket.pop()
+            if bucket is not None:
+                del buckets[self._minimum_bucket]
+            self._minimum_bucket = min(buckets)
+
+    def _fall_back_to_heap(self):
+        logger.info(f'Key is not a multiple of {self._resolution}, falling back to LazyMinHeap.')
+        heap = LazyMinHeap(key=self._key)
+        # push oldest first so last in first out order survives the move
+        for object, (key, _) in sorted(self._object_to_entry.items(), key=lambda item: item[1][1], reverse=True):
+            heap._push(object=object, key=key)
+        self._heap = heap
+        self._buckets = {}
+        self._object_to_entry = {}
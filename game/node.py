@@ -1,8 +1,12 @@
 import math
 from enum import Enum
+from typing import List, Tuple
 
 
 class Node:
+    # no instance dict, boards hold one node per cell and CompactBoard creates node views on demand
+    __slots__ = ('_x', '_y', '_state', '_distance_to_source', '_distance_to_target')
+
     def __init__(self, x: int, y: int, node_state, distance_to_source=None, distance_to_target=None):
         self._x = x
         self._y = y
@@ -50,8 +54,10 @@ class Node:
 
     @property
     def total_distance(self) -> float:
-        return self._distance_to_source + self._distance_to_target \
-            if self._distance_to_source is not None and self._distance_to_target is not None \
+        distance_to_source = self.distance_to_source
+        distance_to_target = self.distance_to_target
+        return distance_to_source + distance_to_target \
+            if distance_to_source is not None and distance_to_target is not None \
             else None
 
     def distance_to(self, other):
@@ -65,9 +71,12 @@ class Node:
         return math.sqrt(x ** 2 + y ** 2)
 
     def _get_distance_strings(self):
-        distance_to_source_str = f'{self._distance_to_source:.2f}' if self._distance_to_source else None
-        distance_to_target_str = f'{self._distance_to_target:.2f}' if self._distance_to_target else None
-        total_distance_str = f'{self.total_distance:.2f}' if self.total_distance else None
+        distance_to_source = self.distance_to_source
+        distance_to_target = self.distance_to_target
+        total_distance = self.total_distance
+        distance_to_source_str = f'{distance_to_source:.2f}' if distance_to_source else None
+        distance_to_target_str = f'{distance_to_target:.2f}' if distance_to_target else None
+        total_distance_str = f'{total_distance:.2f}' if total_distance else None
         return distance_to_source_str, distance_to_target_str, total_distance_str
 
     def __hash__(self):
@@ -75,12 +84,12 @@ class Node:
 
     def __str__(self):
         distance_to_source_str, distance_to_target_str, total_distance_str = self._get_distance_strings()
-        return f'({self._x}, {self._y}, {str(self._state.value)}, {distance_to_source_str}, ' \
+        return f'({self._x}, {self._y}, {str(self.state.value)}, {distance_to_source_str}, ' \
                f'{distance_to_target_str}, {total_distance_str})'
 
     def __repr__(self):
         distance_to_source_str, distance_to_target_str, total_distance_str = self._get_distance_strings()
-        return f'(x: {self._x}, y: {self._y}, state: {str(self._state.value)}, ' \
+        return f'(x: {self._x}, y: {self._y}, state: {str(self.state.value)}, ' \
                f'distance_to_source: {distance_to_source_str}, distance_to_target: {distance_to_target_str}), ' \
                f'total_distance: {total_distance_str}'
 
@@ -93,3 +102,12 @@ class NodeState(Enum):
     VSTD = 'dodger blue'
     NHBR = 'deep sky blue'
     PATH = 'yellow'
+
+
+# compact code of every node state, its position in NodeState. OPEN is 0 so a zeroed buffer is an open board
+node_states: List[NodeState] = list(NodeState)
+node_state_codes: dict = {node_state: code for code, node_state in enumerate(node_states)}
+
+# (row offset, column offset) of every neighbor of a cell, in the order AStar visits neighbors. bit k of a board
+# neighbor mask stands for direction k, and the opposite of direction k is direction 7 - k
+neighbor_directions: List[Tuple[int, int]] = [(i, j) for i in (-1, 0, 1) for j in (-1, 0, 1) if i or j]
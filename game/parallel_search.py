@@ -0,0 +1,92 @@
+import math
+import multiprocessing
+from multiprocessing import shared_memory
+from typing import Iterable, List, Tuple
+
+from game.board import Board
+from game.compact_board import CompactBoard
+from game.components import ComponentLabels
+from game.search import SearchResult, find_paths
+
+# board attached by every worker process, see _attach_board
+_worker_board: CompactBoard = None
+_worker_shared_memory: shared_memory.SharedMemory = None
+
+
+def find_paths_parallel(board: Board, queries: Iterable[Tuple[Tuple[int, int], Tuple[int, int]]],
+                        processes: int = None, chunk_size: int = None, **options) -> List[SearchResult]:
+    """
+    answers many queries on one static board with a process pool. the cell states, the cell weights of a weighted
+    board, the neighbor masks and the component labels are built once and copied into one shared memory block, and
+    every worker wraps them in a CompactBoard without copying, so no board is ever pickled. what a worker allocates
+    per cell is its own search state: the distances, parents and closed flags of its IndexAStar, 17 bytes per cell,
+    and the heuristic fields of targets shared by several queries, 8 bytes per cell each up to the size of the
+    heuristic field cache, see game.heuristic
+    :param board: board to search
+    :param queries: (source, target) pairs of (row, column)
+    :param processes: number of worker processes, defaults to the number of cpus
+    :param chunk_size: queries per task, defaults to spreading the queries over four tasks per worker
+    :param options: connectivity and heuristic, see IndexAStar
+    :return: one SearchResult per query, in query order
+    """
+    queries = list(queries)
+    processes = processes or multiprocessing.cpu_count()
+    chunk_size = chunk_size or max(1, math.ceil(len(queries) / (processes * 4)))
+    chunks = [queries[i:i + chunk_size] for i in range(0, len(queries), chunk_size)]
+
+    sections = [board.get_cell_states()]
+    weights = board.get_weights()
+    if weights is not None:
+        sections.append(weights)
+    sections.append(board.get_neighbor_masks())
+    sections.extend(board.get_component_labels().get_buffers())
+    # (offset, size in bytes) of every section, offsets aligned to 8 bytes for the label arrays
+    layout = []
+    size = 0
+    for section in sections:
+        section = memoryview(section)
+        layout.append((size, section.nbytes))
+        size += -(-section.nbytes // 8) * 8
+
+    shared_board = shared_memory.SharedMemory(create=True, size=max(1, size))
+    try:
+        for section, (offset, nbytes) in zip(sections, layout):
+            shared_board.buf[offset:offset + nbytes] = memoryview(section).cast('B')
+        with multiprocessing.Pool(processes=processes, initializer=_attach_board,
+                                  initargs=(shared_board.name, board.rows, board.columns, weights is not None,
+                                            layout)) as pool:
+            chunk_results = pool.starmap(_find_paths, [(chunk, options) for chunk in chunks])
+    finally:
+        shared_board.close()
+        shared_board.unlink()
+
+    return [result for results in chunk_results for result in results]
+
+
+def _attach_board(name: str, rows: int, columns: int, weighted: bool, layout: List[Tuple[int, int]]) -> None:
+    """
+    pool initializer, wraps the shared sections in a CompactBoard for this worker
+    :param name: name of the shared memory block
+    :param rows: number of rows
+    :param columns: number of columns
+    :param weighted: whether the cell weights follow the cell states
+    :param layout: (offset, size in bytes) of the cell states, the cell weights of a weighted board, the neighbor
+                   masks, the component labels and their parents, in this order
+    """
+    global _worker_board, _worker_shared_memory
+    _worker_shared_memory = shared_memory.SharedMemory(name=name)
+    sections = [_worker_shared_memory.buf[offset:offset + nbytes] for offset, nbytes in layout]
+    states = sections.pop(0)
+    weights = sections.pop(0) if weighted else None
+    neighbor_masks, labels, parents = sections
+
+    _worker_board = CompactBoard(rows=rows, columns=columns, states=states)
+    if weights is not None:
+        _worker_board.set_weights(weights)
+    _worker_board.set_neighbor_masks(neighbor_masks)
+    _worker_board.set_component_labels(ComponentLabels(board=_worker_board, labels=labels.cast('i'),
+                                                       parents=parents.cast('i')))
+
+
+def _find_paths(queries: List[Tuple[Tuple[int, int], Tuple[int, int]]], options: dict) -> List[SearchResult]:
+    return find_paths(board=_worker_board, queries=queries, **options)
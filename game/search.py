@@ -0,0 +1,228 @@
+import time
+from collections import Counter, OrderedDict
+from typing import Iterable, List, Tuple
+
+from game.a_star import IndexAStar
+from game.board import Board
+
+
+class SearchResult:
+    """
+    outcome of a headless search from source to target
+    """
+
+    def __init__(self, path: List[Tuple[int, int]], distance: float, expanded: int, discovered: int,
+                 seconds: float):
+        self._path: List[Tuple[int, int]] = path
+        self._distance: float = distance
+        self._expanded: int = expanded
+        self._discovered: int = discovered
+        self._seconds: float = seconds
+
+    @property
+    def found(self) -> bool:
+        return self._distance is not None
+
+    @property
+    def path(self) -> List[Tuple[int, int]]:
+        """
+        :return: (row, column) of every cell from source to target, both included. empty if no path exists
+        """
+        return self._path
+
+    @property
+    def distance(self) -> float:
+        """
+        :return: length of the path, None if no path exists
+        """
+        return self._distance
+
+    @property
+    def expanded(self) -> int:
+        """
+        :return: number of nodes expanded by the search
+        """
+        return self._expanded
+
+    @property
+    def discovered(self) -> int:
+        """
+        :return: number of nodes that were assigned a distance to source
+        """
+        return self._discovered
+
+    @property
+    def seconds(self) -> float:
+        """
+        :return: wall clock time spent searching
+        """
+        return self._seconds
+
+    def __repr__(self):
+        return f'(distance: {self._distance}, path length: {len(self._path)}, expanded: {self._expanded}, ' \
+               f'discovered: {self._discovered}, seconds: {self._seconds:.6f})'
+
+
+class PathCache:
+    """
+    bounded least recently used cache of search results on one board, keyed on
+    (board version, source, target, heuristic, connectivity). every edit bumps the board version, so results of
+    older versions are never served again and are dropped on the next lookup
+    """
+
+    def __init__(self, board: Board, maxsize: int = 1024):
+        """
+        :param board: board the cached results belong to
+        :param maxsize: number of results kept before the least recently used one is evicted
+        """
+        assert maxsize > 0, f'Cache size must be positive'
+
+        self._board: Board = board
+        self._maxsize: int = maxsize
+        self._results: OrderedDict = OrderedDict()
+        self._version: int = board.version
+        self._hits: int = 0
+        self._misses: int = 0
+        self._evictions: int = 0
+        self._invalidations: int = 0
+
+    @property
+    def hits(self) -> int:
+        return self._hits
+
+    @property
+    def misses(self) -> int:
+        return self._misses
+
+    @property
+    def evictions(self) -> int:
+        """
+        :return: number of results dropped to stay within maxsize
+        """
+        return self._evictions
+
+    @property
+    def invalidations(self) -> int:
+        """
+        :return: number of results dropped because the board changed
+        """
+        return self._invalidations
+
+    def __len__(self):
+        return len(self._results)
+
+    def get_statistics(self) -> dict:
+        """
+        :return: counters and size of the cache, ready to be exported as metrics
+        """
+        return {'hits': self._hits, 'misses': self._misses, 'evictions': self._evictions,
+                'invalidations': self._invalidations, 'size': len(self._results), 'maxsize': self._maxsize}
+
+    def get(self, source: Tuple[int, int], target: Tuple[int, int], heuristic: str = 'euclidean',
+            connectivity: int = 8) -> SearchResult:
+        """
+        :return: cached result of the query on the current board, None on a miss
+        """
+        self._drop_stale_results()
+        key = (self._version, source, target, heuristic, connectivity)
+        result = self._results.get(key)
+        if result is None:
+            self._misses += 1
+            return None
+
+        self._hits += 1
+        self._results.move_to_end(key)
+        return result
+
+    def put(self, source: Tuple[int, int], target: Tuple[int, int], result: SearchResult,
+            heuristic: str = 'euclidean', connectivity: int = 8) -> None:
+        """
+        stores the result of a query on the current board
+        """
+        self._drop_stale_results()
+        self._results[(self._version, source, target, heuristic, connectivity)] = result
+        if len(self._results) > self._maxsize:
+            self._results.popitem(last=False)
+            self._evictions += 1
+
+    def clear(self) -> None:
+        self._results.clear()
+
+    def _drop_stale_results(self) -> None:
+        if self._version != self._board.version:
+            self._invalidations += len(self._results)
+            self._results.clear()
+            self._version = self._board.version
+
+
+def find_path(board: Board, source: Tuple[int, int], target: Tuple[int, int], cache: PathCache = None,
+              **options) -> SearchResult:
+    """
+    runs an IndexAStar search to completion without touching the board or any Node
+    :param board: board to search
+    :param source: (row, column) to start from
+    :param target: (row, column) to find a path to
+    :param cache: see find_paths
+    :param options: connectivity and heuristic, see IndexAStar
+    :return: path, distance and expansion statistics
+    """
+    return find_paths(board=board, queries=[(source, target)], cache=cache, **options)[0]
+
+
+def find_paths(board: Board, queries: Iterable[Tuple[Tuple[int, int], Tuple[int, int]]], cache: PathCache = None,
+               **options) -> List[SearchResult]:
+    """
+    answers many queries on one board. the board is read once and the search arrays are reused between
+    queries, so each query only pays for the cells it touches. queries between different components of the
+    board are answered from the board's component labels without searching, and queries sharing a target look
+    the heuristic up in one field precomputed for that target
+    :param board: board to search
+    :param queries: (source, target) pairs of (row, column)
+    :param cache: results are looked up in and added to this cache. a cached result is returned as it was stored,
+                  including the seconds of the search that produced it
+    :param options: connectivity and heuristic, see IndexAStar
+    :return: one SearchResult per query, in query order
+    """
+    queries = list(queries)
+    target_counts = Counter(target for _, target in queries)
+    results: List[SearchResult] = []
+    index_a_star: IndexAStar = None
+
+    cache_options = {'heuristic': options.get('heuristic', 'euclidean'),
+                     'connectivity': options.get('connectivity', 8)}
+
+    for source, target in queries:
+        if cache is not None:
+            result = cache.get(source=source, target=target, **cache_options)
+            if result is not None:
+                results.append(result)
+                continue
+
+        start = time.perf_counter()
+        if not board.is_reachable(source=source, target=target):
+            results.append(SearchResult(path=[], distance=None, expanded=0, discovered=0,
+                                        seconds=time.perf_counter() - start))
+            if cache is not None:
+                cache.put(source=source, target=target, result=results[-1], **cache_options)
+            continue
+
+        if index_a_star is None:
+            index_a_star = IndexAStar(board=board, source=source, target=target, **options)
+        else:
+            index_a_star.reset(source=source, target=target)
+        index_a_star.use_heuristic_field = target_counts[target] > 1
+
+        if index_a_star.search():
+            path = [source]
+            if index_a_star.target != index_a_star.source:
+                path.extend(divmod(index, board.columns) for index in index_a_star.get_path())
+                path.append(target)
+        else:
+            path = []
+
+        results.append(SearchResult(path=path, distance=index_a_star.distance, expanded=index_a_star.expanded,
+                                    discovered=index_a_star.discovered, seconds=time.perf_counter() - start))
+        if cache is not None:
+            cache.put(source=source, target=target, result=results[-1], **cache_options)
+
+    return results
@@ -0,0 +1,119 @@
+import queue
+import threading
+from enum import Enum
+
+
+class SearchEvent(Enum):
+    # a node was expanded, carries a (row, column, state) record of the node and of every updated neighbor, copied
+    # when the step was taken
+    STEP = 'STEP'
+    # the target was reached, carries the (row, column) of every path node
+    PATH = 'PATH'
+    # the open set ran empty, there is no path
+    NO_PATH = 'NO_PATH'
+    # the search was cancelled between two steps and can be continued by calling next() again
+    CANCELLED = 'CANCELLED'
+
+
+class SearchWorker:
+    """
+    steps a search with the next() protocol of AStar on a background thread and posts a (SearchEvent, records)
+    tuple for every step onto a queue, so a GUI can drain the queue on a timer and only redraw what changed while
+    the search runs at full speed. events only hold copies, never the nodes the search goes on changing. the search
+    waits while max_steps STEP events are queued, so the queue stays bounded when the consumer falls behind. the
+    search can be paused, resumed and cancelled between two steps. nothing else may call next() on the search
+    while the worker runs
+    """
+
+    # seconds between two checks whether a consumer that fell behind caught up
+    _wait_seconds = 0.005
+
+    def __init__(self, search, events: queue.Queue = None, max_steps: int = 4096):
+        """
+        :param search: AStar, BidirectionalAStar or another search offering next() and get_path()
+        :param events: queue to post the events to, a new one by default
+        :param max_steps: most STEP events queued at once, 0 to post none, such as when the consumer reads the
+                          changes from the ChangeBuffer of an AStar instead. the final event is always posted
+        """
+        self._search = search
+        self._events: queue.Queue = events if events is not None else queue.Queue()
+        self._max_steps: int = max_steps
+        # set while the search may run, cleared to pause it
+        self._resumed: threading.Event = threading.Event()
+        self._resumed.set()
+        self._cancelled: threading.Event = threading.Event()
+        self._thread: threading.Thread = threading.Thread(target=self._run, name='search_worker', daemon=True)
+
+    @property
+    def events(self) -> queue.Queue:
+        return self._events
+
+    @property
+    def is_paused(self) -> bool:
+        return not self._resumed.is_set()
+
+    @property
+    def is_alive(self) -> bool:
+        return self._thread.is_alive()
+
+    def start(self) -> None:
+        self._thread.start()
+
+    def pause(self) -> None:
+        """
+        stops the search after the current step
+        """
+        self._resumed.clear()
+
+    def resume(self) -> None:
+        self._resumed.set()
+
+    def cancel(self, timeout: float = None) -> None:
+        """
+        stops the search after the current step and waits for the thread to end
+        :param timeout: seconds to wait at most, None to wait until the current step is done
+        """
+        self._cancelled.set()
+        # wake the thread up if it is paused
+        self._resumed.set()
+        if self._thread.is_alive():
+            self._thread.join(timeout=timeout)
+
+    def _run(self) -> None:
+        search = self._search
+        put = self._events.put
+        max_steps = self._max_steps
+        while True:
+            self._resumed.wait()
+            if self._cancelled.is_set():
+                put((SearchEvent.CANCELLED, None))
+                return
+
+            current_node, updated_neighbor_nodes = search.next()
+
+            # still searching for optimal path
+            if updated_neighbor_nodes is not None:
+                if max_steps:
+                    self._wait_for_consumer()
+                    put((SearchEvent.STEP, tuple((node.x, node.y, node.state)
+                                                 for nodes in ((current_node,), updated_neighbor_nodes)
+                                                 for node in nodes)))
+
+            # no more possible nodes to explore, board has no path from source to target
+            elif current_node is None:
+                put((SearchEvent.NO_PATH, None))
+                return
+
+            # optimal path found
+            else:
+                put((SearchEvent.PATH, tuple((node.x, node.y) for node in search.get_path())))
+                return
+
+    def _wait_for_consumer(self) -> None:
+        """
+        holds the search back while max_steps STEP events are queued, until the consumer drained some of them or
+        the worker was cancelled
+        """
+        events = self._events
+        while events.qsize() >= self._max_steps and not self._cancelled.is_set():
+            self._cancelled.wait(timeout=self._wait_seconds)
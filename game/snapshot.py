@@ -0,0 +1,165 @@
+import struct
+import sys
+from array import array
+from typing import BinaryIO
+
+from game.a_star import AStar
+from game.board import Board
+from game.heuristic import heuristics
+
+# magic, format version, flags, rows, columns, source row and column, target row and column, -1 without source
+# or target
+_header = struct.Struct('<8sHHIIiiii')
+_magic = b'PFSNAPSH'
+# bumped whenever the layout changes, snapshots of another version are refused
+_format_version = 1
+
+# flags telling which sections follow the header, in this order
+_has_weights = 1
+_has_distances_to_source = 2
+_has_distances_to_target = 4
+_has_search = 8
+
+# open set backend, connectivity, heuristic, whether the path was found, number of came from links, number of
+# open set entries and tiebreak of the next push. backends and heuristics are stored as their position in
+# AStar._open_set_classes and game.heuristic.heuristics
+_search_header = struct.Struct('<BBBBQQq')
+
+
+def save_snapshot(path: str, board: Board, search: AStar = None) -> None:
+    """
+    :param path: path of the snapshot file to write
+    :param board: board to save, see write_snapshot
+    :param search: search on board to save along with it, None to save the board only
+    """
+    with open(path, 'wb') as file:
+        write_snapshot(file=file, board=board, search=search)
+
+
+def load_snapshot(path: str, board_class=Board) -> (Board, AStar):
+    """
+    :param path: path of a snapshot file written by save_snapshot
+    :param board_class: Board or a subclass such as CompactBoard to restore the board as
+    :return: restored board, and the restored search on it or None if none was saved
+    """
+    with open(path, 'rb') as file:
+        return read_snapshot(file=file, board_class=board_class)
+
+
+def write_snapshot(file: BinaryIO, board: Board, search: AStar = None) -> None:
+    """
+    writes a board and a paused search on it as a fixed header followed by packed arrays: the node states, the
+    cell weights, the node distances and, for the search, its came from links and open set entries as cell
+    indices. every section is written in one piece, no node is ever pickled.
+    reading it back gives a search that expands the same nodes in the same order as the saved one would have
+    :param file: binary file or stream to write to, such as an io.BytesIO to hand a search to another worker
+    :param board: board to save
+    :param search: AStar on board to save along with it, None to save the board only
+    """
+    assert search is None or search._board is board, f'Search does not belong to the board'
+
+    columns = board.columns
+    weights = board.get_weights()
+    distances_to_source, distances_to_target = board.get_distance_arrays()
+    flags = (_has_weights if weights is not None else 0) \
+        | (_has_distances_to_source if distances_to_source is not None else 0) \
+        | (_has_distances_to_target if distances_to_target is not None else 0) \
+        | (_has_search if search is not None else 0)
+    source = (board.source.x, board.source.y) if board.source is not None else (-1, -1)
+    target = (board.target.x, board.target.y) if board.target is not None else (-1, -1)
+
+    file.write(_header.pack(_magic, _format_version, flags, board.rows, columns, *source, *target))
+    file.write(board.get_cell_states())
+    if weights is not None:
+        file.write(bytes(weights))
+    for distances in (distances_to_source, distances_to_target):
+        if distances is not None:
+            _write_array(file=file, values=distances)
+
+    if search is not None:
+        came_from = search._came_from
+        entries, count = search._open_nodes.get_entries()
+        file.write(_search_header.pack(list(AStar._open_set_classes).index(search._open_set_name),
+                                       search._connectivity, list(heuristics).index(search._heuristic_name),
+                                       search._path_found, len(came_from), len(entries), count))
+        _write_array(file=file, values=array('q', (node.x * columns + node.y for node in came_from)))
+        _write_array(file=file, values=array('q', (node.x * columns + node.y for node in came_from.values())))
+        _write_array(file=file, values=array('q', (node.x * columns + node.y for _, _, node in entries)))
+        _write_array(file=file, values=array('d', (key for key, _, _ in entries)))
+        _write_array(file=file, values=array('q', (tiebreak for _, tiebreak, _ in entries)))
+
+
+def read_snapshot(file: BinaryIO, board_class=Board) -> (Board, AStar):
+    """
+    :param file: binary file or stream positioned at a snapshot written by write_snapshot
+    :param board_class: Board or a subclass such as CompactBoard to restore the board as
+    :return: restored board, and the restored search on it or None if none was saved
+    """
+    magic, version, flags, rows, columns, source_row, source_column, target_row, target_column = \
+        _header.unpack(_read_exactly(file=file, size=_header.size))
+    assert magic == _magic, f'Not a snapshot'
+    assert version == _format_version, f'Unsupported snapshot version {version}'
+
+    size = rows * columns
+    board = board_class(rows=rows, columns=columns)
+    board.set_cell_states(_read_exactly(file=file, size=size))
+    if flags & _has_weights:
+        board.set_weights(array('B', _read_exactly(file=file, size=size)))
+    if source_row >= 0:
+        board.set_source_node(row=source_row, column=source_column)
+    if target_row >= 0:
+        board.set_target_node(row=target_row, column=target_column)
+    # read after source and target, which reset their own distances
+    board.set_distance_arrays(
+        distances_to_source=_read_array(file=file, typecode='d', count=size)
+        if flags & _has_distances_to_source else None,
+        distances_to_target=_read_array(file=file, typecode='d', count=size)
+        if flags & _has_distances_to_target else None)
+
+    if not flags & _has_search:
+        return board, None
+
+    open_set, connectivity, heuristic, path_found, came_from_count, entry_count, count = \
+        _search_header.unpack(_read_exactly(file=file, size=_search_header.size))
+    search = AStar(board=board, open_set=list(AStar._open_set_classes)[open_set], connectivity=connectivity,
+                   heuristic=list(heuristics)[heuristic])
+
+    def get_node(index: int):
+        return board.get_node(row=index // columns, column=index % columns)
+
+    nodes = _read_array(file=file, typecode='q', count=came_from_count)
+    previous_nodes = _read_array(file=file, typecode='q', count=came_from_count)
+    search._came_from = {get_node(index): get_node(previous) for index, previous in zip(nodes, previous_nodes)}
+
+    indices = _read_array(file=file, typecode='q', count=entry_count)
+    keys = _read_array(file=file, typecode='d', count=entry_count)
+    tiebreaks = _read_array(file=file, typecode='q', count=entry_count)
+    search._open_nodes.set_entries(entries=[(key, tiebreak, get_node(index))
+                                            for index, key, tiebreak in zip(indices, keys, tiebreaks)],
+                                   count=count)
+    search._path_found = bool(path_found)
+    return board, search
+
+
+def _write_array(file: BinaryIO, values: array) -> None:
+    """
+    writes values little endian whatever the byte order of this machine
+    """
+    if sys.byteorder == 'big':
+        values = array(values.typecode, values)
+        values.byteswap()
+    file.write(values.tobytes())
+
+
+def _read_array(file: BinaryIO, typecode: str, count: int) -> array:
+    values = array(typecode)
+    values.frombytes(_read_exactly(file=file, size=count * values.itemsize))
+    if sys.byteorder == 'big':
+        values.byteswap()
+    return values
+
+
+def _read_exactly(file: BinaryIO, size: int) -> bytes:
+    data = file.read(size)
+    assert len(data) == size, f'Snapshot is truncated'
+    return data
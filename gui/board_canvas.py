@@ -0,0 +1,258 @@
+import tkinter as tk
+from typing import Callable, List
+
+from game.board import Board
+from game.node import NodeState, node_states
+
+
+class BoardCanvas:
+    """
+    draws a whole board on one tk.Canvas instead of a group of widgets per cell. cells are canvas rectangles, or
+    blocks of pixels of a single PhotoImage on boards with more than _max_item_cells cells, and clicks are resolved
+    from the pixel position. the state and distances of a cell are only written into it when cells are large
+    enough to fit them
+    """
+
+    # boards with more cells are drawn into a PhotoImage instead of one rectangle per cell
+    _max_item_cells = 50_000
+    # smallest cell size in pixels fitting the four labels of a cell, and the most cells labels are drawn for
+    _label_cell_size = 56
+    _max_label_cells = 10_000
+    # largest width and height shown before scrolling, and the cell sizes zooming steps through
+    _max_view_size = 800
+    _cell_sizes = (1, 2, 3, 4, 6, 8, 12, 16, 24, 32, 48, 64)
+    _label_font = ("Arial", 8)
+    _grid_color = 'gray75'
+
+    def __init__(self, master, board: Board, on_click_callback: Callable[[int, int], None]):
+        """
+        :param master: widget to place the canvas in
+        :param board: board to draw
+        :param on_click_callback: called with (row, column) of every clicked cell
+        """
+        self._board: Board = board
+        self._on_click_callback = on_click_callback
+
+        # state shown instead of the board state, for cells picked during setup, keyed by cell index
+        self._shown_states: dict = {}
+        # rectangle and label items of every cell, empty when drawn into an image
+        self._items: List[int] = []
+        self._labels: List[tuple] = []
+        # color and label texts currently painted on every cell
+        self._colors: List[str] = []
+        self._label_texts: List[tuple] = []
+        self._image: tk.PhotoImage = None
+        # '#rrggbb' of every color name, PhotoImage.put is given hex colors only
+        self._hex_colors: dict = {}
+
+        largest_side = max(board.rows, board.columns)
+        self._cell_size: int = max([size for size in self._cell_sizes if size * largest_side <= self._max_view_size],
+                                   default=self._cell_sizes[0])
+
+        # canvas frame with scrollbars
+        self._frm: tk.Frame = tk.Frame(master=master)
+        self._frm.grid(row=0, column=0)
+        self._canvas: tk.Canvas = tk.Canvas(master=self._frm, highlightthickness=0, background='white')
+        self._canvas.grid(row=0, column=0)
+        self._scb_horizontal = tk.Scrollbar(master=self._frm, orient=tk.HORIZONTAL, command=self._canvas.xview)
+        self._scb_vertical = tk.Scrollbar(master=self._frm, orient=tk.VERTICAL, command=self._canvas.yview)
+        self._canvas.configure(xscrollcommand=self._scb_horizontal.set, yscrollcommand=self._scb_vertical.set)
+
+        self._canvas.bind("<Button-1>", self._on_click)
+        # zoom with control and the mouse wheel, buttons 4 and 5 are the wheel on x11
+        self._canvas.bind("<Control-MouseWheel>", lambda event: self.zoom(steps=1 if event.delta > 0 else -1))
+        self._canvas.bind("<Control-Button-4>", lambda event: self.zoom(steps=1))
+        self._canvas.bind("<Control-Button-5>", lambda event: self.zoom(steps=-1))
+
+        self._draw()
+
+    @property
+    def cell_size(self) -> int:
+        return self._cell_size
+
+    def apply_change(self, index: int, state_code: int, distance_to_source: float,
+                     distance_to_target: float) -> None:
+        """
+        repaints a cell from a change record, see game.change_buffer.ChangeBuffer.read, without reading its node
+        :param index: row * columns + column of the cell
+        :param state_code: new state of the cell, see game.node.node_state_codes
+        :param distance_to_source: new distance to source, None if not set
+        :param distance_to_target: new distance to target, None if not set
+        """
+        self._shown_states.pop(index, None)
+        state = node_states[state_code]
+        self._set_color(index=index, color=state.value)
+        if self._labels:
+            self._write_labels(index=index, state=state, distance_to_source=distance_to_source,
+                               distance_to_target=distance_to_target)
+
+    def redraw(self) -> None:
+        """
+        draws every cell from the board again, such as after change records were lost
+        """
+        self._shown_states.clear()
+        self._draw()
+
+    def show_state(self, row: int, column: int, state: NodeState) -> None:
+        """
+        paints a cell in state without changing the board, until the cell is updated from the board again
+        """
+        index = row * self._board.columns + column
+        self._shown_states[index] = state
+        self._paint(index=index)
+
+    def get_shown_state(self, row: int, column: int) -> NodeState:
+        """
+        :return: state the cell is painted in
+        """
+        index = row * self._board.columns + column
+        return self._shown_states.get(index) or self._board.get_node(row=row, column=column).state
+
+    def zoom(self, steps: int) -> None:
+        """
+        :param steps: number of cell sizes to zoom in, negative to zoom out
+        """
+        position = self._cell_sizes.index(self._cell_size)
+        cell_size = self._cell_sizes[min(max(position + steps, 0), len(self._cell_sizes) - 1)]
+        if cell_size != self._cell_size:
+            self._cell_size = cell_size
+            self._draw()
+
+    def _has_labels(self) -> bool:
+        return self._cell_size >= self._label_cell_size \
+            and self._board.rows * self._board.columns <= self._max_label_cells
+
+    def _draw(self) -> None:
+        """
+        draws every cell from scratch at the current cell size
+        """
+        rows = self._board.rows
+        columns = self._board.columns
+        size = self._cell_size
+        canvas = self._canvas
+
+        canvas.delete('all')
+        self._items = []
+        self._labels = []
+        self._label_texts = []
+        self._image = None
+
+        states = self._board.get_cell_states()
+        self._colors = [node_states[code].value for code in states]
+        for index, state in self._shown_states.items():
+            self._colors[index] = state.value
+
+        if rows * columns > self._max_item_cells:
+            self._draw_image()
+        else:
+            create_rectangle = canvas.create_rectangle
+            outline = self._grid_color if size >= 4 else ''
+            colors = self._colors
+            self._items = [create_rectangle(column * size, row * size, (column + 1) * size, (row + 1) * size,
+                                            fill=colors[row * columns + column], outline=outline)
+                           for row in range(rows) for column in range(columns)]
+            if self._has_labels():
+                self._labels = [self._create_labels(row=row, column=column)
+                                for row in range(rows) for column in range(columns)]
+                self._label_texts = [None] * (rows * columns)
+                for index in range(rows * columns):
+                    self._write_node_labels(index=index)
+
+        # scroll once the board is larger than the view
+        width = columns * size
+        height = rows * size
+        canvas.configure(width=min(width, self._max_view_size), height=min(height, self._max_view_size),
+                         scrollregion=(0, 0, width, height))
+        if width > self._max_view_size:
+            self._scb_horizontal.grid(row=1, column=0, sticky="ew")
+        else:
+            self._scb_horizontal.grid_remove()
+        if height > self._max_view_size:
+            self._scb_vertical.grid(row=0, column=1, sticky="ns")
+        else:
+            self._scb_vertical.grid_remove()
+
+    def _draw_image(self) -> None:
+        """
+        draws every cell as a block of pixels of one image, a row of cells at a time
+        """
+        columns = self._board.columns
+        size = self._cell_size
+        self._image = tk.PhotoImage(width=columns * size, height=self._board.rows * size)
+        for row in range(self._board.rows):
+            pixels = ' '.join(' '.join([self._get_hex_color(color=color)] * size)
+                              for color in self._colors[row * columns:(row + 1) * columns])
+            self._image.put(' '.join(['{' + pixels + '}'] * size), to=(0, row * size))
+        self._canvas.create_image(0, 0, image=self._image, anchor='nw')
+
+    def _paint(self, index: int) -> None:
+        """
+        paints one cell with its shown state, and writes its labels if they are drawn
+        """
+        state = self._shown_states.get(index)
+        if state is None:
+            state = self._board.get_node(row=index // self._board.columns, column=index % self._board.columns).state
+
+        self._set_color(index=index, color=state.value)
+        if self._labels:
+            self._write_node_labels(index=index)
+
+    def _set_color(self, index: int, color: str) -> None:
+        if color == self._colors[index]:
+            return
+
+        self._colors[index] = color
+        if self._image is not None:
+            row, column = divmod(index, self._board.columns)
+            size = self._cell_size
+            self._image.put(self._get_hex_color(color=color),
+                            to=(column * size, row * size, (column + 1) * size, (row + 1) * size))
+        else:
+            self._canvas.itemconfigure(self._items[index], fill=color)
+
+    def _create_labels(self, row: int, column: int) -> tuple:
+        """
+        :return: text items of the state, total distance, distance to source and distance to target of a cell,
+                 laid out two by two like the legend
+        """
+        size = self._cell_size
+        return tuple(self._canvas.create_text((column + (1 + 2 * j) / 4) * size, (row + (1 + 2 * i) / 4) * size,
+                                              font=self._label_font)
+                     for i in (0, 1) for j in (0, 1))
+
+    def _write_node_labels(self, index: int) -> None:
+        node = self._board.get_node(row=index // self._board.columns, column=index % self._board.columns)
+        self._write_labels(index=index, state=self._shown_states.get(index) or node.state,
+                           distance_to_source=node.distance_to_source, distance_to_target=node.distance_to_target)
+
+    def _write_labels(self, index: int, state: NodeState, distance_to_source: float,
+                      distance_to_target: float) -> None:
+        """
+        writes the labels of a cell, leaving the ones alone whose text did not change
+        """
+        total_distance = distance_to_source + distance_to_target \
+            if distance_to_source is not None and distance_to_target is not None else None
+        texts = (state.name, self.float_to_string(total_distance), self.float_to_string(distance_to_source),
+                 self.float_to_string(distance_to_target))
+        previous_texts = self._label_texts[index] or (None,) * len(texts)
+        for item, text, previous_text in zip(self._labels[index], texts, previous_texts):
+            if text != previous_text:
+                self._canvas.itemconfigure(item, text=text)
+        self._label_texts[index] = texts
+
+    def _get_hex_color(self, color: str) -> str:
+        hex_color = self._hex_colors.get(color)
+        if hex_color is None:
+            hex_color = self._hex_colors[color] = '#%02x%02x%02x' % tuple(
+                value >> 8 for value in self._canvas.winfo_rgb(color))
+        return hex_color
+
+    def _on_click(self, event: tk.Event) -> None:
+        row = int(self._canvas.canvasy(event.y) // self._cell_size)
+        column = int(self._canvas.canvasx(event.x) // self._cell_size)
+        if 0 <= row < self._board.rows and 0 <= column < self._board.columns:
+            self._on_click_callback(row, column)
+
+    @staticmethod
+    def float_to_string(value: float) -> str:
+        return '' if value is None else f'{value:.2f}'
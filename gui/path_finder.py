@@ -1,15 +1,15 @@
-import asyncio
 import logging
+import queue
 import time
 import tkinter as tk
-from threading import Timer
-from typing import List
 
 from game.a_star import AStar
 from game.board import Board
+from game.change_buffer import ChangeBuffer
 from game.game_state import GameState
-from game.node import NodeState, Node
-from gui.node_button import NodeButton
+from game.node import NodeState
+from game.search_worker import SearchEvent, SearchWorker
+from gui.board_canvas import BoardCanvas
 
 logger = logging.getLogger(__name__)
 
@@ -31,6 +31,10 @@ class PathFinder:
         "blocked": "Set Blocked",
         "game_next": "Next",
         "game_fast_forward": "Fast Forward",
+        "game_run": "Run",
+        "game_pause": "Pause",
+        "game_resume": "Resume",
+        "game_cancel": "Cancel",
     }
 
     _default_values = {
@@ -43,12 +47,26 @@ class PathFinder:
         "warning": 'red',
     }
 
+    # fast forward searches in slices of slice_ms and redraws the board after every slice, starting a new slice
+    # every frame_ms so tk keeps handling events and repainting in between
+    _fast_forward = {
+        "slice_ms": 10,
+        "frame_ms": 16,
+    }
+
+    # a background search is polled every poll_ms
+    _background_search = {
+        "poll_ms": 16,
+    }
+
     _prompt_strings = {
         "board_size": "Set the number of rows and columns for the board.",
         "source": "Select a cell to be the source.",
         "target": "Select a cell to be the target.",
         "blocked": "Select which cells should be blocked.",
-        "start_game": "Find path with least steps using A* search algorithm. Press next to iterate."
+        "start_game": "Find path with least steps using A* search algorithm. Press next to iterate, or run to "
+                      "search in the background.",
+        "no_path": "There is no path from the source to the target. Press reset to start over."
     }
 
     def __init__(self):
@@ -64,10 +82,10 @@ class PathFinder:
         # frame board variables
         self._frm_board: tk.Frame = None
 
-        # board buttons
-        self._board_node_buttons: List[List[NodeButton]] = None
+        # board drawing
+        self._board_canvas: BoardCanvas = None
 
-        # backend board
+        # backend board, candidates are (row, column) of the picked cells
         self._setup_candidates = {
             "source": None,
             "target": None,
@@ -78,6 +96,16 @@ class PathFinder:
         # astar algo
         self._astar: AStar = None
 
+        # change records of the search and how many of them were redrawn, see _redraw_changes
+        self._changes: ChangeBuffer = None
+        self._changes_cursor: int = 0
+        # id of the scheduled fast forward slice, None while not fast forwarding
+        self._fast_forward_job: str = None
+
+        # search running on a background thread and id of the scheduled poll of its events, see _btn_game_run_on_click
+        self._search_worker: SearchWorker = None
+        self._search_events_job: str = None
+
         # setup game
         self._setup()
 
@@ -245,16 +273,16 @@ class PathFinder:
         self._btn_source_set.grid(row=0, column=0)
 
     def _btn_setup_source_on_click(self) -> None:
-        source_candidate_button: NodeButton = self._setup_candidates["source"]
+        source_candidate: tuple = self._setup_candidates["source"]
 
         # no source has been set
-        if source_candidate_button is None:
+        if source_candidate is None:
             self._show_setup_source()
             self._update_prompt("A source cell is required. " + self._prompt_strings["source"],
                                 color=self._colors['warning'])
 
         else:
-            self._board.set_source_node(row=source_candidate_button.node.x, column=source_candidate_button.node.y)
+            self._board.set_source_node(row=source_candidate[0], column=source_candidate[1])
 
             self._hide_setup_source()
 
@@ -283,16 +311,16 @@ class PathFinder:
         self._btn_target_set.grid(row=0, column=0)
 
     def _btn_setup_target_on_click(self) -> None:
-        target_candidate_button: NodeButton = self._setup_candidates["target"]
+        target_candidate: tuple = self._setup_candidates["target"]
 
         # no target has been set
-        if target_candidate_button is None:
+        if target_candidate is None:
             self._show_setup_target()
             self._update_prompt("A target cell is required. " + self._prompt_strings["target"],
                                 color=self._colors['warning'])
 
         else:
-            self._board.set_target_node(row=target_candidate_button.node.x, column=target_candidate_button.node.y)
+            self._board.set_target_node(row=target_candidate[0], column=target_candidate[1])
 
             self._hide_setup_target()
 
@@ -321,8 +349,8 @@ class PathFinder:
         self._btn_set_blocked.grid(row=0, column=0)
 
     def _btn_setup_blocked_on_click(self):
-        for blocked_button in self._setup_candidates["blocked"]:
-            self._board.set_blocked_node(row=blocked_button.node.x, column=blocked_button.node.y)
+        for row, column in self._setup_candidates["blocked"]:
+            self._board.set_blocked_node(row=row, column=column)
 
         self._hide_setup_blocked()
 
@@ -353,42 +381,167 @@ class PathFinder:
                                                 command=self._btn_game_fast_forward_on_click)
         self._btn_game_fast_forward.grid(row=0, column=1)
 
-        # setup astar
-        self._astar = AStar(board=self._board)
+        # setup background search buttons, pause and cancel only apply while it runs
+        self._btn_game_run = tk.Button(master=self._frm_context_menu, text=self._button_names["game_run"], width=10,
+                                       command=self._btn_game_run_on_click)
+        self._btn_game_run.grid(row=0, column=2)
+        self._btn_game_pause = tk.Button(master=self._frm_context_menu, text=self._button_names["game_pause"],
+                                         width=10, state=tk.DISABLED, command=self._btn_game_pause_on_click)
+        self._btn_game_pause.grid(row=0, column=3)
+        self._btn_game_cancel = tk.Button(master=self._frm_context_menu, text=self._button_names["game_cancel"],
+                                          width=10, state=tk.DISABLED, command=self._btn_game_cancel_on_click)
+        self._btn_game_cancel.grid(row=0, column=4)
+
+        # setup astar, recording the nodes it changes for _redraw_changes
+        self._changes = ChangeBuffer()
+        self._changes_cursor = 0
+        self._astar = AStar(board=self._board, changes=self._changes)
 
     def _btn_game_next_on_click(self):
+        self._step_game()
+        self._redraw_changes()
+
+    def _step_game(self) -> None:
+        """
+        runs one search step without redrawing, the search records the nodes it changes in self._changes
+        """
         current_node, updated_neighbor_nodes = self._astar.next()
 
         # still searching for optimal path
         if updated_neighbor_nodes is not None:
-            self._board_node_buttons[current_node.x][current_node.y].update_all()
-
-            for neighbor_node in updated_neighbor_nodes:
-                self._board_node_buttons[neighbor_node.x][neighbor_node.y].update_all()
+            return
 
         # no more possible nodes to explore, board has no path from source to target
-        elif current_node is None:
-            self.game_state = GameState.FINISH
-
-            # TODO: handle no solution
+        if current_node is None:
+            self._finish_game(path_found=False)
 
         # optimal path found
         else:
-            # display path
-            path: List[Node] = self._astar.get_path()
-            for path_node in path:
-                self._board_node_buttons[path_node.x][path_node.y].update_lbl_state()
+            self._finish_game(path_found=True)
 
-            # clear context menu
-            self._clear_context_menu()
+    def _finish_game(self, path_found: bool) -> None:
+        # clear context menu, the path nodes are drawn from their change records
+        self._clear_context_menu()
 
-            self.game_state = GameState.FINISH
+        if not path_found:
+            self._update_prompt(prompt=self._prompt_strings["no_path"], color=self._colors['warning'])
+
+        self.game_state = GameState.FINISH
+
+    def _redraw_changes(self) -> None:
+        """
+        repaints the cells changed since the last redraw from their change records, without reading any node.
+        draws the whole board again if the search wrote more records meanwhile than the buffer keeps
+        """
+        cursor = self._changes.read(cursor=self._changes_cursor, apply=self._board_canvas.apply_change)
+        if cursor is None:
+            # taken before drawing, records written while drawing are applied on top by the next redraw
+            cursor = self._changes.written
+            self._board_canvas.redraw()
+        self._changes_cursor = cursor
 
     def _btn_game_fast_forward_on_click(self):
-        while self.game_state != GameState.FINISH:
-            self._btn_game_next_on_click()
+        # already fast forwarding
+        if self._fast_forward_job is not None:
+            return
+
+        self._run_fast_forward_slice()
+
+    def _run_fast_forward_slice(self) -> None:
+        """
+        searches for one time slice, redraws the nodes changed meanwhile in one go and schedules the next slice
+        until the search finishes
+        """
+        self._fast_forward_job = None
+
+        start = time.perf_counter()
+        deadline = start + self._fast_forward["slice_ms"] / 1000
+        while self.game_state != GameState.FINISH and time.perf_counter() < deadline:
+            self._step_game()
+        self._redraw_changes()
+
+        if self.game_state != GameState.FINISH:
+            elapsed_ms = (time.perf_counter() - start) * 1000
+            self._fast_forward_job = self._window.after(max(1, int(self._fast_forward["frame_ms"] - elapsed_ms)),
+                                                        self._run_fast_forward_slice)
+
+    def _btn_game_run_on_click(self):
+        """
+        runs the search on a background thread, the board is redrawn from its events by _handle_search_events
+        """
+        # the search can only be stepped from one place at a time
+        if self._search_worker is not None or self._fast_forward_job is not None:
+            return
+
+        self._set_search_buttons(background=True)
+        # steps are redrawn from their change records, so the worker posts no STEP events
+        self._search_worker = SearchWorker(search=self._astar, max_steps=0)
+        self._search_worker.start()
+        self._search_events_job = self._window.after(self._background_search["poll_ms"], self._handle_search_events)
+
+    def _btn_game_pause_on_click(self):
+        if self._search_worker.is_paused:
+            self._search_worker.resume()
+            self._btn_game_pause['text'] = self._button_names["game_pause"]
+        else:
+            self._search_worker.pause()
+            self._btn_game_pause['text'] = self._button_names["game_resume"]
+
+    def _btn_game_cancel_on_click(self):
+        # the worker posts CANCELLED once it stopped, which hands the search back to the buttons
+        self._search_worker.cancel()
+
+    def _set_search_buttons(self, background: bool) -> None:
+        """
+        :param background: enable pause and cancel for a background search, otherwise the buttons stepping the
+                           search in the foreground
+        """
+        foreground_state, background_state = (tk.DISABLED, tk.NORMAL) if background else (tk.NORMAL, tk.DISABLED)
+        for button in (self._btn_game_next, self._btn_game_fast_forward, self._btn_game_run):
+            button['state'] = foreground_state
+        for button in (self._btn_game_pause, self._btn_game_cancel):
+            button['state'] = background_state
+        self._btn_game_pause['text'] = self._button_names["game_pause"]
+
+    def _handle_search_events(self) -> None:
+        """
+        redraws the nodes the background search changed since the last poll and polls again until the search
+        finished or was cancelled. the worker posts no steps, its only event is the one that ends it
+        """
+        self._search_events_job = None
+        try:
+            event, _ = self._search_worker.events.get_nowait()
+        except queue.Empty:
+            event = None
+
+        if event == SearchEvent.CANCELLED:
+            # cancelled between two steps, the search can go on in the foreground
+            self._set_search_buttons(background=False)
+        elif event is not None:
+            # the search buttons go along with the context menu
+            self._finish_game(path_found=event == SearchEvent.PATH)
+        self._redraw_changes()
+
+        if event is not None:
+            self._search_worker = None
+        else:
+            self._search_events_job = self._window.after(self._background_search["poll_ms"],
+                                                         self._handle_search_events)
 
     def _reset_game(self):
+        # stop fast forwarding
+        if self._fast_forward_job is not None:
+            self._window.after_cancel(self._fast_forward_job)
+            self._fast_forward_job = None
+
+        # stop the background search
+        if self._search_worker is not None:
+            self._search_worker.cancel()
+            self._search_worker = None
+        if self._search_events_job is not None:
+            self._window.after_cancel(self._search_events_job)
+            self._search_events_job = None
+
         # delete context menu children
         for context_menu_slave in self._window.nametowidget('.context_menu').grid_slaves():
             context_menu_slave.destroy()
@@ -398,7 +551,7 @@ class PathFinder:
             board_slave.destroy()
 
         # clean up instance variables:
-        self._board_node_buttons = None
+        self._board_canvas = None
         self._setup_candidates = {
             "source": None,
             "target": None,
@@ -406,6 +559,8 @@ class PathFinder:
         }
         self._board: Board = None
         self._astar: AStar = None
+        self._changes = None
+        self._changes_cursor = 0
 
         # reset game state
         self.game_state = GameState.RESET
@@ -419,63 +574,59 @@ class PathFinder:
         :param rows: row size of board to be built
         :param columns: column size of board to be built
         """
-        # show board cells
-        self._board_node_buttons = [[None for j in range(columns)] for i in range(rows)]
-        for i in range(rows):
-            for j in range(columns):
-                self._board_node_buttons[i][j] = NodeButton(master=self._frm_board,
-                                                            node=self._board.get_node(row=i, column=j),
-                                                            on_click_callback=self._btn_board_node_on_click)
+        # one canvas draws every cell, so showing a board costs the same whatever its size
+        self._board_canvas = BoardCanvas(master=self._frm_board, board=self._board,
+                                         on_click_callback=self._board_on_click)
 
     def _hide_board(self):
         self._frm_board.destroy()
 
-    def _btn_board_node_on_click(self, event: tk.Event, button: NodeButton):
-        # need event arg to handle event from tk.Widget.bind, even if unused
-
-        existing_source_candidate: NodeButton = self._setup_candidates["source"]
-        existing_target_candidate: NodeButton = self._setup_candidates["target"]
+    def _board_on_click(self, row: int, column: int):
+        cell = (row, column)
+        existing_source_candidate: tuple = self._setup_candidates["source"]
+        existing_target_candidate: tuple = self._setup_candidates["target"]
 
         if self._game_state == GameState.SETUP_SOURCE_BEGIN:
             # unmark existing source candidate
             if existing_source_candidate is not None:
-                existing_source_candidate.update_lbl_state(state=NodeState.OPEN)
+                self._board_canvas.show_state(*existing_source_candidate, state=NodeState.OPEN)
 
             # mark new source candidate
-            button.update_lbl_state(state=NodeState.SRCE)
-            self._setup_candidates["source"] = button
+            self._board_canvas.show_state(row, column, state=NodeState.SRCE)
+            self._setup_candidates["source"] = cell
 
         elif self._game_state == GameState.SETUP_TARGET_BEGIN:
             # source node cannot be target node
-            if button == existing_source_candidate:
+            if cell == existing_source_candidate:
                 self._update_prompt("The source cannot be the target. " + self._prompt_strings["target"])
 
             else:
                 # unmark existing target node if exists
                 if existing_target_candidate is not None:
-                    existing_target_candidate.update_lbl_state(state=NodeState.OPEN)
+                    self._board_canvas.show_state(*existing_target_candidate, state=NodeState.OPEN)
 
                 # selected a valid target
-                button.update_lbl_state(state=NodeState.TRGT)
-                self._setup_candidates["target"] = button
+                self._board_canvas.show_state(row, column, state=NodeState.TRGT)
+                self._setup_candidates["target"] = cell
 
         elif self._game_state == GameState.SETUP_BLOCKED_BEGIN:
             # source node cannot be blocked
-            if button == existing_source_candidate:
+            if cell == existing_source_candidate:
                 self._update_prompt("The source cannot be blocked. " + self._prompt_strings["target"])
 
             # target node cannot be blocked
-            elif button == existing_target_candidate:
+            elif cell == existing_target_candidate:
                 self._update_prompt("The target cannot be blocked. " + self._prompt_strings["target"])
 
             # unset existing blocked node
-            elif button.lbl_state["text"] == NodeState.WALL.name:
-                button.update_lbl_state(state=NodeState.OPEN)
+            elif self._board_canvas.get_shown_state(row, column) == NodeState.WALL:
+                self._board_canvas.show_state(row, column, state=NodeState.OPEN)
+                self._setup_candidates["blocked"].remove(cell)
 
             # selected a valid cell to be blocked
             else:
-                button.update_lbl_state(state=NodeState.WALL)
-                self._setup_candidates["blocked"].append(button)
+                self._board_canvas.show_state(row, column, state=NodeState.WALL)
+                self._setup_candidates["blocked"].append(cell)
 
         else:
             pass
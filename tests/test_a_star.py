@@ -0,0 +1,242 @@
+import heapq
+import math
+import random
+import unittest
+
+from game.a_star import AStar, IndexAStar
+from game.board import Board
+from game.change_buffer import ChangeBuffer
+from game.node import NodeState, node_state_codes
+
+
+def _build_board(size: int, seed: int, wall_density: float) -> Board:
+    """
+    :return: board with walls on a random share of its cells, source in the top left and target in the bottom right
+             corner
+    """
+    board = Board(rows=size, columns=size)
+    board.set_source_node(row=0, column=0)
+    board.set_target_node(row=size - 1, column=size - 1)
+    rng = random.Random(seed)
+    for row in range(size):
+        for column in range(size):
+            if (row, column) not in ((0, 0), (size - 1, size - 1)) and rng.random() < wall_density:
+                board.set_blocked_node(row=row, column=column)
+    return board
+
+
+def _run_a_star(board: Board, **options) -> (list, list):
+    """
+    :return: cell indices of the expanded nodes in expansion order, source excluded, and of the path, empty if
+             there is none
+    """
+    a_star = AStar(board=board, **options)
+    visited = []
+    while True:
+        current_node, updated_neighbor_nodes = a_star.next()
+        if updated_neighbor_nodes is None:
+            break
+        if current_node != board.source:
+            visited.append(current_node.x * board.columns + current_node.y)
+    if current_node is None:
+        return visited, []
+    return visited, [node.x * board.columns + node.y for node in a_star.get_path()]
+
+
+def _dijkstra(board: Board, connectivity: int) -> float:
+    """
+    :return: cost of the cheapest path from source to target, a step costs its length times the average weight of
+             both cells
+    """
+    passable = board.get_passable_cells()
+    weights = board.get_weights()
+    columns = board.columns
+    source = board.source.x * columns + board.source.y
+    distances = {source: 0.0}
+    open_cells = [(0.0, source)]
+    while open_cells:
+        distance, cell = heapq.heappop(open_cells)
+        if distance > distances[cell]:
+            continue
+        row, column = divmod(cell, columns)
+        for i in (-1, 0, 1):
+            for j in (-1, 0, 1):
+                if (i, j) == (0, 0) or connectivity == 4 and i != 0 and j != 0:
+                    continue
+                if not (0 <= row + i < board.rows and 0 <= column + j < columns):
+                    continue
+                neighbor = cell + i * columns + j
+                if not passable[neighbor]:
+                    continue
+                candidate = distance + math.hypot(i, j) * (weights[cell] + weights[neighbor]) * 0.5
+                if candidate < distances.get(neighbor, math.inf):
+                    distances[neighbor] = candidate
+                    heapq.heappush(open_cells, (candidate, neighbor))
+    return distances.get(board.target.x * columns + board.target.y)
+
+
+class IndexAStarTest(unittest.TestCase):
+
+    def test_same_expansions_and_path_as_a_star(self):
+        # the target is walled in on the boards of seed 5
+        for seed, wall_density in ((7, 0.0), (7, 0.2), (7, 0.35), (5, 0.2)):
+            for connectivity, heuristic in ((8, 'euclidean'), (8, 'octile'), (4, 'manhattan')):
+                with self.subTest(seed=seed, wall_density=wall_density, connectivity=connectivity,
+                                  heuristic=heuristic):
+                    board = _build_board(size=30, seed=seed, wall_density=wall_density)
+                    index_a_star = IndexAStar(board=board, connectivity=connectivity, heuristic=heuristic)
+                    found = index_a_star.search()
+                    visited, path = _run_a_star(board=board, connectivity=connectivity, heuristic=heuristic)
+                    self.assertEqual(found, bool(path))
+                    self.assertEqual(index_a_star.get_visited(), visited)
+                    self.assertEqual(index_a_star.get_path() if found else [], path)
+
+    def test_path_is_walkable_and_as_long_as_the_distance(self):
+        # the target is walled in on the boards of seed 5
+        for seed, wall_density in ((7, 0.0), (7, 0.2), (7, 0.35), (5, 0.2)):
+            with self.subTest(seed=seed, wall_density=wall_density):
+                board = _build_board(size=30, seed=seed, wall_density=wall_density)
+                index_a_star = IndexAStar(board=board)
+                found = index_a_star.search()
+                self.assertEqual(found, bool(_run_a_star(board=board)[1]))
+                if not found:
+                    self.assertIsNone(index_a_star.distance)
+                    continue
+
+                passable = board.get_passable_cells()
+                cells = [(0, 0)] + [divmod(index, 30) for index in index_a_star.get_path()] + [(29, 29)]
+                length = 0.0
+                for (row, column), (next_row, next_column) in zip(cells, cells[1:]):
+                    self.assertTrue(passable[next_row * 30 + next_column])
+                    self.assertLessEqual(max(abs(next_row - row), abs(next_column - column)), 1)
+                    length += math.hypot(next_row - row, next_column - column)
+                self.assertAlmostEqual(length, index_a_star.distance)
+
+    def test_board_is_left_untouched(self):
+        board = _build_board(size=30, seed=7, wall_density=0.2)
+        states = [[node.state for node in row] for row in board.board]
+        IndexAStar(board=board).search()
+        self.assertEqual([[node.state for node in row] for row in board.board], states)
+
+    def test_reset_searches_again_from_scratch(self):
+        board = _build_board(size=30, seed=3, wall_density=0.2)
+        index_a_star = IndexAStar(board=board)
+        queries = [((0, 0), (29, 29)), ((29, 0), (0, 29)), ((15, 15), (0, 0))]
+        for source, target in queries:
+            with self.subTest(source=source, target=target):
+                index_a_star.reset(source=source, target=target)
+                found = index_a_star.search()
+                fresh = IndexAStar(board=board, source=source, target=target)
+                self.assertEqual(found, fresh.search())
+                self.assertEqual(index_a_star.get_path(), fresh.get_path())
+                self.assertEqual(index_a_star.distance, fresh.distance)
+
+    def test_heuristic_field_gives_the_same_search(self):
+        board = _build_board(size=30, seed=7, wall_density=0.2)
+        for heuristic in ('euclidean', 'octile', 'manhattan'):
+            with self.subTest(heuristic=heuristic):
+                index_a_star = IndexAStar(board=board, heuristic=heuristic)
+                index_a_star.search()
+                field_index_a_star = IndexAStar(board=board, heuristic=heuristic, heuristic_field=True)
+                field_index_a_star.search()
+                self.assertEqual(field_index_a_star.get_visited(), index_a_star.get_visited())
+                self.assertEqual(field_index_a_star.get_path(), index_a_star.get_path())
+                # AStar marks the nodes it visits, so each run gets a board of its own
+                self.assertEqual(
+                    _run_a_star(board=_build_board(size=30, seed=7, wall_density=0.2), heuristic=heuristic,
+                                heuristic_field=True),
+                    _run_a_star(board=_build_board(size=30, seed=7, wall_density=0.2), heuristic=heuristic))
+
+    def test_weighted_boards_match_a_star_and_dijkstra(self):
+        for seed in range(3):
+            for connectivity, heuristic in ((8, 'euclidean'), (4, 'manhattan')):
+                with self.subTest(seed=seed, connectivity=connectivity, heuristic=heuristic):
+                    board = _build_board(size=30, seed=seed, wall_density=0.2)
+                    rng = random.Random(seed)
+                    for row in range(30):
+                        for column in range(30):
+                            board.set_weight(row=row, column=column, weight=rng.randint(2, 4))
+                    index_a_star = IndexAStar(board=board, connectivity=connectivity, heuristic=heuristic)
+                    found = index_a_star.search()
+                    visited, path = _run_a_star(board=board, connectivity=connectivity, heuristic=heuristic)
+                    self.assertEqual(index_a_star.get_visited(), visited)
+                    self.assertEqual(index_a_star.get_path() if found else [], path)
+                    if found:
+                        self.assertAlmostEqual(index_a_star.distance,
+                                               _dijkstra(board=board, connectivity=connectivity))
+
+    def test_ties_prefer_the_deeper_node(self):
+        # every cell of an open 4-connected board lies on a shortest path, so the search heads straight for the
+        # target instead of expanding the whole board
+        board = _build_board(size=50, seed=0, wall_density=0.0)
+        index_a_star = IndexAStar(board=board, connectivity=4, heuristic='manhattan')
+        index_a_star.search()
+        self.assertEqual(index_a_star.expanded, 98)
+        self.assertEqual(index_a_star.distance, 98)
+
+
+class AStarTest(unittest.TestCase):
+
+    def test_ties_prefer_the_deeper_node(self):
+        # every cell of an open 4-connected board lies on a shortest path, so the search heads straight for the
+        # target instead of expanding the whole board
+        for open_set in AStar._open_set_classes:
+            with self.subTest(open_set=open_set):
+                visited, path = _run_a_star(board=_build_board(size=50, seed=0, wall_density=0.0), open_set=open_set,
+                                            connectivity=4, heuristic='manhattan')
+                self.assertEqual(len(visited), 97)
+                self.assertEqual(len(path), 97)
+
+    def test_bucket_queue_stays_bucketed_on_weighted_boards(self):
+        # a step costs the average of two integer weights, a multiple of the default resolution of 0.5
+        board = _build_board(size=30, seed=1, wall_density=0.2)
+        rng = random.Random(1)
+        for row in range(30):
+            for column in range(30):
+                board.set_weight(row=row, column=column, weight=rng.randint(1, 4))
+        a_star = AStar(board=board, open_set='bucket_queue', connectivity=4, heuristic='manhattan')
+        while a_star.next()[1] is not None:
+            pass
+        self.assertTrue(a_star._open_nodes.is_bucketed)
+
+
+
+class ChangeRecordsTest(unittest.TestCase):
+
+    def test_records_alone_rebuild_the_board(self):
+        board = _build_board(size=30, seed=4, wall_density=0.2)
+        states = bytearray(board.get_cell_states())
+        distances_to_source = [None] * len(states)
+        distances_to_target = [None] * len(states)
+
+        def apply(index: int, state_code: int, distance_to_source: float, distance_to_target: float) -> None:
+            states[index] = state_code
+            distances_to_source[index] = distance_to_source
+            distances_to_target[index] = distance_to_target
+
+        # small enough to wrap around many times, read often enough to never fall behind
+        changes = ChangeBuffer(capacity=64)
+        a_star = AStar(board=board, changes=changes)
+        cursor = 0
+        while True:
+            current_node, updated_neighbor_nodes = a_star.next()
+            cursor = changes.read(cursor=cursor, apply=apply)
+            if updated_neighbor_nodes is None:
+                break
+            self.assertEqual(updated_neighbor_nodes, ())
+
+        self.assertEqual(states, board.get_cell_states())
+        self.assertIn(node_state_codes[NodeState.PATH], states)
+        for row in range(board.rows):
+            for column in range(board.columns):
+                node = board.get_node(row=row, column=column)
+                index = row * board.columns + column
+                # records only cover the cells the search changed, the source keeps its distances from the start
+                if node.state in (NodeState.OPEN, NodeState.WALL, NodeState.SRCE):
+                    continue
+                self.assertTrue(math.isclose(distances_to_source[index], node.distance_to_source))
+                self.assertTrue(math.isclose(distances_to_target[index], node.distance_to_target))
+
+
+if __name__ == '__main__':
+    unittest.main()
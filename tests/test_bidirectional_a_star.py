@@ -0,0 +1,67 @@
+import random
+import unittest
+
+from game.bidirectional_a_star import BidirectionalAStar
+from game.board import Board
+from game.node import NodeState
+from game.search import find_path
+
+
+def _run(search) -> int:
+    """
+    :return: number of nodes expanded until the search stopped
+    """
+    expanded = 0
+    while True:
+        _, updated_neighbor_nodes = search.next()
+        if updated_neighbor_nodes is None:
+            return expanded
+        expanded += 1
+
+
+class BidirectionalAStarTest(unittest.TestCase):
+
+    def test_stops_with_an_optimal_path(self):
+        size = 30
+        for seed in range(6):
+            for connectivity, heuristic in ((8, 'euclidean'), (8, 'octile'), (4, 'manhattan')):
+                with self.subTest(seed=seed, connectivity=connectivity, heuristic=heuristic):
+                    rng = random.Random(seed)
+                    board = Board(rows=size, columns=size)
+                    for _ in range(size * size // 4):
+                        board.set_blocked_node(row=rng.randrange(size), column=rng.randrange(size))
+                    source = (rng.randrange(size), rng.randrange(size))
+                    target = (rng.randrange(size), rng.randrange(size))
+                    for row, column in (source, target):
+                        board.set_unblocked_node(row=row, column=column)
+                    board.set_source_node(*source)
+                    board.set_target_node(*target)
+
+                    expected = find_path(board=board, source=source, target=target, connectivity=connectivity,
+                                         heuristic=heuristic)
+                    search = BidirectionalAStar(board=board, connectivity=connectivity, heuristic=heuristic)
+                    _run(search=search)
+                    if not expected.found:
+                        self.assertIsNone(search.distance)
+                        continue
+                    self.assertAlmostEqual(search.distance, expected.distance)
+
+                    # the marked path walks from source to target
+                    path = [(node.x, node.y) for node in search.get_path()]
+                    self.assertEqual(len(path), max(len(expected.path) - 2, 0))
+                    self.assertTrue(all(board.get_node(*cell).state == NodeState.PATH for cell in path))
+
+    def test_stops_before_expanding_the_board(self):
+        board = Board(rows=50, columns=50)
+        board.set_source_node(row=25, column=0)
+        board.set_target_node(row=25, column=49)
+        search = BidirectionalAStar(board=board, connectivity=4, heuristic='manhattan')
+        expanded = _run(search=search)
+        self.assertEqual(search.distance, 49)
+        # the frontiers meet in the middle of the row and stop as soon as their keys prove the candidate optimal,
+        # instead of going on until both open sets run dry
+        self.assertLessEqual(expanded, 2 * 49)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,62 @@
+import random
+import unittest
+
+from game.a_star import IndexAStar
+from game.board import Board
+from game.compact_board import CompactBoard
+from game.hierarchical_search import HierarchicalPathfinder
+from game.incremental_search import DStarLite
+from game.node import NodeState, node_state_codes
+from game.search import find_path
+
+
+class SetCellStatesTest(unittest.TestCase):
+
+    def test_live_searches_see_walls_set_at_once(self):
+        size = 24
+        wall_code = node_state_codes[NodeState.WALL]
+        open_code = node_state_codes[NodeState.OPEN]
+        for board_class in (Board, CompactBoard):
+            for seed in range(4):
+                with self.subTest(board_class=board_class.__name__, seed=seed):
+                    board = board_class(rows=size, columns=size)
+                    board.set_source_node(row=0, column=0)
+                    board.set_target_node(row=size - 1, column=size - 1)
+                    hierarchical = HierarchicalPathfinder(board=board, cluster_size=6)
+                    hierarchical.build()
+                    incremental = DStarLite(board=board)
+                    incremental.search()
+                    index_a_star = IndexAStar(board=board)
+                    board.is_reachable(source=(0, 0), target=(size - 1, size - 1))
+
+                    rng = random.Random(seed)
+                    states = board.get_cell_states()
+                    for index in range(size * size):
+                        if states[index] == open_code and rng.random() < 0.3:
+                            states[index] = wall_code
+                    board.set_cell_states(states)
+
+                    fresh_board = board_class(rows=size, columns=size)
+                    fresh_board.set_cell_states(states)
+                    expected = find_path(board=fresh_board, source=(0, 0), target=(size - 1, size - 1))
+                    self.assertEqual(bytes(board.get_neighbor_masks()), bytes(fresh_board.get_neighbor_masks()))
+                    self.assertEqual(find_path(board=board, source=(0, 0), target=(size - 1, size - 1)).distance,
+                                     expected.distance)
+
+                    index_a_star.search()
+                    self.assertEqual(index_a_star.distance, expected.distance)
+                    incremental.search()
+                    if expected.distance is None:
+                        self.assertIsNone(incremental.distance)
+                    else:
+                        self.assertAlmostEqual(incremental.distance, expected.distance)
+
+                    result = hierarchical.find_path(source=(0, 0), target=(size - 1, size - 1))
+                    self.assertEqual(result.found, expected.found)
+                    if result.found:
+                        self.assertGreaterEqual(result.distance, expected.distance - 1e-9)
+                        self.assertTrue(all(states[row * size + column] != wall_code for row, column in result.path))
+
+
+if __name__ == '__main__':
+    unittest.main()
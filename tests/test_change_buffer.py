@@ -0,0 +1,95 @@
+import sys
+import threading
+import unittest
+
+from game.change_buffer import ChangeBuffer
+
+
+def _get_record(sequence: int) -> tuple:
+    """
+    :return: record whose every field is derived from its position in the sequence, so a torn or overwritten record
+             does not match
+    """
+    return sequence, sequence % 7, float(sequence), None if sequence % 3 == 0 else float(-sequence)
+
+
+class ChangeBufferTest(unittest.TestCase):
+
+    def test_records_wrap_around(self):
+        changes = ChangeBuffer(capacity=7)
+        records = []
+        cursor = 0
+        for sequence in range(50):
+            changes.append(*_get_record(sequence=sequence))
+            if sequence % 5 == 4:
+                cursor = changes.read(cursor=cursor, apply=lambda *record: records.append(record))
+        self.assertEqual(records, [_get_record(sequence=sequence) for sequence in range(50)])
+        self.assertEqual(cursor, changes.written)
+
+    def test_overrun_reader_gets_none(self):
+        changes = ChangeBuffer(capacity=7)
+        for sequence in range(8):
+            changes.append(*_get_record(sequence=sequence))
+        records = []
+        self.assertTrue(changes.is_overrun(cursor=0))
+        self.assertIsNone(changes.read(cursor=0, apply=lambda *record: records.append(record)))
+        self.assertEqual(records, [])
+
+    def test_reader_lapped_while_copying_gets_none(self):
+        changes = ChangeBuffer(capacity=8)
+        for sequence in range(4):
+            changes.append(*_get_record(sequence=sequence))
+        lapped = []
+
+        class LappingStates(bytearray):
+            """
+            lets a writer lap the buffer the moment the reader starts copying the states, after the indices
+            """
+
+            def __getitem__(self, key):
+                if not lapped:
+                    lapped.append(True)
+                    for sequence in range(4, 12):
+                        changes.append(*_get_record(sequence=sequence))
+                return bytearray.__getitem__(self, key)
+
+        changes._states = LappingStates(changes._states)
+        records = []
+        self.assertIsNone(changes.read(cursor=0, apply=lambda *record: records.append(record)))
+        self.assertEqual(records, [])
+
+    def test_concurrent_writer_never_hands_out_overwritten_records(self):
+        changes = ChangeBuffer(capacity=64)
+        total = 50_000
+        stopped = threading.Event()
+
+        def write():
+            for sequence in range(total):
+                changes.append(*_get_record(sequence=sequence))
+            stopped.set()
+
+        switch_interval = sys.getswitchinterval()
+        sys.setswitchinterval(1e-6)
+        writer = threading.Thread(target=write)
+        try:
+            writer.start()
+            cursor = 0
+            reads = overruns = 0
+            while not stopped.is_set() or cursor != changes.written:
+                records = []
+                next_cursor = changes.read(cursor=cursor, apply=lambda *record: records.append(record))
+                if next_cursor is None:
+                    overruns += 1
+                    cursor = changes.written
+                    continue
+                self.assertEqual(records, [_get_record(sequence=sequence) for sequence in range(cursor, next_cursor)])
+                reads += 1
+                cursor = next_cursor
+        finally:
+            writer.join()
+            sys.setswitchinterval(switch_interval)
+        self.assertGreater(reads, 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
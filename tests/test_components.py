@@ -0,0 +1,63 @@
+import random
+import unittest
+
+from game.board import Board
+from game.components import ComponentLabels
+
+
+class ComponentLabelsTest(unittest.TestCase):
+
+    def _assert_same_components(self, labels: ComponentLabels, board: Board) -> None:
+        """
+        compares labels kept up to date through wall edits with labels built from scratch
+        """
+        fresh = ComponentLabels(board=board)
+        self.assertEqual(labels.component_count, fresh.component_count)
+        cells = range(board.rows * board.columns)
+        # two cells share a component in both labellings or in neither, walls are in none
+        first_cells = {}
+        for index in cells:
+            component = labels.get_component(index=index)
+            self.assertEqual(component < 0, fresh.get_component(index=index) < 0)
+            if component >= 0:
+                first = first_cells.setdefault(component, index)
+                self.assertTrue(fresh.is_connected(index=first, other_index=index))
+        for first, other in zip(first_cells.values(), list(first_cells.values())[1:]):
+            self.assertFalse(fresh.is_connected(index=first, other_index=other))
+
+    def test_wall_splits_and_joins_components(self):
+        board = Board(rows=5, columns=5)
+        labels = board.get_component_labels()
+        self.assertEqual(labels.component_count, 1)
+
+        # a wall across the middle row splits the board in two, 8-connectivity does not cross it
+        for column in range(5):
+            board.set_blocked_node(row=2, column=column)
+        self.assertEqual(labels.component_count, 2)
+        self.assertFalse(labels.is_connected(index=0, other_index=24))
+        self.assertFalse(board.is_reachable(source=(0, 0), target=(4, 4)))
+        self._assert_same_components(labels=labels, board=board)
+
+        # one opening joins them again
+        board.set_unblocked_node(row=2, column=3)
+        self.assertEqual(labels.component_count, 1)
+        self.assertTrue(board.is_reachable(source=(0, 0), target=(4, 4)))
+        self._assert_same_components(labels=labels, board=board)
+
+    def test_random_edits_match_fresh_labels(self):
+        for seed in range(4):
+            with self.subTest(seed=seed):
+                rng = random.Random(seed)
+                board = Board(rows=16, columns=16)
+                labels = board.get_component_labels()
+                for _ in range(300):
+                    row, column = rng.randrange(16), rng.randrange(16)
+                    if rng.random() < 0.6:
+                        board.set_blocked_node(row=row, column=column)
+                    else:
+                        board.set_unblocked_node(row=row, column=column)
+                self._assert_same_components(labels=labels, board=board)
+
+
+if __name__ == '__main__':
+    unittest.main()
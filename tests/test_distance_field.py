@@ -0,0 +1,80 @@
+import random
+import unittest
+
+from game.board import Board
+from game.distance_field import DistanceField, DistanceFieldCache
+from game.search import find_path
+
+
+def _build_board(size: int, seed: int, wall_density: float) -> Board:
+    """
+    :return: board with walls on a random share of its cells
+    """
+    board = Board(rows=size, columns=size)
+    rng = random.Random(seed)
+    for row in range(size):
+        for column in range(size):
+            if rng.random() < wall_density:
+                board.set_blocked_node(row=row, column=column)
+    return board
+
+
+class DistanceFieldCacheTest(unittest.TestCase):
+
+    def test_paths_match_a_search(self):
+        size = 25
+        for seed in range(3):
+            for connectivity in (4, 8):
+                with self.subTest(seed=seed, connectivity=connectivity):
+                    board = _build_board(size=size, seed=seed, wall_density=0.25)
+                    cache = DistanceFieldCache(board=board)
+                    rng = random.Random(seed)
+                    target = (rng.randrange(size), rng.randrange(size))
+                    board.set_unblocked_node(*target)
+                    passable = board.get_passable_cells()
+                    for _ in range(30):
+                        source = (rng.randrange(size), rng.randrange(size))
+                        result = cache.find_path(source=source, target=target, connectivity=connectivity)
+                        expected = find_path(board=board, source=source, target=target, connectivity=connectivity,
+                                             heuristic='octile' if connectivity == 8 else 'manhattan')
+                        self.assertEqual(result.found, expected.found)
+                        if not result.found:
+                            continue
+                        self.assertAlmostEqual(result.distance, expected.distance)
+                        self.assertEqual(result.path[0], source)
+                        self.assertEqual(result.path[-1], target)
+                        self.assertTrue(all(passable[row * size + column] for row, column in result.path))
+                    # every query shares one field
+                    self.assertEqual(len(cache), 1)
+                    cache.close()
+
+    def test_edits_drop_the_cached_fields(self):
+        board = Board(rows=10, columns=10)
+        cache = DistanceFieldCache(board=board)
+        self.assertEqual(cache.find_path(source=(0, 0), target=(0, 9)).distance, 9)
+        self.assertEqual(len(cache), 1)
+
+        for row in range(9):
+            board.set_blocked_node(row=row, column=5)
+        self.assertEqual(len(cache), 0)
+        self.assertEqual(cache.find_path(source=(0, 0), target=(0, 9)).distance,
+                         find_path(board=board, source=(0, 0), target=(0, 9)).distance)
+        cache.close()
+
+    def test_memory_budget_evicts_the_least_recently_used_field(self):
+        board = Board(rows=10, columns=10)
+        field_nbytes = DistanceField(board=board, target=(0, 0)).nbytes
+        cache = DistanceFieldCache(board=board, memory_budget=2 * field_nbytes)
+        first = cache.get_field(target=(0, 0))
+        second = cache.get_field(target=(9, 9))
+        self.assertIs(cache.get_field(target=(0, 0)), first)
+        cache.get_field(target=(5, 5))
+        self.assertEqual(len(cache), 2)
+        self.assertEqual(cache.nbytes, 2 * field_nbytes)
+        self.assertIs(cache.get_field(target=(0, 0)), first)
+        self.assertIsNot(cache.get_field(target=(9, 9)), second)
+        cache.close()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,69 @@
+import random
+import unittest
+
+from game.board import Board
+from game.hierarchical_search import HierarchicalPathfinder
+from game.search import find_path
+
+
+class HierarchicalPathfinderTest(unittest.TestCase):
+
+    def _assert_path_is_valid(self, board: Board, source: tuple, target: tuple,
+                              hierarchical: HierarchicalPathfinder) -> None:
+        """
+        compares a query against an optimal search on the same board
+        """
+        expected = find_path(board=board, source=source, target=target)
+        result = hierarchical.find_path(source=source, target=target)
+        self.assertEqual(result.found, expected.found)
+        if not result.found:
+            return
+        self.assertGreaterEqual(result.distance, expected.distance - 1e-9)
+        self.assertEqual(result.path[0], source)
+        self.assertEqual(result.path[-1], target)
+        passable = board.get_passable_cells()
+        for (row, column), (next_row, next_column) in zip(result.path, result.path[1:]):
+            self.assertTrue(passable[next_row * board.columns + next_column])
+            self.assertLessEqual(max(abs(next_row - row), abs(next_column - column)), 1)
+
+    def test_queries_after_wall_edits(self):
+        size = 30
+        for seed in range(4):
+            with self.subTest(seed=seed):
+                rng = random.Random(seed)
+                board = Board(rows=size, columns=size)
+                for _ in range(size * size // 5):
+                    board.set_blocked_node(row=rng.randrange(size), column=rng.randrange(size))
+                hierarchical = HierarchicalPathfinder(board=board, cluster_size=8)
+                hierarchical.build()
+
+                for _ in range(20):
+                    # every edit rebuilds the clusters around it, the queries must see the new walls
+                    for _ in range(10):
+                        row, column = rng.randrange(size), rng.randrange(size)
+                        if rng.random() < 0.5:
+                            board.set_blocked_node(row=row, column=column)
+                        else:
+                            board.set_unblocked_node(row=row, column=column)
+                    source = (rng.randrange(size), rng.randrange(size))
+                    target = (rng.randrange(size), rng.randrange(size))
+                    self._assert_path_is_valid(board=board, source=source, target=target, hierarchical=hierarchical)
+                hierarchical.close()
+
+    def test_wall_across_clusters_and_an_opening(self):
+        board = Board(rows=16, columns=16)
+        hierarchical = HierarchicalPathfinder(board=board, cluster_size=4)
+        for row in range(16):
+            board.set_blocked_node(row=row, column=8)
+        self.assertFalse(hierarchical.find_path(source=(0, 0), target=(0, 15)).found)
+
+        # the opening becomes an entrance of the rebuilt clusters on both sides of the wall
+        board.set_unblocked_node(row=13, column=8)
+        result = hierarchical.find_path(source=(0, 0), target=(0, 15))
+        self.assertTrue(result.found)
+        self.assertIn((13, 8), result.path)
+        hierarchical.close()
+
+
+if __name__ == '__main__':
+    unittest.main()
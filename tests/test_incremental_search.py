@@ -0,0 +1,70 @@
+import random
+import unittest
+
+from game.board import Board
+from game.incremental_search import DStarLite
+from game.search import find_path
+
+
+class DStarLiteTest(unittest.TestCase):
+
+    def test_repairs_match_a_fresh_search_after_wall_edits(self):
+        size = 30
+        for seed in range(4):
+            for connectivity in (4, 8):
+                with self.subTest(seed=seed, connectivity=connectivity):
+                    rng = random.Random(seed)
+                    board = Board(rows=size, columns=size)
+                    for _ in range(size * size // 5):
+                        board.set_blocked_node(row=rng.randrange(size), column=rng.randrange(size))
+                    source, target = (0, 0), (size - 1, size - 1)
+                    for row, column in (source, target):
+                        board.set_unblocked_node(row=row, column=column)
+                    d_star_lite = DStarLite(board=board, source=source, target=target, connectivity=connectivity,
+                                            heuristic='octile' if connectivity == 8 else 'manhattan')
+
+                    for _ in range(15):
+                        found = d_star_lite.search()
+                        expected = find_path(board=board, source=source, target=target, connectivity=connectivity)
+                        self.assertEqual(found, expected.found)
+                        if found:
+                            self.assertAlmostEqual(d_star_lite.distance, expected.distance)
+                            path = d_star_lite.get_path()
+                            self.assertTrue(all(board.get_passable_cells()[index] for index in path))
+
+                        # walls come and go anywhere but on source and target
+                        for _ in range(8):
+                            row, column = rng.randrange(size), rng.randrange(size)
+                            if (row, column) in (source, target):
+                                continue
+                            if rng.random() < 0.6:
+                                board.set_blocked_node(row=row, column=column)
+                            else:
+                                board.set_unblocked_node(row=row, column=column)
+                    d_star_lite.close()
+
+    def test_source_moves_along_the_path(self):
+        size = 20
+        board = Board(rows=size, columns=size)
+        for row in range(size - 4):
+            board.set_blocked_node(row=row, column=10)
+        d_star_lite = DStarLite(board=board, source=(0, 0), target=(0, size - 1))
+        self.assertTrue(d_star_lite.search())
+
+        # walk a few steps, then close the gap the path runs through and open another one
+        for index in d_star_lite.get_path()[:5]:
+            d_star_lite.move_source(*divmod(index, size))
+        for row in range(size - 4, size):
+            board.set_blocked_node(row=row, column=10)
+        board.set_unblocked_node(row=2, column=10)
+
+        self.assertTrue(d_star_lite.search())
+        source = divmod(d_star_lite.source, size)
+        expected = find_path(board=board, source=source, target=(0, size - 1))
+        self.assertAlmostEqual(d_star_lite.distance, expected.distance)
+        self.assertIn(2 * size + 10, d_star_lite.get_path())
+        d_star_lite.close()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,69 @@
+import random
+import unittest
+
+from game.a_star import AStar
+from game.board import Board
+from game.change_buffer import ChangeBuffer
+from game.instrumentation import Instrumentation
+
+
+def _build_board(seed: int) -> Board:
+    board = Board(rows=20, columns=20)
+    board.set_source_node(row=0, column=0)
+    board.set_target_node(row=19, column=19)
+    rng = random.Random(seed)
+    for _ in range(80):
+        row, column = rng.randrange(20), rng.randrange(20)
+        if (row, column) not in ((0, 0), (19, 19)):
+            board.set_blocked_node(row=row, column=column)
+    return board
+
+
+def _run(a_star: AStar) -> (list, int):
+    """
+    :return: (row, column) of every expanded node, and the number of updated neighbors
+    """
+    visited = []
+    updated = 0
+    while True:
+        current_node, updated_neighbor_nodes = a_star.next()
+        if updated_neighbor_nodes is None:
+            return visited, updated
+        visited.append((current_node.x, current_node.y))
+        updated += len(updated_neighbor_nodes)
+
+
+class InstrumentationTest(unittest.TestCase):
+
+    def test_instrumented_search_expands_the_same_nodes_and_counts_them(self):
+        for open_set in AStar._open_set_classes:
+            with self.subTest(open_set=open_set):
+                instrumentation = Instrumentation()
+                visited, updated = _run(a_star=AStar(board=_build_board(seed=2), open_set=open_set,
+                                                     instrumentation=instrumentation))
+                self.assertEqual(visited, _run(a_star=AStar(board=_build_board(seed=2), open_set=open_set))[0])
+
+                statistics = instrumentation.as_dict()
+                self.assertEqual(statistics['counters']['a_star.expanded'], len(visited))
+                self.assertEqual(statistics['counters']['a_star.updated_neighbors'], updated)
+                # the last call finds the path or runs out of nodes
+                self.assertEqual(statistics['timers']['a_star.next']['calls'], len(visited) + 1)
+                self.assertEqual(sum(statistics['histograms']['open_set.size'].values()), len(visited) + 1)
+
+    def test_recorded_changes_are_counted_as_updated_neighbors(self):
+        _, updated = _run(a_star=AStar(board=_build_board(seed=2)))
+        instrumentation = Instrumentation()
+        a_star = AStar(board=_build_board(seed=2), instrumentation=instrumentation, changes=ChangeBuffer())
+        _run(a_star=a_star)
+        self.assertEqual(instrumentation.as_dict()['counters']['a_star.updated_neighbors'], updated)
+
+    def test_reset_clears_what_was_measured(self):
+        instrumentation = Instrumentation()
+        _run(a_star=AStar(board=_build_board(seed=3), instrumentation=instrumentation))
+        instrumentation.reset()
+        self.assertEqual(instrumentation.as_dict()['counters'], {})
+        self.assertEqual(instrumentation.as_dict()['timers'], {})
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,66 @@
+import math
+import random
+import unittest
+
+from game.a_star import IndexAStar
+from game.board import Board
+from game.jump_point_search import JumpPointSearch
+
+
+def _build_board(size: int, seed: int, wall_density: float) -> Board:
+    """
+    :return: board with walls on a random share of its cells, source in the top left and target in the bottom right
+             corner
+    """
+    board = Board(rows=size, columns=size)
+    board.set_source_node(row=0, column=0)
+    board.set_target_node(row=size - 1, column=size - 1)
+    rng = random.Random(seed)
+    for row in range(size):
+        for column in range(size):
+            if (row, column) not in ((0, 0), (size - 1, size - 1)) and rng.random() < wall_density:
+                board.set_blocked_node(row=row, column=column)
+    return board
+
+
+class JumpPointSearchTest(unittest.TestCase):
+
+    def test_distance_is_optimal(self):
+        for seed in range(6):
+            for wall_density in (0.0, 0.1, 0.25, 0.4):
+                with self.subTest(seed=seed, wall_density=wall_density):
+                    board = _build_board(size=40, seed=seed, wall_density=wall_density)
+                    rng = random.Random(seed)
+                    source = (rng.randrange(40), rng.randrange(40))
+                    target = (rng.randrange(40), rng.randrange(40))
+                    for row, column in (source, target):
+                        board.set_unblocked_node(row=row, column=column)
+
+                    index_a_star = IndexAStar(board=board, source=source, target=target, heuristic='octile')
+                    jump_point_search = JumpPointSearch(board=board, source=source, target=target)
+                    found = jump_point_search.search()
+                    self.assertEqual(found, index_a_star.search())
+                    if not found:
+                        continue
+                    self.assertAlmostEqual(jump_point_search.distance, index_a_star.distance)
+
+                    # the filled in path is walkable and as long as the distance
+                    passable = board.get_passable_cells()
+                    cells = [source] + [divmod(index, 40) for index in jump_point_search.get_path()] + [target]
+                    length = 0.0
+                    for (row, column), (next_row, next_column) in zip(cells, cells[1:]):
+                        self.assertTrue(passable[next_row * 40 + next_column])
+                        self.assertLessEqual(max(abs(next_row - row), abs(next_column - column)), 1)
+                        length += math.hypot(next_row - row, next_column - column)
+                    self.assertAlmostEqual(length, jump_point_search.distance)
+
+    def test_open_board_expands_few_jump_points(self):
+        board = _build_board(size=100, seed=0, wall_density=0.0)
+        jump_point_search = JumpPointSearch(board=board)
+        self.assertTrue(jump_point_search.search())
+        self.assertAlmostEqual(jump_point_search.distance, 99 * math.sqrt(2))
+        self.assertLess(jump_point_search.expanded, 10)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,164 @@
+import os
+import random
+import struct
+import tempfile
+import unittest
+import zlib
+
+from game.loaders import _inflate, load_pgm, load_png
+from game.node import NodeState
+
+
+def _paeth(left: int, above: int, upper_left: int) -> int:
+    estimate = left + above - upper_left
+    distances = (abs(estimate - left), abs(estimate - above), abs(estimate - upper_left))
+    if distances[0] <= distances[1] and distances[0] <= distances[2]:
+        return left
+    return above if distances[1] <= distances[2] else upper_left
+
+
+def _filter(filter_type: int, scanline: bytes, previous: bytes, pixel_size: int) -> bytes:
+    """
+    applies a png filter to one scanline, the reverse of what load_png undoes
+    """
+    filtered = bytearray()
+    for index, value in enumerate(scanline):
+        left = scanline[index - pixel_size] if index >= pixel_size else 0
+        upper_left = previous[index - pixel_size] if index >= pixel_size else 0
+        predictor = (0, left, previous[index], (left + previous[index]) >> 1,
+                     _paeth(left=left, above=previous[index], upper_left=upper_left))[filter_type]
+        filtered.append((value - predictor) & 0xFF)
+    return bytes([filter_type]) + bytes(filtered)
+
+
+def _write_png(path: str, columns: int, rows: int, bit_depth: int, color_type: int, scanlines: list,
+               palette: list = None, filters: list = (0,), idat_size: int = None) -> None:
+    """
+    writes a png of the given unfiltered scanlines, filtering row r with filters[r % len(filters)] and splitting the
+    compressed data into image data chunks of idat_size bytes, or a single one
+    """
+    pixel_size = max(1, {0: 1, 2: 3, 3: 1, 4: 2, 6: 4}[color_type] * bit_depth // 8)
+    previous = bytes(len(scanlines[0]))
+    raw = b''
+    for row, scanline in enumerate(scanlines):
+        raw += _filter(filter_type=filters[row % len(filters)], scanline=scanline, previous=previous,
+                       pixel_size=pixel_size)
+        previous = scanline
+    data = zlib.compress(raw)
+    idat_size = idat_size or len(data)
+
+    def chunk(chunk_type: bytes, content: bytes) -> bytes:
+        return struct.pack('>I', len(content)) + chunk_type + content \
+            + struct.pack('>I', zlib.crc32(chunk_type + content))
+
+    with open(path, 'wb') as file:
+        file.write(b'\x89PNG\r\n\x1a\n')
+        file.write(chunk(b'IHDR', struct.pack('>IIBBBBB', columns, rows, bit_depth, color_type, 0, 0, 0)))
+        if palette is not None:
+            file.write(chunk(b'PLTE', bytes(value for color in palette for value in color)))
+        for start in range(0, len(data), idat_size):
+            file.write(chunk(b'IDAT', data[start:start + idat_size]))
+        file.write(chunk(b'IEND', b''))
+
+
+def _pack(samples: list, bit_depth: int) -> bytes:
+    """
+    packs samples smaller than a byte most significant bits first, like png scanlines
+    """
+    per_byte = 8 // bit_depth
+    samples = samples + [0] * (-len(samples) % per_byte)
+    return bytes(sum(sample << (8 - bit_depth * (position + 1)) for position, sample in enumerate(
+        samples[start:start + per_byte])) for start in range(0, len(samples), per_byte))
+
+
+class LoadPngTest(unittest.TestCase):
+
+    def setUp(self):
+        self._directory = tempfile.TemporaryDirectory()
+        self._path = os.path.join(self._directory.name, 'board.png')
+
+    def tearDown(self):
+        self._directory.cleanup()
+
+    def _get_states(self, board) -> list:
+        return [[board.get_node(row=row, column=column).state for column in range(board.columns)]
+                for row in range(board.rows)]
+
+    def test_palette_is_thresholded_on_green_at_every_bit_depth(self):
+        # green 100 is darker than the threshold of 128 and green 200 is brighter, whatever the index bit depth
+        palette = [(255, 100, 255), (0, 200, 0)]
+        indices = [[0, 1, 1, 0, 1], [1, 0, 0, 1, 0]]
+        expected = [[NodeState.WALL if index == 0 else NodeState.OPEN for index in row] for row in indices]
+        for bit_depth in (1, 2, 4, 8):
+            with self.subTest(bit_depth=bit_depth):
+                _write_png(path=self._path, columns=5, rows=2, bit_depth=bit_depth, color_type=3,
+                           scanlines=[_pack(samples=row, bit_depth=bit_depth) for row in indices], palette=palette)
+                self.assertEqual(self._get_states(board=load_png(path=self._path, threshold=128)), expected)
+
+    def test_filtered_image_split_over_chunks(self):
+        rng = random.Random(0)
+        columns, rows = 37, 29
+        pixels = [[rng.randrange(256) for _ in range(columns)] for _ in range(rows)]
+        expected = [[NodeState.WALL if value < 128 else NodeState.OPEN for value in row] for row in pixels]
+        for idat_size in (None, 7, 100):
+            with self.subTest(idat_size=idat_size):
+                _write_png(path=self._path, columns=columns, rows=rows, bit_depth=8, color_type=0,
+                           scanlines=[bytes(row) for row in pixels], filters=(0, 1, 2, 3, 4), idat_size=idat_size)
+                self.assertEqual(self._get_states(board=load_png(path=self._path)), expected)
+
+    def test_color_and_16_bit_samples(self):
+        greens = [[0, 127, 128, 255], [255, 128, 127, 0]]
+        expected = [[NodeState.WALL if green < 128 else NodeState.OPEN for green in row] for row in greens]
+        _write_png(path=self._path, columns=4, rows=2, bit_depth=8, color_type=2,
+                   scanlines=[bytes(value for green in row for value in (255 - green, green, 0)) for row in greens],
+                   filters=(4, 3))
+        self.assertEqual(self._get_states(board=load_png(path=self._path)), expected)
+
+        _write_png(path=self._path, columns=4, rows=2, bit_depth=16, color_type=0,
+                   scanlines=[b''.join(struct.pack('>H', green * 257) for green in row) for row in greens],
+                   filters=(1, 2))
+        self.assertEqual(self._get_states(board=load_png(path=self._path)), expected)
+
+    def test_16_bit_samples_are_compared_whole(self):
+        # 32768 has the high byte of 128 but is darker than 128 / 255 of 65535
+        samples = [0, 32768, 32896, 65535]
+        expected = [[NodeState.WALL, NodeState.WALL, NodeState.OPEN, NodeState.OPEN]]
+        _write_png(path=self._path, columns=4, rows=1, bit_depth=16, color_type=0,
+                   scanlines=[b''.join(struct.pack('>H', sample) for sample in samples)])
+        self.assertEqual(self._get_states(board=load_png(path=self._path)), expected)
+
+    def test_single_large_chunk_is_inflated_in_pieces(self):
+        data = bytes(range(256)) * 4096
+        pieces = list(_inflate(decompressor=zlib.decompressobj(), data=zlib.compress(data), max_length=1 << 12))
+        self.assertTrue(all(len(piece) <= 1 << 12 for piece in pieces))
+        self.assertEqual(b''.join(pieces), data)
+
+
+class LoadPgmTest(unittest.TestCase):
+
+    def setUp(self):
+        self._directory = tempfile.TemporaryDirectory()
+        self._path = os.path.join(self._directory.name, 'board.pgm')
+
+    def tearDown(self):
+        self._directory.cleanup()
+
+    def _write_pgm(self, columns: int, rows: int, maximum: int, samples: list) -> None:
+        sample_format = '>B' if maximum < 256 else '>H'
+        with open(self._path, 'wb') as file:
+            file.write(f'P5\n# comment\n{columns} {rows}\n{maximum}\n'.encode())
+            file.write(b''.join(struct.pack(sample_format, sample) for sample in samples))
+
+    def test_samples_are_thresholded_against_the_maximum(self):
+        for maximum in (200, 300, 1000, 65535):
+            with self.subTest(maximum=maximum):
+                samples = list(range(maximum + 1))
+                self._write_pgm(columns=len(samples), rows=1, maximum=maximum, samples=samples)
+                board = load_pgm(path=self._path, threshold=128)
+                self.assertEqual([board.get_node(row=0, column=column).state for column in range(len(samples))],
+                                 [NodeState.WALL if sample * 255 < 128 * maximum else NodeState.OPEN
+                                  for sample in samples])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,162 @@
+import random
+import unittest
+
+from game.min_heap import BucketQueue, LazyMinHeap, MinHeap
+
+
+class Item:
+    """
+    object with a mutable priority, hashed by identity like a node
+    """
+
+    def __init__(self, name: str, priority: float):
+        self.name = name
+        self.priority = priority
+
+    def __repr__(self):
+        return f'{self.name}: {self.priority}'
+
+
+class OpenSetTests:
+    """
+    behaviour every open set shares, run by the test case of every backend
+    """
+    open_set_class = None
+
+    def _create(self):
+        return self.open_set_class(key=lambda item: item.priority)
+
+    def _pop_all(self, open_set) -> list:
+        names = []
+        while not open_set.is_empty():
+            names.append(open_set.pop().name)
+        return names
+
+    def test_update_moves_an_item_up_and_down(self):
+        open_set = self._create()
+        items = [Item(name=name, priority=priority) for name, priority in zip('abcdef', (5, 10, 15, 20, 25, 30))]
+        for item in items:
+            open_set.push(item)
+
+        items[4].priority = 1
+        open_set.update(items[4], 1)
+        items[0].priority = 27
+        open_set.update(items[0], 27)
+        self.assertEqual(open_set.peek().name, 'e')
+        self.assertEqual(open_set.size(), 6)
+        self.assertEqual(self._pop_all(open_set=open_set), ['e', 'b', 'c', 'd', 'a', 'f'])
+
+    def test_ties_pop_last_in_first_out(self):
+        open_set = self._create()
+        items = [Item(name=name, priority=1) for name in 'abcd']
+        for item in items:
+            open_set.push(item)
+        # an updated item counts as just pushed, even when its key did not change
+        open_set.update(items[1], 1)
+        self.assertEqual(self._pop_all(open_set=open_set), ['b', 'd', 'c', 'a'])
+
+    def test_matches_a_sorted_list(self):
+        rng = random.Random(0)
+        open_set = self._create()
+        # (priority, order of the last push or update, item) of every item in the open set, ties go to the latest
+        expected = {}
+        order = 0
+        for step in range(2000):
+            action = rng.random()
+            if action < 0.45 or not expected:
+                item = Item(name=str(step), priority=rng.randrange(50))
+                open_set.push(item)
+                expected[item] = (item.priority, -order)
+            elif action < 0.75:
+                item = rng.choice(list(expected))
+                item.priority = rng.randrange(50)
+                open_set.update(item, item.priority)
+                expected[item] = (item.priority, -order)
+            else:
+                item = min(expected, key=expected.get)
+                self.assertIs(open_set.pop(), item)
+                del expected[item]
+            order += 1
+            self.assertEqual(open_set.size(), len(expected))
+            for item in rng.sample(list(expected), min(3, len(expected))):
+                self.assertTrue(open_set.contains(item))
+
+    def test_entries_round_trip(self):
+        rng = random.Random(2)
+        open_set = self._create()
+        items = [Item(name=str(index), priority=rng.randrange(10)) for index in range(30)]
+        for item in items:
+            open_set.push(item)
+        for item in rng.sample(items, 10):
+            item.priority = rng.randrange(10)
+            open_set.update(item, item.priority)
+        for _ in range(5):
+            open_set.pop()
+
+        restored = self._create()
+        restored.set_entries(*open_set.get_entries())
+        item = Item(name='pushed after restoring', priority=items[0].priority)
+        for heap in (open_set, restored):
+            heap.push(item)
+        self.assertEqual(self._pop_all(open_set=restored), self._pop_all(open_set=open_set))
+
+
+class MinHeapTest(OpenSetTests, unittest.TestCase):
+    open_set_class = MinHeap
+
+    def test_delete_from_the_middle_keeps_the_heap_valid(self):
+        rng = random.Random(1)
+        for _ in range(50):
+            min_heap = MinHeap(key=lambda item: item.priority)
+            items = [Item(name=str(index), priority=rng.randrange(100)) for index in range(rng.randrange(2, 40))]
+            for item in items:
+                min_heap.push(item)
+
+            deleted = min_heap._delete(index=rng.randrange(1, len(items)))
+            self.assertFalse(min_heap.contains(deleted))
+            heap_list = min_heap._heap_list
+            for index in range(1, len(heap_list)):
+                self.assertLessEqual(heap_list[(index - 1) >> 1], heap_list[index])
+            for index, entry in enumerate(heap_list):
+                self.assertEqual(min_heap._object_to_index[entry[2]], index)
+            self.assertEqual(len(self._pop_all(open_set=min_heap)), len(items) - 1)
+
+
+class LazyMinHeapTest(OpenSetTests, unittest.TestCase):
+    open_set_class = LazyMinHeap
+
+
+class BucketQueueTest(OpenSetTests, unittest.TestCase):
+    open_set_class = BucketQueue
+
+    def test_falls_back_to_a_heap_in_the_same_order(self):
+        bucket_queue = BucketQueue(key=lambda item: item.priority, resolution=0.5)
+        min_heap = MinHeap(key=lambda item: item.priority)
+        items = [Item(name=str(index), priority=priority) for index, priority in enumerate((3, 1.5, 3, 2, 1.5, 3))]
+        for item in items:
+            bucket_queue.push(item)
+            min_heap.push(item)
+        self.assertTrue(bucket_queue.is_bucketed)
+
+        # a diagonal step of length sqrt(2) is not a multiple of any resolution
+        item = Item(name='diagonal', priority=2 ** 0.5)
+        bucket_queue.push(item)
+        min_heap.push(item)
+        self.assertFalse(bucket_queue.is_bucketed)
+        self.assertEqual(self._pop_all(open_set=bucket_queue), self._pop_all(open_set=min_heap))
+
+    def test_entries_round_trip_after_falling_back(self):
+        bucket_queue = BucketQueue(key=lambda item: item.priority)
+        items = [Item(name=str(index), priority=priority) for index, priority in enumerate((2, 1, 2, 2 ** 0.5, 1, 2))]
+        for item in items:
+            bucket_queue.push(item)
+        self.assertFalse(bucket_queue.is_bucketed)
+
+        restored = BucketQueue(key=lambda item: item.priority)
+        restored.set_entries(*bucket_queue.get_entries())
+        self.assertFalse(restored.is_bucketed)
+        self.assertEqual(self._pop_all(open_set=restored), self._pop_all(open_set=bucket_queue))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,86 @@
+import random
+import unittest
+
+from game.a_star import IndexAStar
+from game.board import Board
+from game.search import PathCache, find_path, find_paths
+
+
+class FindPathsTest(unittest.TestCase):
+
+    def test_every_query_matches_a_fresh_search(self):
+        size = 20
+        rng = random.Random(0)
+        board = Board(rows=size, columns=size)
+        for _ in range(size * size // 4):
+            board.set_blocked_node(row=rng.randrange(size), column=rng.randrange(size))
+        queries = [((rng.randrange(size), rng.randrange(size)), (rng.randrange(size), rng.randrange(size)))
+                   for _ in range(40)]
+
+        for (source, target), result in zip(queries, find_paths(board=board, queries=queries)):
+            with self.subTest(source=source, target=target):
+                index_a_star = IndexAStar(board=board, source=source, target=target)
+                self.assertEqual(result.found, index_a_star.search())
+                self.assertEqual(result.distance, index_a_star.distance)
+                if result.found:
+                    self.assertEqual(result.path[0], source)
+                    self.assertEqual(result.path[-1], target)
+
+    def test_walled_source_has_no_path(self):
+        board = Board(rows=5, columns=5)
+        board.set_blocked_node(row=0, column=0)
+        result = find_path(board=board, source=(0, 0), target=(4, 4))
+        self.assertFalse(result.found)
+        self.assertEqual(result.path, [])
+        self.assertIsNone(result.distance)
+
+
+
+class PathCacheTest(unittest.TestCase):
+
+    def test_repeated_queries_are_served_from_the_cache(self):
+        board = Board(rows=20, columns=20)
+        cache = PathCache(board=board)
+        first = find_path(board=board, source=(0, 0), target=(19, 19), cache=cache)
+        self.assertIs(find_path(board=board, source=(0, 0), target=(19, 19), cache=cache), first)
+        # other options are other queries
+        self.assertIsNot(find_path(board=board, source=(0, 0), target=(19, 19), cache=cache, connectivity=4), first)
+        self.assertEqual(cache.get_statistics(), {'hits': 1, 'misses': 2, 'evictions': 0, 'invalidations': 0,
+                                                  'size': 2, 'maxsize': 1024})
+
+    def test_board_edits_invalidate_the_results(self):
+        board = Board(rows=20, columns=20)
+        cache = PathCache(board=board)
+        queries = [((0, 0), (19, 19)), ((0, 19), (19, 0)), ((5, 5), (5, 15))]
+        find_paths(board=board, queries=queries, cache=cache)
+        self.assertEqual(len(cache), 3)
+
+        # a wall across the board leaves only the column 19 to pass
+        for column in range(19):
+            board.set_blocked_node(row=10, column=column)
+        results = find_paths(board=board, queries=queries, cache=cache)
+        self.assertEqual(cache.invalidations, 3)
+        self.assertEqual(cache.hits, 0)
+        self.assertEqual([result.distance for result in results],
+                         [find_path(board=board, source=source, target=target).distance
+                          for source, target in queries])
+        self.assertIn((10, 19), results[1].path)
+
+        # queries of the current version are hits again
+        find_paths(board=board, queries=queries, cache=cache)
+        self.assertEqual(cache.hits, 3)
+        self.assertEqual(cache.invalidations, 3)
+
+    def test_least_recently_used_result_is_evicted(self):
+        board = Board(rows=10, columns=10)
+        cache = PathCache(board=board, maxsize=2)
+        find_paths(board=board, queries=[((0, 0), (9, 9)), ((0, 0), (9, 0))], cache=cache)
+        self.assertIsNotNone(cache.get(source=(0, 0), target=(9, 9)))
+        find_path(board=board, source=(0, 0), target=(0, 9), cache=cache)
+        self.assertEqual(cache.evictions, 1)
+        self.assertIsNone(cache.get(source=(0, 0), target=(9, 0)))
+        self.assertIsNotNone(cache.get(source=(0, 0), target=(9, 9)))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,86 @@
+import random
+import time
+import unittest
+
+from game.a_star import AStar
+from game.board import Board
+from game.search_worker import SearchEvent, SearchWorker
+
+
+def _build_board() -> Board:
+    board = Board(rows=30, columns=30)
+    board.set_source_node(row=0, column=0)
+    board.set_target_node(row=29, column=29)
+    rng = random.Random(6)
+    for _ in range(250):
+        row, column = rng.randrange(30), rng.randrange(30)
+        if (row, column) not in ((0, 0), (29, 29)):
+            board.set_blocked_node(row=row, column=column)
+    return board
+
+
+def _run(a_star: AStar) -> (list, tuple):
+    """
+    :return: (row, column, state) records of every step, and (row, column) of the path nodes, None if there is none
+    """
+    steps = []
+    while True:
+        current_node, updated_neighbor_nodes = a_star.next()
+        if updated_neighbor_nodes is None:
+            break
+        steps.append(tuple((node.x, node.y, node.state) for node in [current_node] + updated_neighbor_nodes))
+    if current_node is None:
+        return steps, None
+    return steps, tuple((node.x, node.y) for node in a_star.get_path())
+
+
+def _drain(worker: SearchWorker) -> (list, SearchEvent, tuple):
+    """
+    :return: records of every STEP event until the worker ended, the event that ended it and its records
+    """
+    steps = []
+    while True:
+        event, records = worker.events.get(timeout=10)
+        if event != SearchEvent.STEP:
+            return steps, event, records
+        steps.append(records)
+
+
+class SearchWorkerTest(unittest.TestCase):
+
+    def test_events_match_a_synchronous_run(self):
+        steps, path = _run(a_star=AStar(board=_build_board()))
+        worker = SearchWorker(search=AStar(board=_build_board()))
+        worker.start()
+        self.assertEqual(_drain(worker=worker), (steps, SearchEvent.PATH, path))
+
+    def test_queue_stays_bounded_while_the_consumer_falls_behind(self):
+        worker = SearchWorker(search=AStar(board=_build_board()), max_steps=8)
+        worker.start()
+        time.sleep(0.1)
+        self.assertTrue(worker.is_alive)
+        self.assertEqual(worker.events.qsize(), 8)
+        steps, event, _ = _drain(worker=worker)
+        self.assertEqual(event, SearchEvent.PATH)
+        self.assertEqual(len(steps), len(_run(a_star=AStar(board=_build_board()))[0]))
+
+    def test_no_steps_are_posted_without_room_for_them(self):
+        worker = SearchWorker(search=AStar(board=_build_board()), max_steps=0)
+        worker.start()
+        steps, event, _ = _drain(worker=worker)
+        self.assertEqual((steps, event), ([], SearchEvent.PATH))
+
+    def test_cancelled_search_goes_on_in_the_foreground(self):
+        steps, path = _run(a_star=AStar(board=_build_board()))
+        a_star = AStar(board=_build_board())
+        worker = SearchWorker(search=a_star)
+        worker.pause()
+        worker.start()
+        worker.cancel()
+        self.assertFalse(worker.is_alive)
+        self.assertEqual(_drain(worker=worker), ([], SearchEvent.CANCELLED, None))
+        self.assertEqual(_run(a_star=a_star), (steps, path))
+
+
+if __name__ == '__main__':
+    unittest.main()
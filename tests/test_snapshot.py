@@ -0,0 +1,50 @@
+import io
+import random
+import unittest
+
+from game.a_star import AStar
+from game.board import Board
+from game.snapshot import read_snapshot, write_snapshot
+
+
+def _run(a_star: AStar) -> (list, list):
+    """
+    :return: (row, column) of the nodes expanded until the search ends, and of the path, empty if there is none
+    """
+    visited = []
+    while True:
+        current_node, updated_neighbor_nodes = a_star.next()
+        if updated_neighbor_nodes is None:
+            break
+        visited.append((current_node.x, current_node.y))
+    if current_node is None:
+        return visited, []
+    return visited, [(node.x, node.y) for node in a_star.get_path()]
+
+
+class SnapshotTest(unittest.TestCase):
+
+    def test_restored_search_carries_on_like_the_saved_one(self):
+        for open_set in AStar._open_set_classes:
+            with self.subTest(open_set=open_set):
+                board = Board(rows=30, columns=30)
+                board.set_source_node(row=0, column=0)
+                board.set_target_node(row=29, column=29)
+                rng = random.Random(4)
+                for _ in range(200):
+                    row, column = rng.randrange(30), rng.randrange(30)
+                    if (row, column) not in ((0, 0), (29, 29)):
+                        board.set_blocked_node(row=row, column=column)
+                a_star = AStar(board=board, open_set=open_set, connectivity=4, heuristic='manhattan')
+                for _ in range(60):
+                    a_star.next()
+
+                file = io.BytesIO()
+                write_snapshot(file=file, board=board, search=a_star)
+                file.seek(0)
+                _, restored = read_snapshot(file=file)
+                self.assertEqual(_run(a_star=restored), _run(a_star=a_star))
+
+
+if __name__ == '__main__':
+    unittest.main()